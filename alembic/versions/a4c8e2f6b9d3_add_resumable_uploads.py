@@ -0,0 +1,24 @@
+"""Add resumable upload fields to ingestion_jobs
+
+Revision ID: a4c8e2f6b9d3
+Revises: f3b9d2a6c8e1
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'a4c8e2f6b9d3'
+down_revision = 'f3b9d2a6c8e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('ingestion_jobs', sa.Column('upload_size', sa.BigInteger(), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('upload_chunk_size', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('ingestion_jobs', 'upload_chunk_size')
+    op.drop_column('ingestion_jobs', 'upload_size')
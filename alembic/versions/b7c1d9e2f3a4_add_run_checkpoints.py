@@ -0,0 +1,28 @@
+"""Add checkpoint fields to audit_rule_runs
+
+Revision ID: b7c1d9e2f3a4
+Revises: add_fraud_status
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'b7c1d9e2f3a4'
+down_revision = 'add_fraud_status'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Last claim id (in claims.id order) whose flags are committed for the run
+    op.add_column('audit_rule_runs', sa.Column('checkpoint_claim_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('audit_rule_runs', sa.Column('checkpointed_at', sa.DateTime(), nullable=True))
+    op.create_index('idx_audit_runs_status', 'audit_rule_runs', ['tenant_id', 'job_id', 'status'])
+
+
+def downgrade():
+    op.drop_index('idx_audit_runs_status', table_name='audit_rule_runs')
+    op.drop_column('audit_rule_runs', 'checkpointed_at')
+    op.drop_column('audit_rule_runs', 'checkpoint_claim_id')
@@ -0,0 +1,22 @@
+"""Index ingestion_jobs by tenant and file hash for duplicate upload checks
+
+Revision ID: b8d4f1a7c2e5
+Revises: a4c8e2f6b9d3
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'b8d4f1a7c2e5'
+down_revision = 'a4c8e2f6b9d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('idx_ingestion_jobs_tenant_file_hash', 'ingestion_jobs', ['tenant_id', 'file_hash'])
+
+
+def downgrade():
+    op.drop_index('idx_ingestion_jobs_tenant_file_hash', table_name='ingestion_jobs')
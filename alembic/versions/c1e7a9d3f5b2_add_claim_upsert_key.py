@@ -0,0 +1,51 @@
+"""Check claims are unique per (tenant_id, claim_id) ahead of the upsert key
+
+Earlier overlapping uploads may have stored the same claim_id twice for a
+tenant. The unique key cannot be built over such rows, and which copy to
+keep is a data decision, so the upgrade stops and lists how many there are
+instead of removing any. Find them with:
+
+    SELECT tenant_id, claim_id, count(*) FROM claims
+    GROUP BY tenant_id, claim_id HAVING count(*) > 1;
+
+then merge or delete the extra copies (and re-point or delete their
+flagged_claims rows) before running the upgrade again.
+
+The unique index itself is built concurrently by the next revision.
+
+Revision ID: c1e7a9d3f5b2
+Revises: b8d4f1a7c2e5
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'c1e7a9d3f5b2'
+down_revision = 'b8d4f1a7c2e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not op.get_context().as_sql:
+        duplicates = op.get_bind().execute(sa.text("""
+            SELECT count(*) FROM (
+                SELECT 1 FROM claims GROUP BY tenant_id, claim_id HAVING count(*) > 1
+            ) duplicated
+        """)).scalar()
+        if duplicates:
+            raise RuntimeError(
+                f"{duplicates} claim_id values are stored more than once for a tenant. "
+                "Resolve them as described in migration c1e7a9d3f5b2 before upgrading."
+            )
+
+    op.add_column('ingestion_jobs', sa.Column('ingest_mode', sa.String(20), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('new_rows', sa.Integer(), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('existing_rows', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('ingestion_jobs', 'existing_rows')
+    op.drop_column('ingestion_jobs', 'new_rows')
+    op.drop_column('ingestion_jobs', 'ingest_mode')
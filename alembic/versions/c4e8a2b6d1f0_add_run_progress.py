@@ -0,0 +1,24 @@
+"""Add progress fields to audit_rule_runs
+
+Revision ID: c4e8a2b6d1f0
+Revises: b7c1d9e2f3a4
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'c4e8a2b6d1f0'
+down_revision = 'b7c1d9e2f3a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('audit_rule_runs', sa.Column('total_claims', sa.Integer(), nullable=True))
+    op.add_column('audit_rule_runs', sa.Column('claims_per_second', sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('audit_rule_runs', 'claims_per_second')
+    op.drop_column('audit_rule_runs', 'total_claims')
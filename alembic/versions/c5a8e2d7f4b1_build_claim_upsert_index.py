@@ -0,0 +1,32 @@
+"""Build the unique (tenant_id, claim_id) index on claims concurrently
+
+Runs outside the migration transaction so claims stay writable while the
+index builds. Ingestion workers should be stopped from the previous
+revision's duplicate check until this finishes: a duplicate loaded in
+between makes the build fail (nothing is dropped silently), and rerunning
+clears the invalid index a failed build leaves behind. The finished index
+is then attached as the uq_claims_tenant_claim_id constraint the Claim
+model declares.
+
+Revision ID: c5a8e2d7f4b1
+Revises: c1e7a9d3f5b2
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+revision = 'c5a8e2d7f4b1'
+down_revision = 'c1e7a9d3f5b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_claims_tenant_claim_id")
+        op.execute("CREATE UNIQUE INDEX CONCURRENTLY uq_claims_tenant_claim_id ON claims (tenant_id, claim_id)")
+        op.execute("ALTER TABLE claims ADD CONSTRAINT uq_claims_tenant_claim_id UNIQUE USING INDEX uq_claims_tenant_claim_id")
+
+
+def downgrade():
+    op.execute("ALTER TABLE claims DROP CONSTRAINT IF EXISTS uq_claims_tenant_claim_id")
@@ -0,0 +1,28 @@
+"""Add rule diff fields to audit_rule_runs
+
+Revision ID: d2f5b8c3e9a7
+Revises: c4e8a2b6d1f0
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'd2f5b8c3e9a7'
+down_revision = 'c4e8a2b6d1f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Set when the run only re-evaluated a single edited rule
+    op.add_column('audit_rule_runs', sa.Column('rule_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('audit_rule_runs', sa.Column('flags_removed', sa.Integer(), server_default='0'))
+    op.create_index('idx_flagged_claims_rule_claim', 'flagged_claims', ['rule_id', 'claim_id'])
+
+
+def downgrade():
+    op.drop_index('idx_flagged_claims_rule_claim', table_name='flagged_claims')
+    op.drop_column('audit_rule_runs', 'flags_removed')
+    op.drop_column('audit_rule_runs', 'rule_id')
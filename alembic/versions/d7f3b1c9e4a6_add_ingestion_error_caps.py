@@ -0,0 +1,27 @@
+"""Cap stored ingestion error rows per job and page errors by row
+
+Revision ID: d7f3b1c9e4a6
+Revises: c5a8e2d7f4b1
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'd7f3b1c9e4a6'
+down_revision = 'c5a8e2d7f4b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('ingestion_jobs', sa.Column('error_summary', postgresql.JSONB(), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('error_rows_stored', sa.Integer(), server_default='0'))
+    op.create_index('idx_ingestion_errors_job_row', 'ingestion_errors', ['ingestion_id', 'row_number', 'id'])
+
+
+def downgrade():
+    op.drop_index('idx_ingestion_errors_job_row', table_name='ingestion_errors')
+    op.drop_column('ingestion_jobs', 'error_rows_stored')
+    op.drop_column('ingestion_jobs', 'error_summary')
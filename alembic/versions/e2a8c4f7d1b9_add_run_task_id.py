@@ -0,0 +1,22 @@
+"""Record the Celery task id that owns each audit run
+
+Revision ID: e2a8c4f7d1b9
+Revises: d7f3b1c9e4a6
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'e2a8c4f7d1b9'
+down_revision = 'd7f3b1c9e4a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('audit_rule_runs', sa.Column('task_id', sa.String(255), nullable=True))
+
+
+def downgrade():
+    op.drop_column('audit_rule_runs', 'task_id')
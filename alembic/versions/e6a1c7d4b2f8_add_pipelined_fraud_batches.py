@@ -0,0 +1,25 @@
+"""Add pipelined fraud batch counters to ingestion_jobs
+
+Revision ID: e6a1c7d4b2f8
+Revises: d2f5b8c3e9a7
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'e6a1c7d4b2f8'
+down_revision = 'd2f5b8c3e9a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Total stays NULL until ingestion has queued its last batch
+    op.add_column('ingestion_jobs', sa.Column('fraud_batches_total', sa.Integer(), nullable=True))
+    op.add_column('ingestion_jobs', sa.Column('fraud_batches_done', sa.Integer(), server_default='0'))
+
+
+def downgrade():
+    op.drop_column('ingestion_jobs', 'fraud_batches_done')
+    op.drop_column('ingestion_jobs', 'fraud_batches_total')
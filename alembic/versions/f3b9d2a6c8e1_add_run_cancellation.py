@@ -0,0 +1,22 @@
+"""Add cancellation flag to audit_rule_runs
+
+Revision ID: f3b9d2a6c8e1
+Revises: e6a1c7d4b2f8
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'f3b9d2a6c8e1'
+down_revision = 'e6a1c7d4b2f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('audit_rule_runs', sa.Column('cancel_requested', sa.Boolean(), server_default=sa.false()))
+
+
+def downgrade():
+    op.drop_column('audit_rule_runs', 'cancel_requested')
@@ -1,18 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import text, delete
+from sqlalchemy import text, delete, tuple_
 from typing import List, Optional
 from datetime import date
+import base64
 import hashlib
-from pathlib import Path
+import json
+import time
+import uuid
 import logging
+import redis.asyncio as aioredis
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import get_current_user
-from app.services import job_service
+from app.core.security import get_current_user, create_stream_token, verify_stream_token, STREAM_TOKEN_EXPIRE_SECONDS
+from app.services import job_service, run_service, upload_service
+from app.services.file_storage import get_storage
+from app.services.multipart_upload import receive_file, UploadTooLarge
+from app.services.csv_parser import is_supported_upload
+from app.services.columnar_reader import is_columnar_upload
+from app.services.claim_loader import INGEST_MODES, INGEST_MODE_INSERT_NEW, INGEST_MODE_PROBE
 from app import models
 from app.schemas import job as job_schemas
 from app.workers.celery_tasks import process_csv_task
+from app.workers.progress_events import job_events_channel, get_ingest_progress, EVENT_INGESTION_STATUS, EVENT_FRAUD_STATUS
 from app.services.audit_service import AuditService
 from pydantic import BaseModel
 
@@ -20,57 +33,105 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# upload_csv reads its own multipart body, so describe it for the OpenAPI docs
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}}
+                }
+            }
+        }
+    }
+}
+
+# SSE job events: keep-alive comment interval, and how long one stream stays open
+# before the browser's EventSource reconnects
+JOB_EVENTS_KEEPALIVE_SECONDS = 15
+JOB_EVENTS_MAX_SECONDS = 60 * 60
+
+FINAL_FRAUD_STATUSES = {"completed", "failed", "cancelled"}
 
-@router.post("/upload", status_code=status.HTTP_202_ACCEPTED, response_model=job_schemas.JobResponse)
+INGEST_MODE_QUERY = Query(
+    INGEST_MODE_INSERT_NEW,
+    pattern=f"^({'|'.join(INGEST_MODES)})$",
+    description="Claims already stored for the tenant (same claim_id): insert_new skips them, "
+                "upsert overwrites them, probe only reports new vs. existing counts and writes no claims"
+)
+
+
+@router.post(
+    "/upload",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=job_schemas.JobResponse,
+    openapi_extra=UPLOAD_REQUEST_BODY
+)
 async def upload_csv(
-    file: UploadFile = File(...),
+    request: Request,
+    pipelined: bool = Query(False, description="Start fraud detection on each committed batch while the file is still loading"),
+    allow_duplicate: bool = Query(False, description="Ingest even if an identical file was already ingested"),
+    ingest_mode: str = INGEST_MODE_QUERY,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    if not file.filename.endswith('.csv'):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File must be a CSV file"
-        )
+    _check_ingest_options(ingest_mode, pipelined)
     
-    content = await file.read()
-    
-    max_size = 10 * 1024 * 1024  
-    if len(content) > max_size:
+    # The body is parsed here rather than by a File() parameter, so the file is
+    # written to storage once, as it arrives, and an oversized upload is cut off early
+    storage = get_storage()
+    try:
+        upload = await receive_file(
+            request,
+            storage,
+            settings.MAX_UPLOAD_BYTES,
+            check_filename=_check_upload_filename
+        )
+    except UploadTooLarge as e:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Maximum size is {max_size / (1024*1024)}MB"
+            detail=str(e)
         )
-    
-    if len(content) == 0:
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File is empty"
+            detail=str(e)
         )
     
-    file_hash = hashlib.sha256(content).hexdigest()
+    file_handle = upload.handle
     
-    upload_dir = Path("tmp/uploads")
-    upload_dir.mkdir(parents=True, exist_ok=True)
+    if upload.size == 0:
+        storage.delete(file_handle)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File is empty"
+        )
     
-    import uuid
-    unique_filename = f"{uuid.uuid4()}_{file.filename}"
-    file_path = upload_dir / unique_filename
+    file_hash = upload.sha256
     
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Re-uploads of the same extract are refused instead of being ingested twice
+    if not allow_duplicate:
+        existing = job_service.find_completed_job_by_hash(db, str(current_user.tenant_id), file_hash)
+        if existing:
+            storage.delete(file_handle)
+            raise _duplicate_upload_error(existing)
     
     job = job_service.create_job(
         db=db,
         tenant_id=str(current_user.tenant_id),
-        filename=file.filename,
+        filename=upload.filename,
         file_hash=file_hash
     )
     
     task = process_csv_task.delay(
         str(job.id),
-        str(file_path),
-        str(current_user.tenant_id)
+        str(current_user.tenant_id),
+        file_handle,
+        pipelined=pipelined,
+        ingest_mode=ingest_mode
     )
     
     # Log CSV upload
@@ -82,7 +143,7 @@ async def upload_csv(
             action=AuditService.ACTION_CSV_UPLOADED,
             resource_type=AuditService.RESOURCE_JOB,
             resource_id=job.id,
-            details=f"Uploaded '{file.filename}'"
+            details=f"Uploaded '{upload.filename}'"
         )
     except Exception:
         pass
@@ -90,7 +151,268 @@ async def upload_csv(
     return {
         "job_id": str(job.id),
         "status": job.status,
-        "message": f"File '{file.filename}' uploaded successfully. Processing will begin shortly."
+        "message": f"File '{upload.filename}' uploaded successfully. Processing will begin shortly."
+    }
+
+
+@router.post("/uploads", status_code=status.HTTP_201_CREATED, response_model=job_schemas.UploadSessionResponse)
+async def create_upload_session(
+    data: job_schemas.UploadSessionCreate,
+    allow_duplicate: bool = Query(False, description="Ingest even if an identical file was already ingested"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Start a resumable upload. PUT each part to /uploads/{upload_id}/chunks/{index}
+    (any order, in parallel if wanted), then POST /uploads/{upload_id}/complete.
+    """
+    _check_upload_filename(data.filename)
+    
+    if data.file_size > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_BYTES / (1024*1024)}MB"
+        )
+    
+    # The hash is declared up front, so a duplicate is caught before any bytes are sent
+    if not allow_duplicate:
+        existing = job_service.find_completed_job_by_hash(db, str(current_user.tenant_id), data.file_hash.lower())
+        if existing:
+            raise _duplicate_upload_error(existing)
+    
+    job = upload_service.create_session(
+        db=db,
+        tenant_id=str(current_user.tenant_id),
+        filename=data.filename,
+        file_size=data.file_size,
+        file_hash=data.file_hash,
+        chunk_size=settings.RESUMABLE_UPLOAD_CHUNK_BYTES
+    )
+    
+    return _upload_session_response(job, [])
+
+
+@router.get("/uploads/{upload_id}", response_model=job_schemas.UploadSessionResponse)
+async def get_upload_session(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Parts received so far, so a client can resume by sending only the missing ones."""
+    job = _get_upload_session(db, upload_id, current_user)
+    
+    received = []
+    if job.status == "uploading":
+        received = upload_service.received_chunks(get_storage(), job)
+    
+    return _upload_session_response(job, received)
+
+
+@router.put("/uploads/{upload_id}/chunks/{index}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    job = _get_upload_session(db, upload_id, current_user)
+    
+    if not 0 <= index < upload_service.chunk_count(job):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Chunk index must be between 0 and {upload_service.chunk_count(job) - 1}"
+        )
+    
+    # Held until the part is stored, so completion never joins a part that is being rewritten
+    upload_status = upload_service.lock_for_chunk_write(db, job)
+    if upload_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload session is being completed"
+        )
+    if upload_status != "uploading":
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload session is already {upload_status}"
+        )
+    
+    storage = get_storage()
+    chunk_handle = upload_service.chunk_handle(storage, job, index)
+    expected = upload_service.expected_chunk_size(job, index)
+    size = 0
+    
+    # Re-sending a part overwrites it; a part left short by a dropped connection is removed
+    try:
+        with storage.open_write(chunk_handle) as f:
+            async for piece in request.stream():
+                size += len(piece)
+                if size > expected:
+                    break
+                f.write(piece)
+        
+        if size != expected:
+            storage.delete(chunk_handle)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Chunk {index} must be exactly {expected} bytes"
+            )
+    except Exception:
+        storage.delete(chunk_handle)
+        raise
+    finally:
+        # Nothing was written to the database; this only releases the share lock
+        db.rollback()
+
+
+@router.post("/uploads/{upload_id}/complete", status_code=status.HTTP_202_ACCEPTED, response_model=job_schemas.JobResponse)
+def complete_upload_session(
+    upload_id: str,
+    pipelined: bool = Query(False, description="Start fraud detection on each committed batch while the file is still loading"),
+    ingest_mode: str = INGEST_MODE_QUERY,
+    allow_duplicate: bool = Query(False, description="Ingest even if an identical file was already ingested"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Join the parts, check the SHA-256 declared at creation, and queue ingestion.
+    
+    Safe to retry: until the hash has been checked nothing is committed and
+    the parts are kept, so a completion that fails part way can be sent again.
+    The duplicate check made at creation is repeated once the hash is
+    verified, since an identical file may have finished ingesting while the
+    parts were uploading; the session then stays open for a retry with
+    allow_duplicate=true.
+    """
+    _check_ingest_options(ingest_mode, pipelined)
+    job = _get_upload_session(db, upload_id, current_user)
+    storage = get_storage()
+    
+    # Held until the outcome is committed; part writes and other completion requests wait for it
+    upload_status = upload_service.lock_for_assembly(db, job)
+    if upload_status != "uploading":
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload session is already {upload_status}"
+        )
+    
+    missing = upload_service.chunk_count(job) - len(upload_service.received_chunks(storage, job))
+    if missing:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{missing} chunk(s) not uploaded yet"
+        )
+    
+    try:
+        file_handle, file_hash = upload_service.assemble(storage, job)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to assemble upload: {str(e)}"
+        )
+    
+    if file_hash != job.file_hash:
+        # Record the failure before removing anything it refers to
+        job_service.update_job_status(db, str(job.id), str(current_user.tenant_id), "failed")
+        storage.delete(file_handle)
+        upload_service.discard_chunks(storage, job)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="SHA-256 of the uploaded file does not match the declared file_hash"
+        )
+    
+    if not allow_duplicate:
+        existing = job_service.find_completed_job_by_hash(db, str(current_user.tenant_id), file_hash)
+        if existing:
+            db.rollback()
+            storage.delete(file_handle)
+            raise _duplicate_upload_error(existing)
+    
+    job = job_service.update_job_status(db, str(job.id), str(current_user.tenant_id), "pending")
+    upload_service.discard_chunks(storage, job)
+    
+    process_csv_task.delay(
+        str(job.id),
+        str(current_user.tenant_id),
+        file_handle,
+        pipelined=pipelined,
+        ingest_mode=ingest_mode
+    )
+    
+    try:
+        AuditService.log(
+            db=db,
+            tenant_id=current_user.tenant_id,
+            user_id=current_user.id,
+            action=AuditService.ACTION_CSV_UPLOADED,
+            resource_type=AuditService.RESOURCE_JOB,
+            resource_id=job.id,
+            details=f"Uploaded '{job.filename}' ({upload_service.chunk_count(job)} chunks)"
+        )
+    except Exception:
+        pass
+    
+    return {
+        "job_id": str(job.id),
+        "status": job.status,
+        "message": f"File '{job.filename}' uploaded successfully. Processing will begin shortly."
+    }
+
+
+def _check_upload_filename(filename: str):
+    if not (is_supported_upload(filename) or is_columnar_upload(filename)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be a CSV file (.csv, .csv.gz or .zip) or a Parquet/Arrow file"
+        )
+
+
+def _duplicate_upload_error(existing) -> HTTPException:
+    """Both upload endpoints refuse a file already ingested the same way: 409, pointing at the earlier job."""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Identical file already ingested as job {existing.id}. Pass allow_duplicate=true to ingest it again.",
+        headers={"Location": f"/api/v1/claims/jobs/{existing.id}"}
+    )
+
+
+def _check_ingest_options(ingest_mode: str, pipelined: bool):
+    if ingest_mode == INGEST_MODE_PROBE and pipelined:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A probe writes no claims, so it cannot run pipelined fraud detection"
+        )
+
+
+def _get_upload_session(db: Session, upload_id: str, current_user: models.User):
+    job = job_service.get_job(
+        db=db,
+        job_id=upload_id,
+        tenant_id=str(current_user.tenant_id)
+    )
+    
+    if not job or job.upload_size is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found"
+        )
+    
+    return job
+
+
+def _upload_session_response(job, received_chunks: list) -> dict:
+    return {
+        "upload_id": str(job.id),
+        "status": job.status,
+        "file_name": job.filename,
+        "file_size": job.upload_size,
+        "chunk_size": job.upload_chunk_size,
+        "total_chunks": upload_service.chunk_count(job),
+        "received_chunks": received_chunks
     }
 
 
@@ -106,12 +428,144 @@ async def get_job_status(
         tenant_id=str(current_user.tenant_id)
     )
     
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    return _job_status_payload(db, job, current_user.tenant_id)
+
+
+@router.post("/jobs/{job_id}/events/token", response_model=job_schemas.JobEventsTokenResponse)
+async def create_job_events_token(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Short-lived token for GET /jobs/{job_id}/events, since EventSource cannot send a Bearer header."""
+    job = job_service.get_job(
+        db=db,
+        job_id=job_id,
+        tenant_id=str(current_user.tenant_id)
+    )
+    
     if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Job not found"
         )
     
+    return {
+        "token": create_stream_token(current_user, job_id),
+        "expires_in": STREAM_TOKEN_EXPIRE_SECONDS
+    }
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    token: str = Query(..., description="Token from POST /jobs/{job_id}/events/token"),
+    db: Session = Depends(get_db)
+):
+    """
+    Server-Sent Events for one job, in place of polling GET /jobs/{job_id}.
+    
+    Sends a "snapshot" event with the job status, then ingestion_status,
+    ingestion_progress, fraud_status and fraud_progress events as workers
+    publish them. Once the job fails, or finishes with no fraud run in
+    progress, an "end" event is sent and the stream closes; clients should
+    close their EventSource then rather than let it reconnect.
+    """
+    tenant_id = verify_stream_token(token, job_id)["tenant_id"]
+    
+    job = job_service.get_job(
+        db=db,
+        job_id=job_id,
+        tenant_id=tenant_id
+    )
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    redis_client = aioredis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    pubsub = redis_client.pubsub()
+    try:
+        await pubsub.subscribe(job_events_channel(job_id))
+    except Exception as e:
+        await pubsub.aclose()
+        await redis_client.aclose()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Live job events are unavailable: {str(e)}"
+        )
+    
+    # Read the snapshot after subscribing so no event falls between the two
+    db.refresh(job)
+    snapshot = jsonable_encoder(_job_status_payload(db, job, tenant_id))
+    
+    return StreamingResponse(
+        _job_event_stream(request, redis_client, pubsub, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _job_event_stream(request: Request, redis_client, pubsub, snapshot: dict):
+    state = {"status": snapshot["status"], "fraud_status": snapshot["fraud_status"]}
+    
+    try:
+        yield _sse_message("snapshot", snapshot)
+        if _job_events_finished(state):
+            yield _sse_message("end", state)
+            return
+        
+        deadline = time.monotonic() + JOB_EVENTS_MAX_SECONDS
+        while time.monotonic() < deadline:
+            if await request.is_disconnected():
+                return
+            
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=JOB_EVENTS_KEEPALIVE_SECONDS)
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            
+            data = json.loads(message["data"])
+            event = data.pop("event")
+            yield _sse_message(event, data)
+            
+            # fraud_progress carries the run's status, not the job's, so only status events count
+            if event == EVENT_INGESTION_STATUS:
+                state["status"] = data.get("status")
+            elif event == EVENT_FRAUD_STATUS:
+                state["fraud_status"] = data.get("fraud_status")
+            
+            if _job_events_finished(state):
+                yield _sse_message("end", state)
+                return
+    finally:
+        await pubsub.aclose()
+        await redis_client.aclose()
+
+
+def _job_events_finished(state: dict) -> bool:
+    """No more events will come: ingestion failed, or it completed and no fraud run is in progress."""
+    if state["status"] == "failed" or state["fraud_status"] in FINAL_FRAUD_STATUSES:
+        return True
+    return state["status"] == "completed" and state["fraud_status"] != "processing"
+
+
+def _sse_message(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _job_status_payload(db: Session, job, tenant_id) -> dict:
+    latest_run = run_service.get_latest_run_for_job(db, job.id, tenant_id)
+    
     return {
         "job_id": str(job.id),
         "status": job.status,
@@ -119,12 +573,16 @@ async def get_job_status(
         "total_rows": job.total_rows,
         "success_count": job.successful_rows,
         "error_count": job.failed_rows,
+        "ingest_mode": job.ingest_mode,
+        "new_rows": job.new_rows,
+        "existing_rows": job.existing_rows,
         "started_at": job.started_at,
         "completed_at": job.completed_at,
         "fraud_status": job.fraud_status or "pending",
         "fraud_flags_count": job.fraud_flags_count or 0,
         "fraud_started_at": job.fraud_started_at,
-        "fraud_completed_at": job.fraud_completed_at
+        "fraud_completed_at": job.fraud_completed_at,
+        "fraud_progress": run_service.describe_progress(latest_run) if latest_run else None
     }
 
 
@@ -161,6 +619,8 @@ async def list_jobs(
 @router.get("/jobs/{job_id}/errors", response_model=job_schemas.JobErrorsResponse)
 async def get_job_errors(
     job_id: str,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
@@ -179,13 +639,31 @@ async def get_job_errors(
             detail="Job not found"
         )
     
-    errors = db.query(models.IngestionError).filter(
+    query = db.query(models.IngestionError).filter(
         models.IngestionError.ingestion_id == job_id
-    ).order_by(models.IngestionError.row_number).all()
+    )
+    
+    # Keyset paging on (row_number, id), served by idx_ingestion_errors_job_row
+    if cursor:
+        query = query.filter(
+            tuple_(models.IngestionError.row_number, models.IngestionError.id) > _decode_error_cursor(cursor)
+        )
+    
+    errors = query.order_by(
+        models.IngestionError.row_number,
+        models.IngestionError.id
+    ).limit(limit + 1).all()
+    
+    has_more = len(errors) > limit
+    errors = errors[:limit]
     
     return {
         "job_id": str(job.id),
-        "total_errors": len(errors),
+        "total_errors": _running_error_count(job),
+        "stored_errors": job.error_rows_stored,
+        "error_summary": job.error_summary or {},
+        "next_cursor": _encode_error_cursor(errors[-1]) if has_more else None,
+        "has_more": has_more,
         "errors": [
             {
                 "row_number": error.row_number,
@@ -197,6 +675,34 @@ async def get_job_errors(
     }
 
 
+def _running_error_count(job) -> int:
+    """
+    Rejected rows so far. failed_rows is only written when ingestion ends, so
+    while it runs the count comes from the workers' running totals, and at
+    least the rows already stored.
+    """
+    if job.status in ("completed", "failed"):
+        return job.failed_rows or 0
+    
+    progress = get_ingest_progress(str(job.id)) or {}
+    return max(progress.get("error_count", 0), job.error_rows_stored or 0)
+
+
+def _encode_error_cursor(error) -> str:
+    return base64.urlsafe_b64encode(f"{error.row_number}:{error.id}".encode()).decode()
+
+
+def _decode_error_cursor(cursor: str) -> tuple:
+    try:
+        row_number, error_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return int(row_number), uuid.UUID(error_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
 class ClaimResponse(BaseModel):
     id: str
     claim_number: str
@@ -15,12 +15,17 @@ from app.schemas.fraud import (
     FlaggedClaimDetailResponse,
     DetectionStatsResponse,
     DetectionResultResponse,
-    ReviewRequest
+    ReviewRequest,
+    ClaimScoreRequest,
+    ClaimScoreResponse
 )
 from app.workers.fraud_detection_task import detect_fraud_for_job
+from app.workers import run_lock
 from app.services.audit_service import AuditService
+from app.services.scoring_service import score_claim
 from datetime import datetime
 import time
+import uuid
 
 router = APIRouter(prefix="/fraud", tags=["Fraud Detection"])
 
@@ -244,21 +249,53 @@ async def review_flagged_claim(
 async def trigger_fraud_detection(
     job_id: Optional[UUID] = Query(None),
     re_run: bool = Query(False),
+    rule_id: Optional[UUID] = Query(None, description="Only re-evaluate this rule and apply the flag delta"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     start_time = time.time()
     
+    if rule_id is not None:
+        rule = db.query(Rule).filter(
+            Rule.id == rule_id,
+            Rule.tenant_id == current_user.tenant_id
+        ).first()
+        
+        if not rule:
+            raise HTTPException(status_code=404, detail="Rule not found")
+    
+    # Reserve the scope before queuing; a second trigger gets the in-flight run instead
+    lock_key = run_lock.fraud_run_lock_key(str(current_user.tenant_id), str(job_id) if job_id else None)
+    task_id = str(uuid.uuid4())
+    holder = run_lock.claim(lock_key, run_lock.task_token(task_id))
+    
+    if holder:
+        return {
+            "status": "already_running",
+            "message": f"Fraud detection is already running for {f'job {job_id}' if job_id else 'all claims'}",
+            "job_id": str(job_id) if job_id else None,
+            "claims_evaluated": 0,
+            "rules_applied": 0,
+            "flags_created": 0,
+            "processing_time": time.time() - start_time,
+            **run_lock.parse_token(holder)
+        }
+    
     try:
-        task = detect_fraud_for_job.delay(
-            str(job_id) if job_id else None,
-            str(current_user.tenant_id),
-            re_run=re_run
+        task = detect_fraud_for_job.apply_async(
+            args=[str(job_id) if job_id else None, str(current_user.tenant_id)],
+            kwargs={
+                "re_run": re_run,
+                "rule_id": str(rule_id) if rule_id else None
+            },
+            task_id=task_id
         )
         
         processing_time = time.time() - start_time
         
-        if job_id:
+        if rule_id:
+            message = f"Re-evaluating rule '{rule.name}' (version {rule.version}) and applying the flag delta"
+        elif job_id:
             message = f"Fraud detection started for job {job_id}"
         else:
             message = "Retrospective fraud detection started for all previously uploaded claims"
@@ -274,14 +311,38 @@ async def trigger_fraud_detection(
             "claims_evaluated": 0,  
             "rules_applied": 0,
             "flags_created": 0,
-            "processing_time": processing_time
+            "processing_time": processing_time,
+            "task_id": task.id
         }
         
     except Exception as e:
+        run_lock.release(lock_key, run_lock.task_token(task_id))
         raise HTTPException(
             status_code=500,
             detail=f"Failed to trigger fraud detection: {str(e)}"
         )
+
+
+@router.post("/score", response_model=ClaimScoreResponse)
+async def score_single_claim(
+    claim: ClaimScoreRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Evaluate the tenant's active rules against one claim synchronously. Nothing is persisted."""
+    try:
+        return score_claim(
+            db=db,
+            tenant_id=current_user.tenant_id,
+            claim_data=claim.model_dump(exclude_none=True)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to score claim: {str(e)}"
+        )
+
+
 @router.get("/stats")
 async def get_fraud_stats(
     db: Session = Depends(get_db),
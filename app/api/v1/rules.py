@@ -11,9 +11,11 @@ from app.models.claim import Rule
 from app.schemas.rule import (
     RuleCreate, RuleUpdate, RuleToggle,
     RuleResponse, RuleListResponse, RuleDetailResponse,
-    RuleVersionResponse
+    RuleVersionResponse, RuleSimulationRequest, RuleSimulationResponse
 )
 from app.services.rule_service import RuleService
+from app.services.rule_simulation import RuleSimulationService
+from app.services.scoring_service import scoring_cache
 from app.services.audit_service import AuditService
 
 
@@ -33,6 +35,7 @@ async def create_rule(
             user_id=current_user.id,
             rule_data=rule_data
         )
+        scoring_cache.invalidate(current_user.tenant_id)
         
         # Log rule creation
         try:
@@ -84,6 +87,50 @@ async def list_rules(
         )
 
 
+@router.post("/simulate", response_model=RuleSimulationResponse)
+async def simulate_rule(
+    request: RuleSimulationRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Estimate the flags a draft or edited rule would produce on a sample of claims. Nothing is persisted."""
+    if request.rule_id is not None:
+        rule = RuleService.get_rule_by_id(
+            db=db,
+            tenant_id=current_user.tenant_id,
+            rule_id=request.rule_id
+        )
+        
+        if not rule:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Rule {request.rule_id} not found"
+            )
+        
+        draft = RuleSimulationService.build_edited_rule(rule, request.changes)
+    elif request.rule is not None:
+        draft = RuleSimulationService.build_draft_rule(current_user.tenant_id, request.rule)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either a draft rule or a rule_id to simulate"
+        )
+    
+    try:
+        return RuleSimulationService.simulate(
+            db=db,
+            tenant_id=current_user.tenant_id,
+            rule=draft,
+            sample_size=request.sample_size,
+            max_examples=request.max_examples
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to simulate rule: {str(e)}"
+        )
+
+
 @router.get("/{rule_id}", response_model=RuleDetailResponse)
 async def get_rule(
     rule_id: UUID,
@@ -154,6 +201,8 @@ async def update_rule(
             detail=f"Rule {rule_id} not found"
         )
     
+    scoring_cache.invalidate(current_user.tenant_id)
+    
     return rule
 
 
@@ -177,6 +226,8 @@ async def toggle_rule(
             detail=f"Rule {rule_id} not found"
         )
     
+    scoring_cache.invalidate(current_user.tenant_id)
+    
     # Log rule toggle
     try:
         status_str = "activated" if toggle_data.is_active else "deactivated"
@@ -213,6 +264,8 @@ async def delete_rule(
             detail=f"Rule {rule_id} not found"
         )
     
+    scoring_cache.invalidate(current_user.tenant_id)
+    
     # Log rule deletion
     try:
         AuditService.log(
@@ -280,5 +333,6 @@ async def bulk_upload_rules(
         user_id=current_user.id,
         rules_data=rules_data
     )
+    scoring_cache.invalidate(current_user.tenant_id)
     
     return result
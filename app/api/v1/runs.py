@@ -12,6 +12,10 @@ from app.core.security import get_current_user
 from app.models.user import User
 from app.models.audit_run import AuditRuleRun
 from app.models.claim import FlaggedClaim, Rule, IngestionJob
+from app.schemas.job import RunProgress
+from app.services import run_service
+from app.services.audit_service import AuditService
+from app.workers import run_lock
 
 
 router = APIRouter(prefix="/runs", tags=["Audit Runs"])
@@ -36,6 +40,9 @@ class RunSummary(BaseModel):
     flags_generated: int
     completed_at: Optional[datetime]
     error_message: Optional[str]
+    rule_id: Optional[str] = None
+    flags_removed: int = 0
+    progress: Optional[RunProgress] = None
 
 
 class RunDetailResponse(BaseModel):
@@ -92,7 +99,10 @@ async def list_audit_runs(
             claims_processed=run.claims_processed or 0,
             flags_generated=run.flags_generated or 0,
             completed_at=run.completed_at,
-            error_message=run.error_message
+            error_message=run.error_message,
+            rule_id=str(run.rule_id) if run.rule_id else None,
+            flags_removed=run.flags_removed or 0,
+            progress=run_service.describe_progress(run)
         ))
     
     return RunListResponse(runs=run_summaries, total=total)
@@ -176,7 +186,10 @@ async def get_run_details(
             claims_processed=run.claims_processed or 0,
             flags_generated=run.flags_generated or 0,
             completed_at=run.completed_at,
-            error_message=run.error_message
+            error_message=run.error_message,
+            rule_id=str(run.rule_id) if run.rule_id else None,
+            flags_removed=run.flags_removed or 0,
+            progress=run_service.describe_progress(run)
         ),
         rules_applied=rules_applied,
         flags_by_severity=flags_by_severity,
@@ -185,6 +198,57 @@ async def get_run_details(
     )
 
 
+@router.post("/{run_id}/cancel", response_model=RunProgress)
+async def cancel_run(
+    run_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Ask a running audit to stop; flags committed so far are kept.
+    
+    A run whose lock no live worker holds (the lease expired, or it is held
+    by another run) has nobody left to see the request, so it is closed here.
+    """
+    run = db.query(AuditRuleRun).filter(
+        AuditRuleRun.id == run_id,
+        AuditRuleRun.tenant_id == current_user.tenant_id
+    ).first()
+    
+    if not run:
+        raise HTTPException(status_code=404, detail="Audit run not found")
+    
+    if run.status != "processing":
+        raise HTTPException(
+            status_code=400,
+            detail=f"Run is not in progress (status: {run.status})"
+        )
+    
+    run = run_service.request_cancel(db, run)
+    
+    lock_key = run_lock.fraud_run_lock_key(str(run.tenant_id), str(run.job_id) if run.job_id else None)
+    tokens = [run_lock.run_token(str(run.id))]
+    if run.task_id:
+        tokens.append(run_lock.task_token(run.task_id))
+    if not run_lock.is_held_by(lock_key, tokens):
+        run = run_service.close_cancelled_run(db, run)
+    
+    try:
+        AuditService.log(
+            db=db,
+            tenant_id=current_user.tenant_id,
+            user_id=current_user.id,
+            action=AuditService.ACTION_FRAUD_RUN_CANCELLED,
+            resource_type=AuditService.RESOURCE_RUN,
+            resource_id=run.id,
+            details=f"Cancelled audit run {run.id}" + (f" of job {run.job_id}" if run.job_id else "")
+        )
+    except Exception:
+        pass
+    
+    return run_service.describe_progress(run)
+
+
 @router.get("/{run_id}/stats")
 async def get_run_stats(
     run_id: UUID,
@@ -1,7 +1,28 @@
 from celery import Celery
+from kombu import Queue
 from app.core.config import settings
 
 
+# Interactive uploads, job-scoped detection and tenant-wide retrospective
+# detection each get their own queue so a long retro run cannot starve uploads.
+QUEUE_INGESTION = "ingestion"
+QUEUE_FRAUD_JOB = "fraud_job"
+QUEUE_FRAUD_RETRO = "fraud_retro"
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    if name in ("process_csv_task", "count_csv_chunk", "start_csv_chunks", "process_csv_chunk", "finalize_csv_ingest"):
+        return {"queue": QUEUE_INGESTION}
+    if name in ("detect_fraud_for_claims", "reconcile_pipelined_run"):
+        return {"queue": QUEUE_FRAUD_JOB}
+    if name == "detect_fraud_for_job":
+        job_id = kwargs.get("job_id") if kwargs else None
+        if job_id is None and args:
+            job_id = args[0]
+        return {"queue": QUEUE_FRAUD_JOB if job_id else QUEUE_FRAUD_RETRO}
+    return None
+
+
 celery_app = Celery(
     "pharmacy_audit_platform",
     broker=settings.REDIS_URL,
@@ -20,4 +41,11 @@ celery_app.conf.update(
     task_time_limit=30 * 60,  
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
-)
\ No newline at end of file
+    task_queues=(
+        Queue(QUEUE_INGESTION),
+        Queue(QUEUE_FRAUD_JOB),
+        Queue(QUEUE_FRAUD_RETRO),
+    ),
+    task_default_queue=QUEUE_INGESTION,
+    task_routes=(route_task,),
+)
@@ -13,6 +13,24 @@ class Settings(BaseSettings):
 
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # Largest accepted CSV upload; bodies are streamed to disk, never held in memory
+    MAX_UPLOAD_BYTES: int = 5 * 1024 * 1024 * 1024
+    UPLOAD_DIR: str = "tmp/uploads"
+    # Where uploads are stored for workers to read; only "local" (UPLOAD_DIR on a shared volume) for now
+    FILE_STORAGE_BACKEND: str = "local"
+    # Part size for resumable uploads; clients PUT parts of exactly this size (the last may be shorter)
+    RESUMABLE_UPLOAD_CHUNK_BYTES: int = 8 * 1024 * 1024
+
+    # Rejected rows stored with their raw data per ingestion job; beyond this only counts per error code are kept
+    INGESTION_ERROR_ROW_CAP: int = 10000
+
+    # Per-tenant concurrency caps for each worker queue
+    TENANT_MAX_CONCURRENT_INGESTION: int = 2
+    TENANT_MAX_CONCURRENT_INGEST_CHUNKS: int = 4
+    TENANT_MAX_CONCURRENT_FRAUD_JOB: int = 2
+    TENANT_MAX_CONCURRENT_FRAUD_RETRO: int = 1
+    TENANT_THROTTLE_RETRY_SECONDS: int = 10
+
     
     class Config:
         env_file = ".env"
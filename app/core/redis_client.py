@@ -0,0 +1,14 @@
+import redis
+
+from app.core.config import settings
+
+
+_client = None
+
+
+def get_redis() -> redis.Redis:
+    """Shared Redis connection for locks and counters (the broker has its own)."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
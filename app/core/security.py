@@ -13,6 +13,11 @@ from app.core.database import get_db
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# Stream tokens ride in the URL of browser requests that cannot set headers (EventSource),
+# so they are scoped to one resource and only need to outlive opening the connection
+STREAM_TOKEN_PURPOSE = "stream"
+STREAM_TOKEN_EXPIRE_SECONDS = 60
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -35,6 +40,43 @@ def decode_jwt(token: str) -> dict:
     return payload
 
 
+def create_stream_token(current_user, resource_id: str) -> str:
+    """Short-lived token for one resource; it carries no role, so get_current_user rejects it."""
+    expire = datetime.utcnow() + timedelta(seconds=STREAM_TOKEN_EXPIRE_SECONDS)
+    return jwt.encode(
+        {
+            "purpose": STREAM_TOKEN_PURPOSE,
+            "resource_id": str(resource_id),
+            "user_id": str(current_user.id),
+            "tenant_id": str(current_user.tenant_id),
+            "exp": expire
+        },
+        settings.SECRET_KEY,
+        algorithm=settings.JWT_ALGORITHM
+    )
+
+
+def verify_stream_token(token: str, resource_id: str) -> dict:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired stream token"
+    )
+    
+    try:
+        payload = decode_jwt(token)
+    except JWTError:
+        raise credentials_exception
+    
+    if (
+        payload.get("purpose") != STREAM_TOKEN_PURPOSE
+        or payload.get("resource_id") != str(resource_id)
+        or not payload.get("tenant_id")
+    ):
+        raise credentials_exception
+    
+    return payload
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
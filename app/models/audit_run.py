@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -11,12 +11,22 @@ class AuditRuleRun(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     job_id = Column(UUID(as_uuid=True))
+    rule_id = Column(UUID(as_uuid=True))
     run_date = Column(DateTime, nullable=False)
     rules_executed = Column(Integer, default=0)
     claims_processed = Column(Integer, default=0)
     flags_generated = Column(Integer, default=0)
+    flags_removed = Column(Integer, default=0)
     status = Column(String(20), nullable=False)
     error_message = Column(Text)
+    checkpoint_claim_id = Column(UUID(as_uuid=True))
+    checkpointed_at = Column(DateTime)
+    total_claims = Column(Integer)
+    claims_per_second = Column(Float)
+    # Set by the API; the worker stops at the next batch boundary
+    cancel_requested = Column(Boolean, default=False)
+    # Celery task that started the run; a redelivered message carries the same id
+    task_id = Column(String(255))
     created_at = Column(DateTime, server_default=func.now())
     completed_at = Column(DateTime)
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Integer, Numeric, Date, DateTime, Text, Boolean, TIMESTAMP
+from sqlalchemy import Column, String, ForeignKey, Integer, BigInteger, Numeric, Date, DateTime, Text, Boolean, TIMESTAMP, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 import uuid
@@ -9,6 +9,11 @@ from app.core.database import Base
 class Claim(Base):
     __tablename__ = "claims"
     
+    # Upsert key for re-sent claims; built by migration c5a8e2d7f4b1
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "claim_id", name="uq_claims_tenant_claim_id"),
+    )
+    
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     ingestion_id = Column(UUID(as_uuid=True), ForeignKey("ingestion_jobs.id"))
@@ -79,11 +84,24 @@ class IngestionJob(Base):
     total_rows = Column(Integer, default=0)
     successful_rows = Column(Integer, default=0)
     failed_rows = Column(Integer, default=0)
+    # insert_new / upsert / probe, and how many accepted rows were new vs. already stored
+    ingest_mode = Column(String(20))
+    new_rows = Column(Integer)
+    existing_rows = Column(Integer)
+    # Rejected rows per error code, and how many of them were stored in ingestion_errors (capped)
+    error_summary = Column(JSONB)
+    error_rows_stored = Column(Integer, default=0)
     status = Column(String(20), default="pending")
     fraud_status = Column(String(20), default="pending")
     fraud_flags_count = Column(Integer, default=0)
     fraud_started_at = Column(DateTime)
     fraud_completed_at = Column(DateTime)
+    # Pipelined fraud detection: batches queued during ingestion vs. evaluated
+    fraud_batches_total = Column(Integer)
+    fraud_batches_done = Column(Integer, default=0)
+    # Resumable uploads: declared file size and part size, set while status is "uploading"
+    upload_size = Column(BigInteger)
+    upload_chunk_size = Column(Integer)
     started_at = Column(DateTime)
     completed_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
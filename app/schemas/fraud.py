@@ -1,7 +1,8 @@
 
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import datetime, date
+from decimal import Decimal
 from uuid import UUID
 
 
@@ -59,6 +60,8 @@ class DetectionResultResponse(BaseModel):
     rules_applied: int
     flags_created: int
     processing_time: Optional[float] = None
+    run_id: Optional[str] = None
+    task_id: Optional[str] = None
 
 
 class DetectionStatsResponse(BaseModel):
@@ -67,3 +70,49 @@ class DetectionStatsResponse(BaseModel):
     total_unreviewed: int
     flags_by_rule: List[Dict[str, Any]]
     recent_flags: List[FlaggedClaimResponse]
+
+
+class ClaimScoreRequest(BaseModel):
+    claim_id: str = Field(..., max_length=100)
+    patient_id: Optional[str] = Field(None, max_length=100)
+    rx_number: Optional[str] = Field(None, max_length=50)
+    ndc: Optional[str] = Field(None, max_length=50)
+    drug_name: Optional[str] = Field(None, max_length=255)
+    prescriber_npi: Optional[str] = Field(None, max_length=10)
+    pharmacy_npi: Optional[str] = Field(None, max_length=10)
+    fill_date: Optional[date] = None
+    days_supply: Optional[int] = None
+    quantity: Optional[int] = None
+    copay_amount: Optional[Decimal] = None
+    plan_paid_amount: Optional[Decimal] = None
+    ingredient_cost: Optional[Decimal] = None
+    usual_and_customary: Optional[Decimal] = None
+    plan_id: Optional[str] = Field(None, max_length=100)
+    state: Optional[str] = Field(None, max_length=2)
+    claim_status: Optional[str] = Field(None, max_length=20)
+    amount: Optional[Decimal] = None
+    prescription_date: Optional[date] = None
+    paid_amount: Optional[Decimal] = None
+    allowed_amount: Optional[Decimal] = None
+    dispensing_fee: Optional[Decimal] = None
+    daw_code: Optional[str] = Field(None, max_length=2)
+    drug_class: Optional[str] = Field(None, max_length=100)
+
+
+class ClaimScoreMatch(BaseModel):
+    rule_id: UUID
+    rule_code: Optional[str] = None
+    rule_name: str
+    rule_version: int
+    severity: Optional[str] = None
+    category: Optional[str] = None
+    explanation: Optional[Dict[str, Any]] = None
+
+
+class ClaimScoreResponse(BaseModel):
+    claim_id: str
+    flagged: bool
+    rules_evaluated: int
+    matches: List[ClaimScoreMatch]
+    errors: List[Dict[str, Any]] = []
+    latency_ms: float
@@ -1,6 +1,6 @@
 
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict
 from datetime import datetime, date
 
 
@@ -11,6 +11,34 @@ class JobResponse(BaseModel):
     message: str
 
 
+class UploadSessionCreate(BaseModel):
+    filename: str
+    file_size: int = Field(..., gt=0)
+    file_hash: str = Field(..., pattern=r"^[0-9a-fA-F]{64}$", description="SHA-256 of the whole file, hex encoded")
+
+
+class UploadSessionResponse(BaseModel):
+    upload_id: str
+    status: str
+    file_name: str
+    file_size: int
+    chunk_size: int
+    total_chunks: int
+    received_chunks: List[int] = []
+
+
+class RunProgress(BaseModel):
+    run_id: str
+    status: str
+    claims_processed: int = 0
+    total_claims: Optional[int] = None
+    flags_generated: int = 0
+    percent_complete: Optional[float] = None
+    claims_per_second: Optional[float] = None
+    eta_seconds: Optional[int] = None
+    updated_at: Optional[datetime] = None
+
+
 class JobStatusResponse(BaseModel):
     job_id: str
     status: str
@@ -18,12 +46,16 @@ class JobStatusResponse(BaseModel):
     total_rows: Optional[int] = None
     success_count: Optional[int] = None
     error_count: Optional[int] = None
+    ingest_mode: Optional[str] = None
+    new_rows: Optional[int] = None
+    existing_rows: Optional[int] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     fraud_status: Optional[str] = "pending"
     fraud_flags_count: Optional[int] = 0
     fraud_started_at: Optional[datetime] = None
     fraud_completed_at: Optional[datetime] = None
+    fraud_progress: Optional[RunProgress] = None
 
 
 class JobSummary(BaseModel):
@@ -43,6 +75,11 @@ class JobListResponse(BaseModel):
     jobs: List[JobSummary]
 
 
+class JobEventsTokenResponse(BaseModel):
+    token: str
+    expires_in: int
+
+
 class JobErrorDetail(BaseModel):
     row_number: int
     error_message: str
@@ -52,7 +89,11 @@ class JobErrorDetail(BaseModel):
 class JobErrorsResponse(BaseModel):
     job_id: str
     total_errors: int
+    stored_errors: Optional[int] = None
+    error_summary: Dict[str, int] = {}
     errors: List[JobErrorDetail]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
 
 
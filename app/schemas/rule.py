@@ -102,3 +102,28 @@ class RuleVersionResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class RuleSimulationRequest(BaseModel):
+    rule: Optional[RuleCreate] = Field(None, description="Draft rule to simulate")
+    rule_id: Optional[UUID] = Field(None, description="Existing rule to simulate")
+    changes: Optional[RuleUpdate] = Field(None, description="Edits applied to the existing rule before simulating")
+    sample_size: int = Field(1000, ge=10, le=20000)
+    max_examples: int = Field(10, ge=0, le=100)
+
+
+class RuleSimulationResponse(BaseModel):
+    rule_id: Optional[UUID] = None
+    rule_name: str
+    logic_type: Optional[str]
+    total_claims: int
+    sampled_claims: int
+    sample_matches: int
+    evaluation_errors: int
+    estimated_flags: int
+    lower_bound: int
+    upper_bound: int
+    estimated_flag_rate: float
+    confidence_level: float
+    exact: bool
+    examples: List[Dict[str, Any]]
@@ -28,6 +28,7 @@ class AuditService:
     ACTION_JOB_DELETED = "JOB_DELETED"
     
     ACTION_FRAUD_DETECTION_RUN = "FRAUD_DETECTION_RUN"
+    ACTION_FRAUD_RUN_CANCELLED = "FRAUD_RUN_CANCELLED"
     ACTION_CLAIM_REVIEWED = "CLAIM_REVIEWED"
     
     # Resource types
@@ -36,6 +37,7 @@ class AuditService:
     RESOURCE_JOB = "JOB"
     RESOURCE_CLAIM = "CLAIM"
     RESOURCE_FLAG = "FLAG"
+    RESOURCE_RUN = "RUN"
     
     @staticmethod
     def log(
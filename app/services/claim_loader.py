@@ -0,0 +1,333 @@
+"""
+Bulk loading of validated CSV rows into claims and ingestion_errors with Postgres COPY.
+
+Claims are copied into a per-transaction staging table and moved into
+claims with INSERT ... ON CONFLICT on (tenant_id, claim_id), so re-sent
+claims are skipped or updated in place instead of inserted again.
+
+An upsert moves the stored claim to the new job: its ingestion_id is
+overwritten with the rest of the row, so from then on it is listed,
+fraud-checked and deleted with that job, not with the job that first
+loaded it. Its existing flags were raised on the old values and are
+deleted in the same transaction, so the new job's fraud run evaluates the
+claim afresh.
+"""
+import csv
+import io
+import json
+import uuid
+from collections import Counter
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.csv_validator import ValidationError
+
+
+# Rows buffered before one COPY round-trip and commit
+COPY_CHUNK_SIZE = 10000
+
+DATE_FORMATS = ['%Y-%m-%d', '%Y/%m/%d', '%m/%d/%Y', '%d/%m/%Y']
+
+CLAIM_COPY_COLUMNS = (
+    'id', 'tenant_id', 'ingestion_id', 'claim_id', 'patient_id', 'rx_number', 'ndc',
+    'drug_name', 'prescriber_npi', 'pharmacy_npi', 'fill_date', 'days_supply', 'quantity',
+    'copay_amount', 'plan_paid_amount', 'ingredient_cost', 'usual_and_customary', 'plan_id',
+    'state', 'claim_status', 'submitted_at', 'reversal_date',
+    'amount', 'prescription_date', 'reversal_indicator', 'pa_required', 'created_at',
+)
+
+# Columns an upsert overwrites; the stored row keeps its id, tenant, claim_id and created_at
+CLAIM_UPSERT_COLUMNS = tuple(
+    column for column in CLAIM_COPY_COLUMNS
+    if column not in ('id', 'tenant_id', 'claim_id', 'created_at')
+)
+
+# How rows whose (tenant_id, claim_id) is already stored are handled
+INGEST_MODE_INSERT_NEW = 'insert_new'  # keep the stored claim, skip the row
+INGEST_MODE_UPSERT = 'upsert'          # overwrite the stored claim with the row
+INGEST_MODE_PROBE = 'probe'            # only count new vs. existing rows; no claims are written
+INGEST_MODES = (INGEST_MODE_INSERT_NEW, INGEST_MODE_UPSERT, INGEST_MODE_PROBE)
+
+ERROR_COPY_COLUMNS = (
+    'id', 'tenant_id', 'ingestion_id', 'row_number', 'error_message', 'raw_row_data', 'created_at',
+)
+
+
+def parse_date(value):
+    # Parquet/Arrow date columns arrive as dates already
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not value:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        parsed = parse_date(value)
+        return datetime.combine(parsed, datetime.min.time()) if parsed else None
+
+
+def parse_int(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        return int(float(value))
+    return int(value)
+
+
+def parse_decimal(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, float):
+        # The shortest repr, so 0.1 is stored as 0.1 rather than its binary expansion
+        return Decimal(repr(value))
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        return None
+
+
+def claim_values(row: dict, claim_uuid, tenant_id: str, job_id: str, created_at: datetime, fill_date=None) -> tuple:
+    """Convert one validated row (CSV text, or typed Parquet/Arrow values) into a tuple ordered like CLAIM_COPY_COLUMNS."""
+    if fill_date is None:
+        fill_date = parse_date(row.get('fill_date'))
+    copay_amount = parse_decimal(row.get('copay_amount'))
+    plan_paid_amount = parse_decimal(row.get('plan_paid_amount'))
+    claim_status = (row.get('claim_status') or '').upper() or None
+
+    return (
+        claim_uuid,
+        tenant_id,
+        job_id,
+        row.get('claim_id'),
+        row.get('patient_id'),
+        row.get('rx_number') or None,
+        row.get('ndc'),
+        row.get('drug_name') or None,
+        row.get('prescriber_npi') or None,
+        row.get('pharmacy_npi') or None,
+        fill_date,
+        parse_int(row.get('days_supply')),
+        parse_int(row.get('quantity')),
+        copay_amount,
+        plan_paid_amount,
+        parse_decimal(row.get('ingredient_cost')),
+        parse_decimal(row.get('usual_and_customary')),
+        row.get('plan_id') or None,
+        (row.get('state') or '').upper() or None,
+        claim_status,
+        parse_datetime(row.get('submitted_at')),
+        parse_date(row.get('reversal_date')),
+        # Legacy fields still read by the claims API and older rules
+        (copay_amount or 0) + (plan_paid_amount or 0),
+        fill_date,
+        claim_status == 'REVERSED',
+        False,
+        created_at,
+    )
+
+
+class ClaimCopyLoader:
+    """
+    Buffers accepted claims and rejected rows for one ingestion job and
+    writes each chunk with two COPY FROM STDIN streams in one transaction.
+
+    new_count / existing_count tally accepted rows whose claim_id was not /
+    was already stored for the tenant when their chunk was written, and
+    skipped_count the rows that wrote nothing because insert_new kept the
+    stored claim.
+    Rejected rows are counted per error code in error_counts, but only the
+    first error_row_cap of a job (across all its chunks) are stored.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        tenant_id: str,
+        job_id: str,
+        chunk_size: int = COPY_CHUNK_SIZE,
+        mode: str = INGEST_MODE_INSERT_NEW,
+        error_row_cap: int = None
+    ):
+        if mode not in INGEST_MODES:
+            raise ValueError(f"Unknown ingest mode: {mode}")
+        self.db = db
+        self.tenant_id = tenant_id
+        self.job_id = job_id
+        self.chunk_size = chunk_size
+        self.mode = mode
+        self.new_count = 0
+        self.existing_count = 0
+        self.skipped_count = 0
+        self.error_row_cap = settings.INGESTION_ERROR_ROW_CAP if error_row_cap is None else error_row_cap
+        self.error_counts = Counter()
+        self._error_rows_full = False
+        self._claims: List[tuple] = []
+        self._errors: List[tuple] = []
+
+    @property
+    def pending(self) -> int:
+        return len(self._claims) + len(self._errors)
+
+    def add_claim(self, row: dict, fill_date=None) -> uuid.UUID:
+        """Buffer a valid row; pass fill_date when validation already parsed it."""
+        # Ids are generated here; a row that updates a stored claim takes that claim's id instead
+        claim_uuid = uuid.uuid4()
+        self._claims.append(claim_values(row, claim_uuid, self.tenant_id, self.job_id, datetime.utcnow(), fill_date))
+        return claim_uuid
+
+    def add_error(self, error: ValidationError, row: dict):
+        self.error_counts[error.error_code] += 1
+        if self._error_rows_full:
+            return
+        self._errors.append((
+            uuid.uuid4(),
+            self.tenant_id,
+            self.job_id,
+            error.row_number,
+            f"{error.error_code}: {error.error_message}",
+            json.dumps(row, default=str, separators=(',', ':')),
+            datetime.utcnow(),
+        ))
+
+    def flush(self) -> List[str]:
+        """
+        COPY the buffered rows and commit. Returns the ids of the claims
+        inserted or updated (for an update, the id of the stored claim).
+        """
+        if not self._claims and not self._errors:
+            return []
+
+        self._pin_tenant()
+        claim_ids = self._load_claims() if self._claims else []
+
+        # Reserved in the same transaction as the COPY, so a failed flush gives
+        # its slots back; last, so the job row lock is held only for the error COPY
+        granted = self._reserve_error_rows(len(self._errors)) if self._errors else 0
+        self._errors = self._errors[:granted]
+
+        cursor = self.db.connection().connection.cursor()
+        try:
+            if self._errors:
+                cursor.copy_expert(
+                    f"COPY ingestion_errors ({', '.join(ERROR_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                    _csv_buffer(self._errors)
+                )
+        finally:
+            cursor.close()
+
+        self.db.commit()
+
+        self._claims = []
+        self._errors = []
+        return claim_ids
+
+    def _pin_tenant(self):
+        # The pooled connection may not be the one the session-level SET ran on,
+        # so pin the tenant for this transaction before COPY hits RLS.
+        self.db.execute(
+            text("SELECT set_config('app.current_tenant_id', :tenant_id, true)"),
+            {"tenant_id": self.tenant_id}
+        )
+
+    def _reserve_error_rows(self, wanted: int) -> int:
+        """
+        Claim up to wanted of the job's remaining stored-error slots; returns how many were granted.
+
+        Runs inside the flush transaction: the row lock on the job serializes
+        chunks of the same upload until the commit.
+        """
+        granted = self.db.execute(
+            text("""
+                UPDATE ingestion_jobs j
+                SET error_rows_stored = LEAST(:cap, before.stored + :wanted)
+                FROM (
+                    SELECT id, COALESCE(error_rows_stored, 0) AS stored
+                    FROM ingestion_jobs WHERE id = :job_id FOR UPDATE
+                ) before
+                WHERE j.id = before.id
+                RETURNING GREATEST(j.error_rows_stored - before.stored, 0)
+            """),
+            {"cap": self.error_row_cap, "wanted": wanted, "job_id": str(self.job_id)}
+        ).scalar() or 0
+        if granted < wanted:
+            self._error_rows_full = True
+        return granted
+
+    def _load_claims(self) -> List[str]:
+        columns = ', '.join(CLAIM_COPY_COLUMNS)
+
+        self.db.execute(text("CREATE TEMP TABLE claims_staging (LIKE claims INCLUDING DEFAULTS) ON COMMIT DROP"))
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY claims_staging ({columns}) FROM STDIN WITH (FORMAT csv)",
+                _csv_buffer(self._claims)
+            )
+        finally:
+            cursor.close()
+
+        existing = self.db.execute(text("""
+            SELECT count(*) FROM claims_staging s
+            WHERE EXISTS (
+                SELECT 1 FROM claims c
+                WHERE c.tenant_id = s.tenant_id AND c.claim_id = s.claim_id
+            )
+        """)).scalar()
+        self.existing_count += existing
+        self.new_count += len(self._claims) - existing
+
+        if self.mode == INGEST_MODE_PROBE:
+            return []
+
+        if self.mode == INGEST_MODE_UPSERT:
+            conflict = "DO UPDATE SET " + ", ".join(f"{column} = EXCLUDED.{column}" for column in CLAIM_UPSERT_COLUMNS)
+        else:
+            conflict = "DO NOTHING"
+
+        # xmax is non-zero on a row version written by the DO UPDATE branch
+        written = self.db.execute(text(f"""
+            INSERT INTO claims ({columns})
+            SELECT {columns} FROM claims_staging
+            ON CONFLICT (tenant_id, claim_id) {conflict}
+            RETURNING id, xmax <> 0 AS updated
+        """)).fetchall()
+        self.skipped_count += len(self._claims) - len(written)
+
+        updated = [row[0] for row in written if row[1]]
+        if updated:
+            self.db.execute(
+                text("DELETE FROM flagged_claims WHERE tenant_id = :tenant_id AND claim_id = ANY(:claim_ids)"),
+                {"tenant_id": self.tenant_id, "claim_ids": updated}
+            )
+        return [str(row[0]) for row in written]
+
+
+def _csv_buffer(records: List[tuple]) -> io.StringIO:
+    # csv.writer renders None as an unquoted empty field, which COPY reads as NULL;
+    # everything else (UUIDs, dates, Decimals, bools) uses its str() form.
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(records)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,227 @@
+"""
+Row reader for Parquet and Arrow IPC uploads.
+
+Files are read one record batch at a time. Numeric and date columns that
+the claims table stores as numbers and dates keep their Arrow type: they
+are screened against the validator's limits with Arrow compute kernels and
+reach the loader as Python numbers and dates, so they are never printed
+and parsed back. Every other column is converted to the text form the CSV
+path produces (trimmed strings, '' for nulls) and validated like CSV.
+pyarrow is imported lazily, when the first such file arrives.
+"""
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.services.csv_validator import CSVValidator
+
+
+PARQUET_MAGIC = b'PAR1'
+ARROW_FILE_MAGIC = b'ARROW1'
+# Arrow IPC streams start with a continuation marker rather than a magic string
+ARROW_STREAM_MARKER = b'\xff\xff\xff\xff'
+
+COLUMNAR_SUFFIXES = ('.parquet', '.arrow', '.feather', '.arrows')
+
+# Rows per record batch read from the file
+RECORD_BATCH_ROWS = 10000
+
+# Whole-number fields and their (minimum, maximum), as validated for CSV
+WHOLE_NUMBER_FIELDS = {
+    'quantity': (CSVValidator.MIN_QUANTITY, CSVValidator.MAX_QUANTITY),
+    'days_supply': (CSVValidator.MIN_DAYS_SUPPLY, CSVValidator.MAX_DAYS_SUPPLY),
+}
+
+# Fields kept as typed values when the file stores them as numbers or dates
+NUMERIC_FIELDS = tuple(WHOLE_NUMBER_FIELDS) + tuple(CSVValidator.AMOUNT_FIELDS)
+DATE_FIELDS = ('fill_date', 'reversal_date', 'submitted_at')
+
+
+def is_columnar_upload(filename):
+    return filename.lower().endswith(COLUMNAR_SUFFIXES)
+
+
+def detect_columnar_format(file_path) -> Optional[str]:
+    """'parquet', 'arrow', 'arrow_stream' or None, from a file's leading bytes."""
+    with open(file_path, mode='rb') as f:
+        head = f.read(len(ARROW_FILE_MAGIC))
+    if head.startswith(PARQUET_MAGIC):
+        return 'parquet'
+    if head.startswith(ARROW_FILE_MAGIC):
+        return 'arrow'
+    if head.startswith(ARROW_STREAM_MARKER):
+        return 'arrow_stream'
+    return None
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("Parquet/Arrow uploads require the pyarrow package on the ingestion workers")
+    return pyarrow
+
+
+class ColumnarRowReader:
+    """
+    Lazily yields rows from a Parquet or Arrow IPC file as dicts.
+
+    Values are trimmed strings ('' for nulls), except typed numeric and
+    date columns, which hold ints, floats, Decimals, dates or datetimes.
+    iter_batches also returns, per typed numeric column, whether each value
+    passed the validator's range check. Exposes the same headers /
+    fieldnames / encoding / compression attributes as CSVRowReader so the
+    worker can treat both alike.
+    """
+
+    encoding = None
+    compression = None
+
+    def __init__(self, file_path, file_format):
+        self._pa = _import_pyarrow()
+        self.file_format = file_format
+
+        if file_format == 'parquet':
+            self._file = self._pa.parquet.ParquetFile(file_path)
+            schema = self._file.schema_arrow
+        else:
+            self._source = self._pa.memory_map(file_path)
+            if file_format == 'arrow':
+                self._file = self._pa.ipc.open_file(self._source)
+            else:
+                self._file = self._pa.ipc.open_stream(self._source)
+            schema = self._file.schema
+
+        self.fieldnames = list(schema.names)
+        self.headers = [name.strip() for name in self.fieldnames if name]
+
+    def __iter__(self) -> Iterator[Dict[str, object]]:
+        for rows, _ in self.iter_batches(RECORD_BATCH_ROWS):
+            yield from rows
+
+    def iter_batches(self, batch_size: int) -> Iterator[Tuple[List[Dict[str, object]], Dict[str, List[bool]]]]:
+        """
+        Yield (rows, screens) for up to batch_size rows at a time.
+
+        screens maps each typed numeric field to one flag per row: True
+        where the value is null or within the validator's limits, as
+        CSVValidator.validate_batch expects.
+        """
+        for record_batch in self._record_batches():
+            for offset in range(0, record_batch.num_rows, batch_size):
+                yield self._batch_rows(record_batch.slice(offset, batch_size))
+
+    def _record_batches(self):
+        if self.file_format == 'parquet':
+            yield from self._file.iter_batches(batch_size=RECORD_BATCH_ROWS)
+        elif self.file_format == 'arrow':
+            for index in range(self._file.num_record_batches):
+                yield self._file.get_batch(index)
+        else:
+            yield from self._file
+
+    def _batch_rows(self, batch) -> Tuple[List[Dict[str, object]], Dict[str, List[bool]]]:
+        pa = self._pa
+        names = []
+        columns = []
+        screens = {}
+        for name, column in zip(batch.schema.names, batch.columns):
+            if not name:
+                continue
+            name = name.strip()
+            if pa.types.is_dictionary(column.type):
+                column = column.dictionary_decode()
+            
+            if name in NUMERIC_FIELDS and self._is_numeric(column.type):
+                screens[name] = self._numeric_screen(name, column)
+                values = column.to_pylist()
+            elif name in DATE_FIELDS and (pa.types.is_timestamp(column.type) or pa.types.is_date(column.type)):
+                values = self._temporal_values(column)
+            else:
+                values = self._column_as_text(column).to_pylist()
+                names.append(name)
+                columns.append(values)
+                continue
+            
+            names.append(name)
+            columns.append(['' if value is None else value for value in values])
+        
+        rows = [dict(zip(names, values)) for values in zip(*columns)]
+        return rows, screens
+
+    def _is_numeric(self, column_type) -> bool:
+        types = self._pa.types
+        return types.is_integer(column_type) or types.is_floating(column_type) or types.is_decimal(column_type)
+
+    def _numeric_screen(self, name, column) -> List[bool]:
+        """Range check in Arrow; a value that fails is handed to the validator's own check for its error."""
+        pa = self._pa
+        pc = pa.compute
+        
+        if not pa.types.is_integer(column.type):
+            column = pc.cast(column, pa.float64())
+        
+        if name in WHOLE_NUMBER_FIELDS:
+            minimum, maximum = WHOLE_NUMBER_FIELDS[name]
+            # The CSV path truncates with int(float(value)); NaN and infinity fail both comparisons
+            whole = column if pa.types.is_integer(column.type) else pc.trunc(column)
+            passed = pc.and_(pc.greater_equal(whole, minimum), pc.less_equal(whole, maximum))
+        else:
+            passed = pc.invert(pc.greater(column, CSVValidator.MAX_AMOUNT))
+        
+        return pc.fill_null(passed, True).to_pylist()
+
+    def _temporal_values(self, column) -> list:
+        """
+        Dates for date columns and for midnight timestamps, which is how
+        most writers store plain dates; other timestamps stay datetimes.
+        Zoned timestamps are taken at their UTC time.
+        """
+        pa = self._pa
+        pc = pa.compute
+        column_type = column.type
+        
+        if pa.types.is_date(column_type):
+            return pc.cast(column, pa.date32()).to_pylist()
+        
+        if column_type.tz is not None or column_type.unit == 'ns':
+            column = pc.cast(column, pa.timestamp('us'), safe=False)
+        midnight = pc.equal(column, pc.floor_temporal(column, unit='day'))
+        dates = pc.cast(column, pa.date32()).to_pylist()
+        return [
+            day if is_midnight else value
+            for day, value, is_midnight in zip(dates, column.to_pylist(), midnight.to_pylist())
+        ]
+
+    def _column_as_text(self, column):
+        pa = self._pa
+        pc = pa.compute
+        column_type = column.type
+
+        if pa.types.is_floating(column_type):
+            # Whole numbers print without a trailing ".0", as a CSV export would write them
+            whole = pc.and_(pc.equal(column, pc.trunc(column)), pc.less(pc.abs(column), 2 ** 53))
+            as_int = pc.cast(column, pa.int64(), safe=False)
+            column = pc.if_else(whole, pc.cast(as_int, pa.string()), pc.cast(column, pa.string()))
+        elif not pa.types.is_string(column_type):
+            column = pc.cast(column, pa.string())
+
+        column = pc.utf8_trim_whitespace(column)
+        return pc.fill_null(column, '')
+
+    def close(self):
+        if self.file_format == 'parquet':
+            self._file.close()
+        else:
+            self._source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_columnar_rows(file_path, file_format) -> ColumnarRowReader:
+    return ColumnarRowReader(file_path, file_format)
@@ -1,85 +1,359 @@
+import codecs
 import csv
+import gzip
+import io
 import os
+import re
+import zipfile
 from io import StringIO
 
 
-def read_csv_file(file_path=None, csv_content=None):
+# Bytes inspected to decide a file's encoding; the rest is decoded once, as it is read
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# Stray non-UTF-8 bytes later in a UTF-8 file decode as Latin-1 instead of failing the upload
+UTF8_FALLBACK_ERRORS = 'latin1_fallback'
+
+# Encodings where a b'\n' / b'"' byte is always that character, so byte offsets can split rows
+BYTE_SPLITTABLE_ENCODINGS = {'utf-8', 'utf-8-sig', 'latin-1'}
+
+# Bytes read after each cut when planning chunk boundaries
+RESYNC_WINDOW_BYTES = 1024 * 1024
+
+# Records that must parse cleanly after a newline before it is taken as a record start
+RESYNC_ROWS = 8
+
+# Accepted upload names; compressed files are recognised by content, not by name
+UPLOAD_SUFFIXES = ('.csv', '.csv.gz', '.zip')
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZIP_MAGIC = b'PK\x03\x04'
+
+
+def _latin1_fallback(error):
+    return error.object[error.start:error.end].decode('latin-1'), error.end
+
+
+codecs.register_error(UTF8_FALLBACK_ERRORS, _latin1_fallback)
+
+
+class CSVRowReader:
+    """
+    Lazily yields cleaned rows from a CSV text stream.
+
+    The header line is read up front so structure can be validated before
+    any data rows are consumed; rows are decoded and cleaned one at a time.
     """
-    Read CSV from either file path OR csv_content string
-    
+
+    def __init__(self, f, fieldnames=None, encoding=None, compression=None, owned=()):
+        self._file = f
+        # Files the stream reads through (e.g. the archive under a decompressor), closed after it
+        self._owned = list(owned)
+        self.compression = compression
+        self._reader = csv.DictReader(f, fieldnames=fieldnames)
+        self.encoding = encoding
+        # Raw header cells, as needed to read a later byte range of the same file
+        self.fieldnames = self._reader.fieldnames or []
+        self.headers = [k.strip() for k in self.fieldnames if k]
+
+    def __iter__(self):
+        if not self.headers:
+            return iter(())
+        return iter_csv_rows(self._reader)
+
+    def close(self):
+        self._file.close()
+        for f in reversed(self._owned):
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_csv_rows(reader):
+    """Yield each row of a csv.DictReader with keys and values stripped."""
+    for row in reader:
+        yield _clean_row(row)
+
+
+def open_csv_rows(file_path=None, csv_content=None):
+    """
+    Open a CSV for streaming from either file path OR csv_content string
+
     Args:
-        file_path: Path to CSV file (legacy support)
-        csv_content: CSV content as string (new method for Koyeb)
+        file_path: Path to CSV file
+        csv_content: CSV content as string (inline payloads)
+
+    Returns:
+        CSVRowReader; close it (or use it as a context manager) when done
     """
-    
-    # NEW: If csv_content is provided, use it directly
     if csv_content is not None:
-        return _parse_csv_content(csv_content)
-    
-    # OLD: Fallback to file reading (for local development)
+        if isinstance(csv_content, bytes):
+            csv_content = _decode_content(csv_content)
+        return CSVRowReader(StringIO(csv_content))
+
     if file_path:
         if not os.path.exists(file_path):
             raise ValueError(f"File not found: {file_path}")
-        
-        encodings = ['utf-8-sig', 'utf-16', 'utf-8', 'latin-1']
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, mode='r', encoding=encoding) as f:
-                    content = f.read()
-                return _parse_csv_content(content)
-            except UnicodeError:
+
+        # Buffer sized to the sample so peek() sees the whole prefix without consuming it
+        raw = open(file_path, mode='rb', buffering=ENCODING_SAMPLE_SIZE)
+        owned = []
+        try:
+            compression = detect_compression(raw.peek(len(ZIP_MAGIC)))
+            if compression:
+                owned.append(raw)
+                raw = _open_decompressed(raw, compression, owned)
+            encoding = detect_encoding(raw.peek(ENCODING_SAMPLE_SIZE)[:ENCODING_SAMPLE_SIZE])
+            stream = io.TextIOWrapper(raw, encoding=encoding, errors=_errors_for(encoding), newline='')
+        except Exception:
+            raw.close()
+            for f in reversed(owned):
+                f.close()
+            raise
+        return CSVRowReader(stream, encoding=encoding, compression=compression, owned=owned)
+
+    raise ValueError("Must provide either file_path or csv_content")
+
+
+def is_supported_upload(filename):
+    return filename.lower().endswith(UPLOAD_SUFFIXES)
+
+
+def detect_compression(sample: bytes):
+    """'gzip', 'zip' or None, from a file's magic bytes."""
+    if sample.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if sample.startswith(ZIP_MAGIC):
+        return 'zip'
+    return None
+
+
+def _open_decompressed(raw, compression, owned):
+    """
+    Wrap a compressed file in a decompressing stream that inflates as it is read.
+
+    A ZIP must hold exactly one .csv member. Anything the returned stream
+    reads through is appended to owned so the caller can close it.
+    """
+    if compression == 'gzip':
+        member = gzip.GzipFile(fileobj=raw, mode='rb')
+    else:
+        archive = zipfile.ZipFile(raw)
+        owned.append(archive)
+        names = [
+            info.filename for info in archive.infolist()
+            if not info.is_dir()
+            and info.filename.lower().endswith('.csv')
+            and not info.filename.startswith('__MACOSX/')
+        ]
+        if len(names) != 1:
+            raise ValueError(f"ZIP archive must contain exactly one CSV file, found {len(names)}")
+        member = archive.open(names[0])
+    # Buffered like the plain file so detect_encoding can peek at the inflated prefix
+    return io.BufferedReader(member, buffer_size=ENCODING_SAMPLE_SIZE)
+
+
+def read_csv_file(file_path=None, csv_content=None):
+    """
+    Read CSV from either file path OR csv_content string into a list of dicts.
+
+    Kept for callers that need every row at once; ingestion streams with
+    open_csv_rows instead.
+    """
+    with open_csv_rows(file_path=file_path, csv_content=csv_content) as rows:
+        return list(rows)
+
+
+def open_csv_chunk(file_path, start, end, fieldnames, encoding):
+    """Stream the data rows in bytes [start, end) of a file split by plan_csv_chunks."""
+    if encoding == 'utf-8-sig':
+        # The BOM is only at the start of the file, before the header
+        encoding = 'utf-8'
+    return CSVRowReader(_open_text_range(file_path, start, end, encoding), fieldnames=fieldnames, encoding=encoding)
+
+
+def count_csv_chunk_rows(file_path, start, end, encoding):
+    """
+    Count the data rows in bytes [start, end) the way CSVRowReader yields them.
+
+    Blank lines are skipped and a quoted field's newlines stay inside its
+    record, so row numbers built from these counts match ingestion's.
+    """
+    if encoding == 'utf-8-sig':
+        encoding = 'utf-8'
+    with _open_text_range(file_path, start, end, encoding) as stream:
+        return sum(1 for record in csv.reader(stream) if record)
+
+
+def _open_text_range(file_path, start, end, encoding):
+    raw = io.BufferedReader(_ByteRange(open(file_path, mode='rb'), start, end))
+    return io.TextIOWrapper(raw, encoding=encoding, errors=_errors_for(encoding), newline='')
+
+
+def plan_csv_chunks(file_path, chunk_bytes, field_count):
+    """
+    Split a CSV's data rows into byte ranges of roughly chunk_bytes.
+
+    Only the bytes after each cut are read: the range ends at the first
+    newline past every chunk_bytes offset that starts a record (see
+    _resync), so quoted fields with embedded newlines stay whole. This
+    assumes RFC 4180 quoting (quotes only around whole fields) and a
+    byte-splittable encoding. A cut with no record start in reach is
+    skipped, making that range larger. Returns a list of (start, end);
+    count_csv_chunk_rows gives each range's row count.
+    """
+    size = os.path.getsize(file_path)
+    ranges = []
+
+    with open(file_path, mode='rb') as f:
+        start = _header_end(f)
+        if start is None or start >= size:
+            return []
+
+        cut = start + chunk_bytes
+        while cut < size:
+            end = _resync(f, cut, field_count)
+            if end is None:
+                cut += chunk_bytes
                 continue
-            except Exception as e:
+            if end >= size:
+                break
+            ranges.append((start, end))
+            start = end
+            cut = start + chunk_bytes
+
+    ranges.append((start, size))
+    return ranges
+
+
+def _header_end(f):
+    """Offset just past the header record, or None when the file has no complete header line."""
+    f.seek(0)
+    in_quotes = False
+    offset = 0
+    for block in iter(lambda: f.read(RESYNC_WINDOW_BYTES), b''):
+        for match in re.finditer(rb'["\n]', block):
+            if match.group() == b'"':
+                in_quotes = not in_quotes
+            elif not in_quotes:
+                return offset + match.end()
+        offset += len(block)
+    return None
+
+
+def _resync(f, offset, field_count):
+    """
+    The first record start after offset, or None if none is found within RESYNC_WINDOW_BYTES.
+
+    A newline inside a quoted field looks like any other, so each newline is
+    tried in turn: the text after it must parse, in strict mode, as
+    RESYNC_ROWS records of field_count cells (or as such records up to the
+    end of the file). Starting inside a quoted field trips over the field's
+    closing quote or leaves the cell counts wrong.
+    """
+    f.seek(offset)
+    window = f.read(RESYNC_WINDOW_BYTES)
+    at_eof = not f.read(1)
+    # One character per byte; quotes, commas and newlines are ASCII in every splittable encoding
+    text = window.decode('latin-1')
+
+    newline = text.find('\n')
+    while newline != -1:
+        if _starts_records(text[newline + 1:], field_count, at_eof):
+            return offset + newline + 1
+        newline = text.find('\n', newline + 1)
+    return None
+
+
+def _starts_records(text, field_count, at_eof):
+    records = 0
+    try:
+        for record in csv.reader(io.StringIO(text, newline=''), strict=True):
+            # Blank lines are skipped, as DictReader does
+            if not record:
                 continue
-        
-        raise ValueError(f"Failed to read file: {file_path}. Ensure it is a valid CSV with supported encoding (UTF-8, UTF-16).")
-    
-    raise ValueError("Must provide either file_path or csv_content")
+            if len(record) != field_count:
+                return False
+            records += 1
+            if records == RESYNC_ROWS:
+                return True
+    except csv.Error:
+        return False
+    # Fewer records than RESYNC_ROWS are only conclusive when the window reached the end of the file
+    return at_eof
+
 
+class _ByteRange(io.RawIOBase):
+    """Read-only view of bytes [start, end) of an open binary file."""
 
-def _parse_csv_content(content):
+    def __init__(self, f, start, end):
+        self._file = f
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[:min(len(buffer), self._remaining)]
+        read = self._file.readinto(view)
+        self._remaining -= read
+        return read
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def detect_encoding(sample: bytes) -> str:
     """
-    Parse CSV content string into list of dicts
-    
-    Args:
-        content: CSV content as string
-    
-    Returns:
-        List of dicts with cleaned data
+    Decide a CSV's encoding from its leading bytes.
+
+    A BOM wins; otherwise NUL bytes on alternating positions mean BOM-less
+    UTF-16, a sample that decodes as UTF-8 means UTF-8, and anything else
+    is treated as Latin-1.
     """
-    encodings_to_try = ['utf-8-sig', 'utf-16', 'utf-8', 'latin-1']
-    
-    for encoding in encodings_to_try:
-        try:
-            # If content is bytes, decode it
-            if isinstance(content, bytes):
-                content = content.decode(encoding)
-            
-            f_io = StringIO(content)
-            reader = csv.DictReader(f_io)
-            
-            if reader.fieldnames is None:
-                return []
-            
-            data = []
-            f_io.seek(0)
-            reader = csv.DictReader(f_io)
-            
-            for row in reader:
-                clean_row = {}
-                for k, v in row.items():
-                    if k:
-                        clean_k = k.strip()
-                        clean_v = v.strip() if v else v
-                        clean_row[clean_k] = clean_v
-                data.append(clean_row)
-            
-            return data
-            
-        except (UnicodeError, UnicodeDecodeError):
-            continue
-        except Exception as e:
-            continue
-    
-    raise ValueError("Failed to parse CSV content. Ensure it is valid CSV with supported encoding.")
\ No newline at end of file
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+
+    if b'\x00' in sample:
+        even_nuls = sample[0::2].count(0)
+        odd_nuls = sample[1::2].count(0)
+        if odd_nuls > even_nuls:
+            return 'utf-16-le'
+        if even_nuls > odd_nuls:
+            return 'utf-16-be'
+
+    try:
+        # Not final: the sample may end partway through a multi-byte character
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def _errors_for(encoding):
+    return UTF8_FALLBACK_ERRORS if encoding.startswith('utf-8') else 'strict'
+
+
+def _decode_content(content):
+    encoding = detect_encoding(content[:ENCODING_SAMPLE_SIZE])
+    return content.decode(encoding, errors=_errors_for(encoding))
+
+
+def _clean_row(row):
+    clean_row = {}
+    for k, v in row.items():
+        if k:
+            clean_k = k.strip()
+            clean_v = v.strip() if v else v
+            clean_row[clean_k] = clean_v
+    return clean_row
@@ -1,4 +1,5 @@
 from datetime import datetime, date
+from decimal import Decimal
 from typing import Dict, Optional, List, Set
 from dataclasses import dataclass
 import re
@@ -46,9 +47,267 @@ class CSVValidator:
         'DC', 'PR', 'VI', 'GU', 'AS', 'MP'
     }
     
-    def __init__(self):
+    NDC_PATTERN = re.compile(r'^(\d{4,5}-\d{3,4}-\d{1,2}|\d{10,11})$')
+    
+    AMOUNT_FIELDS = ['copay_amount', 'plan_paid_amount', 'ingredient_cost', 'usual_and_customary']
+    
+    DATE_FORMATS = ['%Y-%m-%d', '%Y/%m/%d', '%m/%d/%Y', '%d/%m/%Y']
+    
+    # Non-empty fill_date values used to decide a file's date format
+    DATE_SNIFF_SAMPLE = 200
+    
+    # Rows validated together by validate_batch
+    BATCH_SIZE = 2000
+    
+    def __init__(self, shared_claim_ids=None, date_format: Optional[str] = None):
         self.seen_claim_ids: Set[str] = set()
+        # Set shared by every chunk of a split file; has add_many(ids) -> [is_new, ...]
+        self.shared_claim_ids = shared_claim_ids
         self.errors: List[ValidationError] = []
+        self.date_format: Optional[str] = None
+        self._date_parser = None
+        # Chunks of a split file take the format sniffed once from its start
+        if date_format:
+            self.use_date_format(date_format)
+        # Parsed fill_date per row of the last validate_batch call (None where not reached)
+        self.fill_dates: List[Optional[date]] = []
+    
+    def validate_batch(
+        self,
+        rows: List[Dict[str, str]],
+        first_row_number: int,
+        screens: Optional[Dict[str, List[bool]]] = None
+    ) -> List[Optional[ValidationError]]:
+        """
+        Validate a chunk of rows column by column.
+        
+        Returns one entry per row, identical to what validate_row would give
+        for the same rows in order. Each check screens a whole column with a
+        cheap test and hands only suspect values to the per-row check, so
+        codes and messages come from the same code path. The duplicate check
+        runs sequentially, after required fields and lengths as in validate_row.
+        Rows with missing trailing cells (None values) go through
+        validate_row as-is. A check that raises gives the row an E999 error,
+        as ingestion did for exceptions out of validate_row.
+        
+        Parquet/Arrow rows may hold typed numbers and dates instead of text.
+        screens gives, for such numeric fields, the result of the range
+        check already run on the Arrow column; it replaces the text screen,
+        and typed fill dates are taken as they are.
+        """
+        screens = screens or {}
+        results: List[Optional[ValidationError]] = [None] * len(rows)
+        self.fill_dates = [None] * len(rows)
+        row_numbers = range(first_row_number, first_row_number + len(rows))
+        slow = [None in row.values() for row in rows]
+        pending = [i for i in range(len(rows)) if not slow[i]]
+        
+        columns = {}
+        
+        def column(field):
+            if field not in columns:
+                values = [''] * len(rows)
+                for i in pending:
+                    value = rows[i].get(field, '')
+                    values[i] = value.strip() if isinstance(value, str) else value
+                columns[field] = values
+            return columns[field]
+        
+        def fail(i, error):
+            if error is not None and results[i] is None:
+                results[i] = error
+        
+        for field in self.REQUIRED_FIELDS:
+            values = column(field)
+            for i in pending:
+                if values[i] == '' and results[i] is None:
+                    results[i] = ValidationError(
+                        row_number=row_numbers[i],
+                        error_code="E001",
+                        error_message=f"Required field missing or empty: {field}",
+                        field_name=field
+                    )
+        
+        for field, max_length in self.MAX_FIELD_LENGTH.items():
+            values = column(field)
+            for i in pending:
+                if len(values[i]) > max_length:
+                    fail(i, self._run_check(self._validate_field_lengths, rows[i], row_numbers[i]))
+        
+        if self.shared_claim_ids is None:
+            # Sequential: which row counts as the duplicate depends on file order
+            for i, row in enumerate(rows):
+                if slow[i]:
+                    results[i] = self._run_check(self.validate_row, row, row_numbers[i])
+                elif results[i] is None:
+                    results[i] = self._validate_duplicate_claim(row, row_numbers[i])
+        else:
+            # One round trip for the batch; across chunks the first to register an id keeps it
+            candidates = []
+            for i, row in enumerate(rows):
+                if slow[i]:
+                    results[i] = self._run_check(self.validate_row, row, row_numbers[i])
+                if results[i] is None:
+                    candidates.append(i)
+            
+            claim_ids = [rows[i].get('claim_id', '').strip() for i in candidates]
+            for i, claim_id, is_new in zip(candidates, claim_ids, self.shared_claim_ids.add_many(claim_ids)):
+                if not is_new:
+                    results[i] = self._duplicate_error(claim_id, row_numbers[i])
+        
+        pending = [i for i in pending if results[i] is None]
+        
+        numeric_checks = [
+            ('quantity', self._whole_number_screen(self.MIN_QUANTITY, self.MAX_QUANTITY), self._validate_quantity),
+            ('days_supply', self._whole_number_screen(self.MIN_DAYS_SUPPLY, self.MAX_DAYS_SUPPLY), self._validate_days_supply),
+        ]
+        other_checks = [
+            ('ndc', lambda v: not v or self.NDC_PATTERN.match(v) is not None, self._validate_ndc),
+            ('claim_status', lambda v: not v or v.upper() in self.VALID_CLAIM_STATUSES, self._validate_claim_status),
+            ('state', lambda v: not v or v.upper() in self.VALID_STATES, self._validate_state),
+        ]
+        other_checks += [(field, self._amount_screen, self._validate_amounts) for field in self.AMOUNT_FIELDS]
+        
+        def run_checks(checks):
+            for field, screen, validate in checks:
+                values = column(field)
+                passed = screens.get(field)
+                for i in pending:
+                    if results[i] is None and not (passed[i] if passed is not None else screen(values[i])):
+                        fail(i, self._run_check(validate, rows[i], row_numbers[i]))
+        
+        run_checks(numeric_checks)
+        
+        # fill_date is parsed here once and kept for claim creation
+        values = column('fill_date')
+        if self.date_format is None:
+            self.sniff_date_format(values[i] for i in pending if isinstance(values[i], str))
+        for i in pending:
+            if results[i] is None and values[i] != '':
+                value = values[i]
+                if isinstance(value, str):
+                    self.fill_dates[i] = self.parse_fill_date(value)
+                elif type(value) is date:
+                    self.fill_dates[i] = value
+                if self.fill_dates[i] is None:
+                    fail(i, self._run_check(self._validate_fill_date, rows[i], row_numbers[i]))
+        
+        run_checks(other_checks)
+        
+        return results
+    
+    def sniff_date_format(self, values) -> Optional[str]:
+        """Pick the format that parses most of a sample of fill_date values (ties keep DATE_FORMATS order)."""
+        sample = []
+        for value in values:
+            if value:
+                sample.append(value)
+                if len(sample) >= self.DATE_SNIFF_SAMPLE:
+                    break
+        
+        best_format, best_count = None, 0
+        for fmt in self.DATE_FORMATS:
+            count = sum(1 for value in sample if self._strptime_date(value, fmt) is not None)
+            if count > best_count:
+                best_format, best_count = fmt, count
+        
+        if best_format:
+            self.use_date_format(best_format)
+        return best_format
+    
+    def use_date_format(self, fmt: str) -> None:
+        self.date_format = fmt
+        self._date_parser = self._fast_date_parser(fmt)
+    
+    def parse_fill_date(self, value: str) -> Optional[date]:
+        """Parse with the file's sniffed format, falling back to every accepted format for outliers."""
+        if self._date_parser is not None:
+            parsed = self._date_parser(value)
+            if parsed is not None:
+                return parsed
+        return self._parse_date_any_format(value)
+    
+    @classmethod
+    def _parse_date_any_format(cls, value: str) -> Optional[date]:
+        for fmt in cls.DATE_FORMATS:
+            parsed = cls._strptime_date(value, fmt)
+            if parsed is not None:
+                return parsed
+        return None
+    
+    @staticmethod
+    def _strptime_date(value: str, fmt: str) -> Optional[date]:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _fast_date_parser(fmt: str):
+        """
+        Split-and-int parser for one of DATE_FORMATS. It accepts a subset of
+        what strptime accepts for that format (ASCII digits, 4-digit year,
+        1-2 digit month/day) and returns None for anything else.
+        """
+        separator = fmt[2]
+        fields = fmt.split(separator)
+        year_at, month_at, day_at = fields.index('%Y'), fields.index('%m'), fields.index('%d')
+        
+        def parse(value: str) -> Optional[date]:
+            parts = value.split(separator)
+            if len(parts) != 3 or not value.isascii():
+                return None
+            year, month, day = parts[year_at], parts[month_at], parts[day_at]
+            if len(year) != 4 or not 0 < len(month) <= 2 or not 0 < len(day) <= 2:
+                return None
+            if not (year.isdigit() and month.isdigit() and day.isdigit()):
+                return None
+            try:
+                return date(int(year), int(month), int(day))
+            except ValueError:
+                return None
+        
+        return parse
+    
+    @staticmethod
+    def _cell(row: Dict[str, str], field: str) -> str:
+        """A cell as text: CSV cells stripped, typed Parquet/Arrow values printed as a CSV export would write them."""
+        value = row.get(field, '')
+        if isinstance(value, float):
+            return str(int(value)) if value.is_integer() and abs(value) < 2 ** 53 else repr(value)
+        if isinstance(value, (int, Decimal)):
+            return str(value)
+        if isinstance(value, date):
+            return value.isoformat()
+        return value.strip()
+    
+    @staticmethod
+    def _run_check(check, row: Dict[str, str], row_number: int) -> Optional[ValidationError]:
+        try:
+            return check(row, row_number)
+        except Exception as e:
+            return ValidationError(
+                row_number=row_number,
+                error_code="E999",
+                error_message=f"Unexpected error: {str(e)}"
+            )
+    
+    @staticmethod
+    def _whole_number_screen(minimum: int, maximum: int):
+        def screen(value: str) -> bool:
+            # Short ASCII digit strings are exactly what int(float(...)) accepts unchanged
+            if not value:
+                return True
+            return value.isascii() and value.isdigit() and len(value) < 16 and minimum <= int(value) <= maximum
+        return screen
+    
+    def _amount_screen(self, value: str) -> bool:
+        if not value:
+            return True
+        try:
+            return not float(value) > self.MAX_AMOUNT
+        except ValueError:
+            return False
     
     def validate_row(self, row: Dict[str, str], row_number: int) -> Optional[ValidationError]:
         
@@ -100,7 +359,7 @@ class CSVValidator:
     
     def _validate_required_fields(self, row: Dict[str, str], row_number: int) -> Optional[ValidationError]:
         for field in self.REQUIRED_FIELDS:
-            value = row.get(field, '').strip()
+            value = self._cell(row, field)
             if not value:
                 return ValidationError(
                     row_number=row_number,
@@ -111,21 +370,25 @@ class CSVValidator:
         return None
     
     def _validate_duplicate_claim(self, row: Dict[str, str], row_number: int) -> Optional[ValidationError]:
-        claim_id = row.get('claim_id', '').strip()
+        claim_id = self._cell(row, 'claim_id')
         
         if claim_id in self.seen_claim_ids:
-            return ValidationError(
-                row_number=row_number,
-                error_code="E002",
-                error_message=f"Duplicate claim_id in this file: {claim_id}",
-                field_name='claim_id'
-            )
+            return self._duplicate_error(claim_id, row_number)
         
         self.seen_claim_ids.add(claim_id)
         return None
     
+    @staticmethod
+    def _duplicate_error(claim_id: str, row_number: int) -> ValidationError:
+        return ValidationError(
+            row_number=row_number,
+            error_code="E002",
+            error_message=f"Duplicate claim_id in this file: {claim_id}",
+            field_name='claim_id'
+        )
+    
     def _validate_ndc(self, row: Dict[str, str], row_number: int) -> Optional[ValidationError]:
-        ndc = row.get('ndc', '').strip()
+        ndc = self._cell(row, 'ndc')
         
         if not ndc:
             return None
@@ -143,7 +406,7 @@ class CSVValidator:
         return None
     
     def _validate_quantity(self, row: Dict[str, str], row_number: int) -> Optional[ValidationError]:
-        quantity_str = row.get('quantity', '').strip()
+        quantity_str = self._cell(row, 'quantity')
         
         if not quantity_str:
             return None
@@ -178,7 +441,7 @@ class CSVValidator:
         return None
     
     def _validate_days_supply(self, row: Dict[str, str], row_number: int) -> Optional[ValidationError]:
-        days_str = row.get('days_supply', '').strip()
+        days_str = self._cell(row, 'days_supply')
         
         if not days_str:
             return None
@@ -213,18 +476,12 @@ class CSVValidator:
         return None
     
     def _validate_fill_date(self, row: Dict[str, str], row_number: int) -> Optional[ValidationError]:
-        date_str = row.get('fill_date', '').strip()
+        date_str = self._cell(row, 'fill_date')
         
         if not date_str:
             return None
         
-        parsed_date = None
-        for fmt in ['%Y-%m-%d', '%Y/%m/%d', '%m/%d/%Y', '%d/%m/%Y']:
-            try:
-                parsed_date = datetime.strptime(date_str, fmt).date()
-                break
-            except ValueError:
-                continue
+        parsed_date = self._parse_date_any_format(date_str)
         
         if parsed_date is None:
             return ValidationError(
@@ -240,7 +497,7 @@ class CSVValidator:
         return None
     
     def _validate_claim_status(self, row: Dict[str, str], row_number: int) -> Optional[ValidationError]:
-        status = row.get('claim_status', '').strip().upper()
+        status = self._cell(row, 'claim_status').upper()
         
         if not status:
             return None
@@ -256,7 +513,7 @@ class CSVValidator:
         return None
     
     def _validate_state(self, row: Dict[str, str], row_number: int) -> Optional[ValidationError]:
-        state = row.get('state', '').strip().upper()
+        state = self._cell(row, 'state').upper()
         
         if not state:
             return None
@@ -276,7 +533,7 @@ class CSVValidator:
         amount_fields = ['copay_amount', 'plan_paid_amount', 'ingredient_cost', 'usual_and_customary']
         
         for field in amount_fields:
-            amount_str = row.get(field, '').strip()
+            amount_str = self._cell(row, field)
             
             if not amount_str:
                 continue
@@ -304,7 +561,7 @@ class CSVValidator:
     
     def _validate_field_lengths(self, row: Dict[str, str], row_number: int) -> Optional[ValidationError]:
         for field, max_length in self.MAX_FIELD_LENGTH.items():
-            value = row.get(field, '').strip()
+            value = self._cell(row, field)
             
             if len(value) > max_length:
                 return ValidationError(
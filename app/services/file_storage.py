@@ -0,0 +1,108 @@
+"""Storage for uploaded files, addressed by small string handles that are safe to pass through Celery."""
+import os
+from abc import ABC, abstractmethod
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from app.core.config import settings
+
+
+class FileStorage(ABC):
+    """
+    Interface for upload storage backends.
+
+    A handle is "<scheme>:<key>". Workers never receive file bodies, only
+    handles, and read through local_path(), which a remote backend would
+    implement by downloading to a temporary file.
+    """
+
+    scheme = None
+
+    def new_handle(self, filename: str) -> str:
+        return self.handle(f"{uuid.uuid4()}_{Path(filename).name}")
+
+    def handle(self, key: str) -> str:
+        return f"{self.scheme}:{key}"
+
+    @abstractmethod
+    def open_write(self, handle: str) -> BinaryIO:
+        ...
+
+    @abstractmethod
+    def open_read(self, handle: str) -> BinaryIO:
+        ...
+
+    @abstractmethod
+    @contextmanager
+    def local_path(self, handle: str) -> Iterator[str]:
+        """Yield a filesystem path holding the file's contents for the duration of the block."""
+
+    @abstractmethod
+    def size(self, handle: str) -> int:
+        ...
+
+    @abstractmethod
+    def exists(self, handle: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, handle: str):
+        ...
+
+    def _key(self, handle: str) -> str:
+        scheme, _, key = handle.partition(":")
+        if scheme != self.scheme or not key:
+            raise ValueError(f"Not a {self.scheme} storage handle: {handle}")
+        return key
+
+
+class LocalFileStorage(FileStorage):
+    """Files under a directory on the shared filesystem (the API and workers must both see it)."""
+
+    scheme = "local"
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def open_write(self, handle: str) -> BinaryIO:
+        self.root.mkdir(parents=True, exist_ok=True)
+        return open(self._path(handle), "wb")
+
+    def open_read(self, handle: str) -> BinaryIO:
+        return open(self._path(handle), "rb")
+
+    @contextmanager
+    def local_path(self, handle: str) -> Iterator[str]:
+        path = self._path(handle)
+        if not path.exists():
+            raise ValueError(f"File not found: {handle}")
+        yield str(path)
+
+    def size(self, handle: str) -> int:
+        return os.path.getsize(self._path(handle))
+
+    def exists(self, handle: str) -> bool:
+        return self._path(handle).exists()
+
+    def delete(self, handle: str):
+        self._path(handle).unlink(missing_ok=True)
+
+    def _path(self, handle: str) -> Path:
+        key = self._key(handle)
+        if Path(key).name != key:
+            raise ValueError(f"Invalid storage key: {key}")
+        return self.root / key
+
+
+_storage = None
+
+
+def get_storage() -> FileStorage:
+    global _storage
+    if _storage is None:
+        if settings.FILE_STORAGE_BACKEND != "local":
+            raise ValueError(f"Unsupported FILE_STORAGE_BACKEND: {settings.FILE_STORAGE_BACKEND}")
+        _storage = LocalFileStorage(settings.UPLOAD_DIR)
+    return _storage
@@ -1,8 +1,8 @@
 
 from sqlalchemy.orm import Session
-from sqlalchemy import text, and_, or_
+from sqlalchemy import text, and_, or_, tuple_, inspect
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import re
 import uuid as uuid_module
 from app.models.claim import Claim, Rule, FlaggedClaim
@@ -36,12 +36,135 @@ class FraudDetectionEngine:
         'dispensing_fee': 'dispensing_fee',
     }
     
+    # Rules that compare a claim against other claims sharing its partition keys
+    HISTORY_LOGIC_TYPES = ("DUPLICATE_WINDOW", "EARLY_REFILL", "OVERLAP", "COUNT_WINDOW")
+    
+    # Partition key tuples per IN (...) query when prefetching history
+    HISTORY_PREFETCH_CHUNK = 1000
+    
     def __init__(self, db: Session, tenant_id: str):
         self.db = db
         if isinstance(tenant_id, str):
             self.tenant_id = uuid_module.UUID(tenant_id)
         else:
             self.tenant_id = tenant_id
+        
+        self._history_signatures = set()
+        self._history = {}
+        self._blocked_ndcs = None
+    
+    @property
+    def history_signatures(self) -> set:
+        return self._history_signatures
+    
+    def load_blocked_ndcs(self) -> set:
+        """Load the tenant's blocked NDC list once so IN_LIST checks are set lookups."""
+        rows = self.db.query(BlockedNDC.drug_code).filter(
+            BlockedNDC.tenant_id == self.tenant_id
+        ).all()
+        self._blocked_ndcs = {row.drug_code for row in rows}
+        return self._blocked_ndcs
+    
+    def use_blocked_ndcs(self, blocked_ndcs: set) -> None:
+        self._blocked_ndcs = blocked_ndcs
+    
+    def use_history(self, history: dict) -> None:
+        """Evaluate history rules against already-loaded groups ({signature: {key: [claims]}})."""
+        self._history = history
+    
+    def compile_rules(self, rules: List[Rule]) -> None:
+        """Find the distinct (partition keys, date field) groups used by the history rules.
+        
+        Rules that share a group are fed from one history read per batch
+        (see prefetch_history) instead of querying claims on their own.
+        """
+        self._history_signatures = set()
+        self._history = {}
+        
+        for rule in rules:
+            signature = self._history_signature(rule)
+            if signature is not None:
+                self._history_signatures.add(signature)
+    
+    def prefetch_history(self, claims: List[Claim]) -> None:
+        """Load, once per group, every tenant claim sharing partition keys with the batch."""
+        self._history = {}
+        
+        for signature in self._history_signatures:
+            key_values = {self.partition_key(claim, signature[0]) for claim in claims}
+            key_values.discard(None)
+            if key_values:
+                self._history[signature] = self.load_history_group(signature, key_values)
+    
+    def load_history_group(self, signature: Tuple[tuple, str], key_values: set) -> Dict[tuple, List[Claim]]:
+        key_fields, _ = signature
+        groups = {key: [] for key in key_values}
+        columns = [getattr(Claim, field) for field in key_fields]
+        key_list = list(key_values)
+        
+        for i in range(0, len(key_list), self.HISTORY_PREFETCH_CHUNK):
+            chunk = key_list[i:i + self.HISTORY_PREFETCH_CHUNK]
+            if len(columns) == 1:
+                condition = columns[0].in_([key[0] for key in chunk])
+            else:
+                condition = tuple_(*columns).in_(chunk)
+            
+            history = self.db.query(Claim).filter(
+                Claim.tenant_id == self.tenant_id,
+                condition
+            ).all()
+            
+            for other in history:
+                key = self.partition_key(other, key_fields)
+                if key in groups:
+                    groups[key].append(other)
+        
+        return groups
+    
+    def _history_signature(self, rule: Rule) -> Optional[Tuple[tuple, str]]:
+        if rule.logic_type not in self.HISTORY_LOGIC_TYPES:
+            return None
+        
+        params = rule.parameters or {}
+        keys = params.get("keys", [])
+        date_field = params.get("date_field", "fill_date")
+        
+        excluded = ["tenant_id", date_field]
+        if rule.logic_type == "OVERLAP":
+            excluded.append(params.get("days_supply_field", "days_supply"))
+        
+        key_fields = tuple(sorted({self._map_field(key) for key in keys if key not in excluded}))
+        mapped_date_field = self._map_field(date_field)
+        
+        # Tenant-wide history and unknown columns keep the per-claim query path
+        if not key_fields:
+            return None
+        if not all(hasattr(Claim, field) for field in key_fields + (mapped_date_field,)):
+            return None
+        
+        return key_fields, mapped_date_field
+    
+    def partition_key(self, claim: Claim, key_fields: tuple) -> Optional[tuple]:
+        values = tuple(getattr(claim, field, None) for field in key_fields)
+        if any(value is None or value == "" for value in values):
+            return None
+        return values
+    
+    def _get_history(self, claim: Claim, rule: Rule) -> Optional[List[Claim]]:
+        """Prefetched claims sharing the claim's partition keys, or None when not prefetched."""
+        if not self._history:
+            return None
+        
+        signature = self._history_signature(rule)
+        groups = self._history.get(signature) if signature is not None else None
+        if groups is None:
+            return None
+        
+        key = self.partition_key(claim, signature[0])
+        if key is None:
+            return None
+        
+        return groups.get(key)
     
     def _map_field(self, field_name: str) -> str:
         return self.FIELD_MAPPING.get(field_name, field_name)
@@ -383,7 +506,16 @@ class FraudDetectionEngine:
                 }
             }
         
-        duplicates = self.db.query(Claim).filter(and_(*filters)).all()
+        history = self._get_history(claim, rule)
+        if history is not None:
+            duplicates = [
+                other for other in history
+                if other.id != claim.id
+                and getattr(other, mapped_date_field) is not None
+                and start_date < getattr(other, mapped_date_field) < claim_date
+            ]
+        else:
+            duplicates = self.db.query(Claim).filter(and_(*filters)).all()
         
         matched = len(duplicates) > 0
         
@@ -453,10 +585,20 @@ class FraudDetectionEngine:
                 }
             }
         
-        last_fill = (self.db.query(Claim)
-                    .filter(and_(*filters))
-                    .order_by(getattr(Claim, mapped_date_field).desc())
-                    .first())
+        history = self._get_history(claim, rule)
+        if history is not None:
+            previous_fills = [
+                other for other in history
+                if other.id != claim.id
+                and getattr(other, mapped_date_field) is not None
+                and getattr(other, mapped_date_field) < claim_date
+            ]
+            last_fill = max(previous_fills, key=lambda other: getattr(other, mapped_date_field), default=None)
+        else:
+            last_fill = (self.db.query(Claim)
+                        .filter(and_(*filters))
+                        .order_by(getattr(Claim, mapped_date_field).desc())
+                        .first())
         
         if not last_fill:
             return {
@@ -547,7 +689,11 @@ class FraudDetectionEngine:
                 }
             }
         
-        potential_overlaps = self.db.query(Claim).filter(and_(*filters)).all()
+        history = self._get_history(claim, rule)
+        if history is not None:
+            potential_overlaps = [other for other in history if other.id != claim.id]
+        else:
+            potential_overlaps = self.db.query(Claim).filter(and_(*filters)).all()
         
         overlaps = []
         for other in potential_overlaps:
@@ -629,7 +775,18 @@ class FraudDetectionEngine:
                 }
             }
         
-        count = self.db.query(Claim).filter(and_(*filters)).count()
+        history = self._get_history(claim, rule)
+        if history is not None:
+            count = sum(
+                1 for other in history
+                if getattr(other, mapped_date_field) is not None
+                and start_date <= getattr(other, mapped_date_field) <= claim_date
+            )
+        else:
+            count = self.db.query(Claim).filter(and_(*filters)).count()
+            # A claim scored before it is stored is not in the table but still falls in its own window
+            if inspect(claim).transient:
+                count += 1
         
         matched = count > max_count
         
@@ -882,12 +1039,15 @@ class FraudDetectionEngine:
             return {"matched": False, "reason": f"No {field}"}
         
         if list_ref == "blocked_ndc":
-            exists = self.db.query(BlockedNDC).filter(
-                BlockedNDC.tenant_id == self.tenant_id,
-                BlockedNDC.drug_code == field_value
-            ).first()
-            
-            matched = exists is not None
+            if self._blocked_ndcs is not None:
+                matched = field_value in self._blocked_ndcs
+            else:
+                exists = self.db.query(BlockedNDC).filter(
+                    BlockedNDC.tenant_id == self.tenant_id,
+                    BlockedNDC.drug_code == field_value
+                ).first()
+                
+                matched = exists is not None
             
             return {
                 "matched": matched,
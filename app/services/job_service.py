@@ -1,6 +1,6 @@
 
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, or_
 from app.models.claim import IngestionJob
 from datetime import datetime
 import uuid
@@ -51,6 +51,22 @@ def get_job(db: Session, job_id: str, tenant_id: str) -> Optional[IngestionJob]:
     ).first()
 
 
+def find_completed_job_by_hash(db: Session, tenant_id: str, file_hash: str) -> Optional[IngestionJob]:
+    """Most recent completed job for the same file (served by idx_ingestion_jobs_tenant_file_hash)."""
+    db.execute(
+        text("SET app.current_tenant_id = :tenant_id"),
+        {"tenant_id": tenant_id}
+    )
+    
+    return db.query(IngestionJob).filter(
+        IngestionJob.tenant_id == tenant_id,
+        IngestionJob.file_hash == file_hash,
+        IngestionJob.status == "completed",
+        # A probe only counted rows; the file still needs a real ingest
+        or_(IngestionJob.ingest_mode.is_(None), IngestionJob.ingest_mode != "probe")
+    ).order_by(IngestionJob.created_at.desc()).first()
+
+
 def update_job_status(
     db: Session,
     job_id: str,
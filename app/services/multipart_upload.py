@@ -0,0 +1,168 @@
+"""
+Streams the file field of a multipart/form-data request straight into upload storage.
+
+Starlette's form parser spools the whole body to a temporary file before the
+endpoint runs, so a size limit checked afterwards only fires once everything
+has been received, and the file ends up on disk twice. Parsing
+request.stream() here writes the file part to storage as it arrives and
+stops reading as soon as the limit is passed.
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from multipart.multipart import MultipartParser, parse_options_header
+
+from app.services.file_storage import FileStorage
+
+
+# Room for the boundaries and part headers around the file when judging Content-Length
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class ReceivedFile:
+    filename: str
+    handle: str
+    size: int
+    sha256: str
+
+
+def _decode(value: bytes) -> str:
+    try:
+        return value.decode("utf-8")
+    except UnicodeDecodeError:
+        return value.decode("latin-1")
+
+
+class _FilePartWriter:
+    """MultipartParser callbacks that copy the first part named field_name into storage."""
+
+    def __init__(self, storage: FileStorage, field_name: str, max_size: int,
+                 check_filename: Optional[Callable[[str], None]]):
+        self.storage = storage
+        self.field_name = field_name.encode("latin-1")
+        self.max_size = max_size
+        self.check_filename = check_filename
+        self.filename = None
+        self.handle = None
+        self.size = 0
+        self.finished = False
+        self._hasher = hashlib.sha256()
+        self._file = None
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if self.handle or options.get(b"name") != self.field_name or b"filename" not in options:
+            return
+
+        self.filename = _decode(options[b"filename"])
+        if self.check_filename:
+            self.check_filename(self.filename)
+        self.handle = self.storage.new_handle(self.filename)
+        self._file = self.storage.open_write(self.handle)
+
+    def _on_part_data(self, data, start, end):
+        if self._file is None:
+            return
+
+        piece = data[start:end]
+        self.size += len(piece)
+        if self.size > self.max_size:
+            raise UploadTooLarge(f"File too large. Maximum size is {self.max_size / (1024*1024)}MB")
+        self._hasher.update(piece)
+        self._file.write(piece)
+
+    def _on_part_end(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self.finished = True
+
+    def discard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.handle:
+            self.storage.delete(self.handle)
+
+    def result(self) -> ReceivedFile:
+        return ReceivedFile(
+            filename=self.filename,
+            handle=self.handle,
+            size=self.size,
+            sha256=self._hasher.hexdigest()
+        )
+
+
+async def receive_file(
+    request,
+    storage: FileStorage,
+    max_size: int,
+    field_name: str = "file",
+    check_filename: Optional[Callable[[str], None]] = None
+) -> ReceivedFile:
+    """
+    Write the request's file field to storage without buffering the body.
+
+    A Content-Length that cannot fit under max_size is refused before any
+    data is read. check_filename runs as soon as the part headers arrive and
+    may raise to refuse the upload. Whatever was written is deleted if the
+    upload fails; raises UploadTooLarge past max_size and ValueError for a
+    malformed body.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise ValueError("Expected a multipart/form-data upload")
+
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_size + MULTIPART_OVERHEAD_BYTES:
+        raise UploadTooLarge(f"File too large. Maximum size is {max_size / (1024*1024)}MB")
+
+    writer = _FilePartWriter(storage, field_name, max_size, check_filename)
+    parser = MultipartParser(boundary, writer.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+    except Exception:
+        writer.discard()
+        raise
+
+    if not writer.finished:
+        writer.discard()
+        raise ValueError(f"No complete '{field_name}' file field in the upload")
+    return writer.result()
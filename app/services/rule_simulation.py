@@ -0,0 +1,276 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text, func
+from sqlalchemy.exc import SQLAlchemyError
+from typing import List, Optional
+from uuid import UUID
+import math
+
+from app.models.claim import Claim, Rule
+from app.schemas.rule import RuleCreate, RuleUpdate
+from app.services.fraud_engine import FraudDetectionEngine
+
+
+class RuleSimulationService:
+    """Estimate how many flags a draft or edited rule would produce, without writing any."""
+    
+    # z-score for the 95% confidence bounds
+    Z_95 = 1.96
+    
+    # Smallest per-stratum sample that still gives a variance estimate
+    MIN_STRATUM_SAMPLE = 2
+    
+    # Stands in for a NULL ingestion_id when matching claims to strata
+    NO_INGESTION_ID = UUID(int=0)
+    
+    @staticmethod
+    def build_draft_rule(tenant_id: UUID, rule_data: RuleCreate) -> Rule:
+        # Transient instance: never added to the session, so it is never persisted
+        return Rule(
+            tenant_id=tenant_id,
+            name=rule_data.name,
+            description=rule_data.description or rule_data.name,
+            rule_code=rule_data.rule_code,
+            category=rule_data.category,
+            severity=rule_data.severity,
+            recoupable=rule_data.recoupable,
+            logic_type=rule_data.logic_type,
+            parameters=rule_data.parameters,
+            rule_definition=rule_data.rule_definition or rule_data.parameters or {},
+            version=1,
+            is_active=rule_data.is_active
+        )
+    
+    @staticmethod
+    def build_edited_rule(rule: Rule, changes: Optional[RuleUpdate]) -> Rule:
+        draft = Rule(
+            id=rule.id,
+            tenant_id=rule.tenant_id,
+            name=rule.name,
+            description=rule.description,
+            rule_code=rule.rule_code,
+            category=rule.category,
+            severity=rule.severity,
+            recoupable=rule.recoupable,
+            logic_type=rule.logic_type,
+            parameters=rule.parameters,
+            rule_definition=rule.rule_definition,
+            version=rule.version,
+            is_active=rule.is_active
+        )
+        
+        if changes is not None:
+            for field, value in changes.model_dump(exclude_none=True).items():
+                setattr(draft, field, value)
+        
+        return draft
+    
+    @staticmethod
+    def simulate(
+        db: Session,
+        tenant_id: UUID,
+        rule: Rule,
+        sample_size: int = 1000,
+        max_examples: int = 10
+    ) -> dict:
+        db.execute(
+            text("SET app.current_tenant_id = :tenant_id"),
+            {"tenant_id": str(tenant_id)}
+        )
+        
+        # Strata are the ingestion jobs, so every upload is represented in the sample
+        strata = db.query(Claim.ingestion_id, func.count(Claim.id)).filter(
+            Claim.tenant_id == tenant_id
+        ).group_by(Claim.ingestion_id).all()
+        
+        population = sum(count for _, count in strata)
+        
+        if population == 0:
+            return RuleSimulationService._result(rule, 0, 0, 0, 0.0, 0.0, 0, [])
+        
+        groups = RuleSimulationService.plan_strata(strata, sample_size)
+        claims = RuleSimulationService._sample_claims(db, tenant_id, groups)
+        
+        group_of = {
+            ingestion_id: index
+            for index, (ingestion_ids, _, _) in enumerate(groups)
+            for ingestion_id in ingestion_ids
+        }
+        
+        engine = FraudDetectionEngine(db, tenant_id)
+        engine.compile_rules([rule])
+        engine.prefetch_history(claims)
+        
+        sampled = [0] * len(groups)
+        matches = [0] * len(groups)
+        errors = 0
+        examples = []
+        
+        for claim in claims:
+            index = group_of[claim.ingestion_id]
+            sampled[index] += 1
+            
+            try:
+                result = engine.evaluate_claim(claim, rule)
+            except SQLAlchemyError:
+                # The transaction is aborted, so every later claim would fail too
+                # and be miscounted as a rule error
+                raise
+            except Exception:
+                errors += 1
+                continue
+            
+            if result.get("matched", False):
+                matches[index] += 1
+                if len(examples) < max_examples:
+                    examples.append({
+                        "claim_id": str(claim.id),
+                        "claim_number": claim.claim_number,
+                        "patient_id": claim.patient_id,
+                        "explanation": result.get("explanation")
+                    })
+        
+        estimate, std_error = RuleSimulationService.stratified_estimate([
+            (size, sampled[index], matches[index])
+            for index, (_, size, _) in enumerate(groups)
+        ])
+        
+        return RuleSimulationService._result(
+            rule, population, sum(sampled), sum(matches),
+            estimate, std_error, errors, examples
+        )
+    
+    @staticmethod
+    def plan_strata(strata: List[tuple], sample_size: int) -> List[tuple]:
+        """
+        Group (ingestion_id, size) strata and give each group its sample quota.
+        
+        Quotas are proportional and add up to sample_size (or the whole
+        population when that is smaller). Every group gets at least
+        MIN_STRATUM_SAMPLE claims so it has a variance term; uploads too small
+        to earn that on their own share are pooled into one group instead of
+        each being sampled past their share. Returns [(ingestion_ids, size, quota)].
+        """
+        population = sum(size for _, size in strata)
+        if sample_size >= population:
+            return [([ingestion_id], size, size) for ingestion_id, size in strata]
+        
+        minimum = RuleSimulationService.MIN_STRATUM_SAMPLE
+        groups = []
+        pooled_ids = []
+        pooled_size = 0
+        for ingestion_id, size in strata:
+            if sample_size * size / population < minimum:
+                pooled_ids.append(ingestion_id)
+                pooled_size += size
+            else:
+                groups.append(([ingestion_id], size))
+        if pooled_ids:
+            groups.append((pooled_ids, pooled_size))
+        
+        shares = [sample_size * size / population for _, size in groups]
+        quotas = [min(size, max(minimum, math.floor(share))) for (_, size), share in zip(groups, shares)]
+        
+        # Largest remainder first, never past a group's size or below the minimum
+        while sum(quotas) < sample_size:
+            open_groups = [i for i, (_, size) in enumerate(groups) if quotas[i] < size]
+            if not open_groups:
+                break
+            quotas[max(open_groups, key=lambda i: shares[i] - quotas[i])] += 1
+        while sum(quotas) > sample_size:
+            over = [i for i in range(len(groups)) if quotas[i] > minimum]
+            if not over:
+                break
+            quotas[max(over, key=lambda i: quotas[i] - shares[i])] -= 1
+        
+        return [(ids, size, quota) for (ids, size), quota in zip(groups, quotas)]
+    
+    @staticmethod
+    def stratified_estimate(groups: List[tuple]) -> tuple:
+        """Estimated matches and its standard error from [(group size, sampled, matches)]."""
+        estimate = 0.0
+        variance = 0.0
+        
+        for size, n, matches in groups:
+            if n == 0:
+                continue
+            p = matches / n
+            estimate += size * p
+            # Quotas are at least two unless the group is taken whole, which has no sampling error
+            if 1 < n < size:
+                finite_population = 1 - n / size
+                variance += size ** 2 * finite_population * p * (1 - p) / (n - 1)
+        
+        return estimate, math.sqrt(variance)
+    
+    @staticmethod
+    def _sample_claims(db: Session, tenant_id: UUID, groups: List[tuple]) -> List[Claim]:
+        """Draw every group's random sample in one windowed pass over the tenant's claims."""
+        ingestion_ids = []
+        group_numbers = []
+        quotas = []
+        for number, (ids, _, quota) in enumerate(groups):
+            for ingestion_id in ids:
+                ingestion_ids.append(str(ingestion_id or RuleSimulationService.NO_INGESTION_ID))
+                group_numbers.append(number)
+                quotas.append(quota)
+        
+        rows = db.execute(
+            text("""
+                SELECT id FROM (
+                    SELECT
+                        c.id,
+                        q.quota,
+                        row_number() OVER (PARTITION BY q.group_number ORDER BY random()) AS pick
+                    FROM claims c
+                    JOIN unnest(
+                        CAST(:ingestion_ids AS uuid[]),
+                        CAST(:group_numbers AS int[]),
+                        CAST(:quotas AS int[])
+                    ) AS q(ingestion_id, group_number, quota)
+                        ON COALESCE(c.ingestion_id, CAST(:no_ingestion_id AS uuid)) = q.ingestion_id
+                    WHERE c.tenant_id = :tenant_id
+                ) picked
+                WHERE pick <= quota
+            """),
+            {
+                "ingestion_ids": ingestion_ids,
+                "group_numbers": group_numbers,
+                "quotas": quotas,
+                "no_ingestion_id": str(RuleSimulationService.NO_INGESTION_ID),
+                "tenant_id": str(tenant_id)
+            }
+        ).all()
+        
+        if not rows:
+            return []
+        return db.query(Claim).filter(Claim.id.in_([row.id for row in rows])).order_by(Claim.id).all()
+    
+    @staticmethod
+    def _result(
+        rule: Rule,
+        population: int,
+        sampled: int,
+        sample_matches: int,
+        estimate: float,
+        std_error: float,
+        errors: int,
+        examples: List[dict]
+    ) -> dict:
+        margin = RuleSimulationService.Z_95 * std_error
+        
+        return {
+            "rule_id": rule.id,
+            "rule_name": rule.name,
+            "logic_type": rule.logic_type,
+            "total_claims": population,
+            "sampled_claims": sampled,
+            "sample_matches": sample_matches,
+            "evaluation_errors": errors,
+            "estimated_flags": round(estimate),
+            "lower_bound": max(0, math.floor(estimate - margin)),
+            "upper_bound": min(population, math.ceil(estimate + margin)),
+            "estimated_flag_rate": estimate / population if population else 0.0,
+            "confidence_level": 0.95,
+            "exact": sampled == population,
+            "examples": examples
+        }
@@ -0,0 +1,87 @@
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+
+from app.models.audit_run import AuditRuleRun
+from app.models.claim import IngestionJob
+from app.workers.progress_events import publish_job_event, EVENT_FRAUD_STATUS
+
+
+def get_latest_run_for_job(db: Session, job_id, tenant_id) -> Optional[AuditRuleRun]:
+    # Rule diff runs cover one rule only, so they never stand for the job's fraud run
+    return db.query(AuditRuleRun).filter(
+        AuditRuleRun.job_id == job_id,
+        AuditRuleRun.tenant_id == tenant_id,
+        AuditRuleRun.rule_id.is_(None)
+    ).order_by(AuditRuleRun.run_date.desc()).first()
+
+
+def request_cancel(db: Session, run: AuditRuleRun) -> AuditRuleRun:
+    run.cancel_requested = True
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def close_cancelled_run(db: Session, run: AuditRuleRun) -> AuditRuleRun:
+    """
+    Mark a cancelled run finished when no worker holds it any more, so
+    neither the run nor its job's fraud status stays "processing".
+    A rule diff run leaves the job's fraud status alone, as in the worker.
+    """
+    run.status = "cancelled"
+    run.completed_at = datetime.utcnow()
+    
+    job = None
+    if run.job_id and not run.rule_id:
+        job = db.query(IngestionJob).filter(IngestionJob.id == run.job_id).first()
+        if job:
+            job.fraud_status = "cancelled"
+            job.fraud_flags_count = run.flags_generated or 0
+            job.fraud_completed_at = datetime.utcnow()
+    
+    db.commit()
+    db.refresh(run)
+    
+    if job:
+        publish_job_event(str(job.id), EVENT_FRAUD_STATUS, {
+            "fraud_status": "cancelled",
+            "fraud_flags_count": job.fraud_flags_count
+        })
+    return run
+
+
+def is_cancel_requested(db: Session, run_id) -> bool:
+    """Read the flag straight from the database; the worker's copy of the run is stale."""
+    return bool(db.query(AuditRuleRun.cancel_requested).filter(
+        AuditRuleRun.id == run_id
+    ).scalar())
+
+
+def describe_progress(run: AuditRuleRun) -> dict:
+    """Progress snapshot of a run as last checkpointed by the worker."""
+    claims_processed = run.claims_processed or 0
+    total_claims = run.total_claims
+    rate = run.claims_per_second
+    
+    percent_complete = None
+    if total_claims:
+        percent_complete = round(min(claims_processed / total_claims, 1.0) * 100, 1)
+    elif run.status == "completed":
+        percent_complete = 100.0
+    
+    eta_seconds = None
+    if run.status == "processing" and total_claims and rate:
+        eta_seconds = max(total_claims - claims_processed, 0) / rate
+    
+    return {
+        "run_id": str(run.id),
+        "status": run.status,
+        "claims_processed": claims_processed,
+        "total_claims": total_claims,
+        "flags_generated": run.flags_generated or 0,
+        "percent_complete": percent_complete,
+        "claims_per_second": round(rate, 2) if rate else None,
+        "eta_seconds": round(eta_seconds) if eta_seconds is not None else None,
+        "updated_at": run.checkpointed_at
+    }
@@ -0,0 +1,177 @@
+"""Synchronous single-claim scoring against a warm per-tenant cache."""
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from collections import OrderedDict
+from typing import Dict, List
+from uuid import UUID
+import time
+
+from app.core.redis_client import get_redis
+from app.models.claim import Claim, Rule
+from app.services.rule_service import RuleService
+from app.services.fraud_engine import FraudDetectionEngine
+
+
+class TenantScoringContext:
+    """Compiled rules, blocked NDCs and recent history for one tenant."""
+    
+    def __init__(self, rules: List[Rule], signatures: set, blocked_ndcs: set, rules_version=None):
+        self.rules = rules
+        self.signatures = signatures
+        self.blocked_ndcs = blocked_ndcs
+        self.rules_version = rules_version
+        self.loaded_at = time.monotonic()
+        self.history: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+def _rules_version_key(tenant_id) -> str:
+    return f"scoring_rules_version:{tenant_id}"
+
+
+class ScoringCache:
+    """
+    Per-process cache of tenant scoring contexts.
+    
+    Each API process has its own copy, so invalidate() bumps a per-tenant
+    version counter in Redis that every process checks before using its
+    context. If Redis is unavailable, other processes fall back to picking
+    up rule edits within CONTEXT_TTL_SECONDS.
+    """
+    
+    # Rules and blocked NDCs are reloaded at least this often (rule edits also invalidate)
+    CONTEXT_TTL_SECONDS = 60
+    
+    # How long a loaded history group is trusted before it is re-read
+    HISTORY_TTL_SECONDS = 30
+    
+    # History groups kept per tenant (least recently used are evicted)
+    MAX_HISTORY_GROUPS = 10000
+    
+    def __init__(self):
+        self._contexts: Dict[str, TenantScoringContext] = {}
+    
+    def invalidate(self, tenant_id) -> None:
+        self._contexts.pop(str(tenant_id), None)
+        try:
+            get_redis().incr(_rules_version_key(tenant_id))
+        except Exception as e:
+            print(f" Failed to publish scoring cache invalidation: {e}")
+    
+    def _rules_version(self, tenant_id):
+        try:
+            return int(get_redis().get(_rules_version_key(tenant_id)) or 0)
+        except Exception as e:
+            print(f" Scoring cache version unavailable, relying on the TTL: {e}")
+            return None
+    
+    def get_context(self, db: Session, tenant_id: UUID) -> TenantScoringContext:
+        rules_version = self._rules_version(tenant_id)
+        context = self._contexts.get(str(tenant_id))
+        if (
+            context is not None
+            and time.monotonic() - context.loaded_at < self.CONTEXT_TTL_SECONDS
+            and (rules_version is None or context.rules_version == rules_version)
+        ):
+            return context
+        
+        rules = RuleService.get_active_rules(db, tenant_id)
+        # Detach so the cached rules outlive the request session
+        for rule in rules:
+            db.expunge(rule)
+        
+        engine = FraudDetectionEngine(db, tenant_id)
+        engine.compile_rules(rules)
+        
+        context = TenantScoringContext(
+            rules=rules,
+            signatures=set(engine.history_signatures),
+            blocked_ndcs=engine.load_blocked_ndcs(),
+            rules_version=rules_version
+        )
+        self._contexts[str(tenant_id)] = context
+        return context
+    
+    def get_history(self, engine: FraudDetectionEngine, context: TenantScoringContext, claim: Claim) -> dict:
+        """
+        History groups for the claim's partition keys, loading only expired or missing groups.
+        
+        The scored claim is added to each group, as a stored claim is part of
+        its own history, so window counts include it like a batch run does.
+        """
+        history = {}
+        now = time.monotonic()
+        
+        for signature in context.signatures:
+            key = engine.partition_key(claim, signature[0])
+            if key is None:
+                continue
+            
+            cache_key = (signature, key)
+            entry = context.history.get(cache_key)
+            
+            if entry is None or now - entry[0] > self.HISTORY_TTL_SECONDS:
+                group = engine.load_history_group(signature, {key})[key]
+                entry = (now, group)
+                context.history[cache_key] = entry
+                if len(context.history) > self.MAX_HISTORY_GROUPS:
+                    context.history.popitem(last=False)
+            
+            context.history.move_to_end(cache_key)
+            history[signature] = {key: entry[1] + [claim]}
+        
+        return history
+
+
+scoring_cache = ScoringCache()
+
+
+def score_claim(db: Session, tenant_id: UUID, claim_data: dict) -> dict:
+    started = time.perf_counter()
+    
+    db.execute(
+        text("SET app.current_tenant_id = :tenant_id"),
+        {"tenant_id": str(tenant_id)}
+    )
+    
+    context = scoring_cache.get_context(db, tenant_id)
+    
+    # Transient claim: scored in memory, never added to the session
+    claim = Claim(tenant_id=tenant_id, **claim_data)
+    
+    engine = FraudDetectionEngine(db, tenant_id)
+    engine.use_blocked_ndcs(context.blocked_ndcs)
+    engine.use_history(scoring_cache.get_history(engine, context, claim))
+    
+    matches = []
+    errors = []
+    
+    for rule in context.rules:
+        try:
+            result = engine.evaluate_claim(claim, rule)
+        except SQLAlchemyError:
+            # The transaction is aborted, so the remaining rules could not be evaluated either
+            raise
+        except Exception as e:
+            errors.append({"rule_code": rule.rule_code, "rule_name": rule.name, "error": str(e)})
+            continue
+        
+        if result.get("matched", False):
+            matches.append({
+                "rule_id": rule.id,
+                "rule_code": rule.rule_code,
+                "rule_name": rule.name,
+                "rule_version": rule.version,
+                "severity": rule.severity,
+                "category": rule.category,
+                "explanation": result.get("explanation")
+            })
+    
+    return {
+        "claim_id": claim_data.get("claim_id"),
+        "flagged": len(matches) > 0,
+        "rules_evaluated": len(context.rules),
+        "matches": matches,
+        "errors": errors,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
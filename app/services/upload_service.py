@@ -0,0 +1,139 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+import hashlib
+import uuid
+
+from app.models.claim import IngestionJob
+from app.services.file_storage import FileStorage
+
+# Bytes copied per step when joining parts
+ASSEMBLE_BUFFER_BYTES = 1024 * 1024
+
+
+def create_session(
+    db: Session,
+    tenant_id: str,
+    filename: str,
+    file_size: int,
+    file_hash: str,
+    chunk_size: int
+) -> IngestionJob:
+    """A resumable upload is an ingestion job in status "uploading" until it is completed."""
+    db.execute(
+        text("SET app.current_tenant_id = :tenant_id"),
+        {"tenant_id": tenant_id}
+    )
+
+    job = IngestionJob(
+        id=uuid.uuid4(),
+        tenant_id=tenant_id,
+        filename=filename,
+        file_hash=file_hash.lower(),
+        status="uploading",
+        upload_size=file_size,
+        upload_chunk_size=chunk_size,
+        total_rows=0,
+        successful_rows=0,
+        failed_rows=0,
+        created_at=datetime.utcnow()
+    )
+
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    return job
+
+
+def chunk_count(job: IngestionJob) -> int:
+    return -(-job.upload_size // job.upload_chunk_size)
+
+
+def expected_chunk_size(job: IngestionJob, index: int) -> int:
+    return min(job.upload_chunk_size, job.upload_size - index * job.upload_chunk_size)
+
+
+def chunk_handle(storage: FileStorage, job: IngestionJob, index: int) -> str:
+    return storage.handle(f"{job.id}.part{index:05d}")
+
+
+def received_chunks(storage: FileStorage, job: IngestionJob) -> List[int]:
+    """Parts already stored in full; a part cut short by a dropped connection does not count."""
+    received = []
+    for index in range(chunk_count(job)):
+        handle = chunk_handle(storage, job, index)
+        if storage.exists(handle) and storage.size(handle) == expected_chunk_size(job, index):
+            received.append(index)
+    return received
+
+
+def lock_for_chunk_write(db: Session, job: IngestionJob) -> Optional[str]:
+    """
+    Share-lock the session row for the length of a part write and return its status.
+
+    Any number of parts can be written at once, but completion takes the row
+    exclusively, so no part changes while the file is being joined. Returns
+    None instead of waiting when completion holds the lock; the caller commits
+    or rolls back once the part is stored.
+    """
+    try:
+        return db.execute(
+            text("SELECT status FROM ingestion_jobs WHERE id = :job_id FOR SHARE NOWAIT"),
+            {"job_id": str(job.id)}
+        ).scalar()
+    except OperationalError:
+        db.rollback()
+        return None
+
+
+def lock_for_assembly(db: Session, job: IngestionJob) -> str:
+    """
+    Lock the session row exclusively until the caller commits and return its status.
+
+    Waits for part writes in flight, and keeps new ones and other completion
+    requests out while the parts are joined and checked. Nothing is committed
+    before the outcome is known, so a completion that dies part way leaves the
+    session "uploading" with its parts, and can simply be retried.
+    """
+    return db.execute(
+        text("SELECT status FROM ingestion_jobs WHERE id = :job_id FOR UPDATE"),
+        {"job_id": str(job.id)}
+    ).scalar()
+
+
+def assembled_handle(storage: FileStorage, job: IngestionJob) -> str:
+    """Fixed per session, so a retried completion overwrites a file left by an interrupted one."""
+    return storage.handle(f"{job.id}_{Path(job.filename).name}")
+
+
+def assemble(storage: FileStorage, job: IngestionJob) -> tuple:
+    """
+    Join the parts in order into one stored file, hashing as it is written.
+
+    Returns (handle, sha256 hex digest). The parts are left in place; they
+    are only discarded once the hash has been checked.
+    """
+    handle = assembled_handle(storage, job)
+    hasher = hashlib.sha256()
+
+    try:
+        with storage.open_write(handle) as out:
+            for index in range(chunk_count(job)):
+                with storage.open_read(chunk_handle(storage, job, index)) as part:
+                    while block := part.read(ASSEMBLE_BUFFER_BYTES):
+                        hasher.update(block)
+                        out.write(block)
+    except Exception:
+        storage.delete(handle)
+        raise
+
+    return handle, hasher.hexdigest()
+
+
+def discard_chunks(storage: FileStorage, job: IngestionJob):
+    for index in range(chunk_count(job)):
+        storage.delete(chunk_handle(storage, job, index))
@@ -1,13 +1,36 @@
-from celery import Task
+from celery import Task, chord
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
+from collections import Counter
+from contextlib import ExitStack
+from itertools import islice
+import os
 import uuid
-from app.core.celery_config import celery_app
-from app.services.csv_parser import read_csv_file  # Import your existing CSV parser
-from app.models.claim import Claim, IngestionJob, IngestionError
+from app.core.config import settings
+from app.core.celery_config import celery_app, QUEUE_INGESTION
+from app.services.csv_parser import open_csv_rows, open_csv_chunk, plan_csv_chunks, count_csv_chunk_rows, BYTE_SPLITTABLE_ENCODINGS
+from app.models.claim import IngestionJob
+from app.models.audit_run import AuditRuleRun
 from app.services.csv_validator import CSVValidator, ValidationError
-from app.workers.fraud_detection_task import detect_fraud_for_job
+from app.services.claim_loader import ClaimCopyLoader, INGEST_MODE_INSERT_NEW
+from app.services.columnar_reader import ColumnarRowReader, open_columnar_rows, detect_columnar_format
+from app.services.file_storage import get_storage
+from app.workers.fraud_detection_task import detect_fraud_for_claims, complete_pipelined_run
+from app.workers import run_lock
+from app.workers.tenant_throttle import acquire_tenant_slot, release_tenant_slot, throttle_countdown, INGESTION_CHUNK_SLOTS
+from app.workers.ingest_dedupe import RedisClaimIdSet, clear_claim_id_set
+from app.workers.progress_events import publish_job_event, publish_ingest_progress, EVENT_INGESTION_STATUS
+
+# Claims handed to one fraud task in pipelined mode
+PIPELINE_BATCH_SIZE = 500
+
+# Files at least this big are split into byte ranges ingested in parallel
+PARALLEL_INGEST_MIN_BYTES = 64 * 1024 * 1024
+INGEST_CHUNK_BYTES = 32 * 1024 * 1024
+
+# Rejected rows printed to the worker log per file or chunk; the rest are only counted
+LOGGED_ERROR_ROWS = 20
 
 engine = create_engine(
     settings.DATABASE_URL,
@@ -35,42 +58,77 @@ class DatabaseTask(Task):
             self._db = None
 
 
-@celery_app.task(base=DatabaseTask, bind=True, name='process_csv_task')
-def process_csv_task(self, job_id: str, tenant_id: str, csv_content: str = None):
+@celery_app.task(base=DatabaseTask, bind=True, name='process_csv_task', max_retries=None)
+def process_csv_task(
+    self,
+    job_id: str,
+    tenant_id: str,
+    file_handle: str,
+    pipelined: bool = False,
+    ingest_mode: str = INGEST_MODE_INSERT_NEW
+):
+    if not acquire_tenant_slot(tenant_id, QUEUE_INGESTION, self.request.id):
+        print(f" Tenant {tenant_id} at ingestion concurrency cap, re-queuing job {job_id}")
+        raise self.retry(countdown=throttle_countdown())
+    
     db = self.db
+    pipeline = None
+    storage = get_storage()
+    cleanup = ExitStack()
     
     print(f"\n{'='*80}")
     print(f"STARTING CSV PROCESSING (CLIENT SCHEMA)")
     print(f"Job ID: {job_id}")
     print(f"Tenant ID: {tenant_id}")
-    print(f"CSV Content Length: {len(csv_content)}")  # Debug: Check the CSV content length
-    print(f"CSV Content Sample (First 100 chars): {csv_content[:100]}")  # Debug: Check part of the CSV content
+    print(f"Source: {file_handle}")
+    print(f"Pipelined fraud detection: {pipelined}")
+    print(f"Ingest mode: {ingest_mode}")
     print(f"{'='*80}\n")
     
     try:
-        
-        if csv_content is None:
-            raise ValueError("No CSV content provided.")
-        
         _set_tenant_context(db, tenant_id)
         
         job = _get_job(db, job_id)
         if not job:
             return {"status": "error", "message": "Job not found"}
         
+        job.ingest_mode = ingest_mode
         _update_job_status(db, job, "processing")
         
-        # Pass the CSV content to the parser
-        rows = read_csv_file(csv_content=csv_content)
+        # Rows are decoded and cleaned lazily as _process_rows consumes them
+        file_path = cleanup.enter_context(storage.local_path(file_handle))
+        columnar_format = detect_columnar_format(file_path)
+        if columnar_format:
+            # Parquet/Arrow: typed record batches, no CSV tokenizing
+            rows = cleanup.enter_context(open_columnar_rows(file_path, columnar_format))
+        else:
+            rows = cleanup.enter_context(open_csv_rows(file_path=file_path))
         
         # Validate CSV structure (check for required columns)
-        _validate_csv_structure(rows)
+        _validate_csv_structure(rows.headers)
         
-        result = _process_rows(db, rows, job_id, tenant_id)
+        if pipelined:
+            pipeline = {"run_id": _start_pipelined_run(db, job, tenant_id), "batches_dispatched": 0}
+        
+        # Byte ranges only make sense in the uncompressed file
+        if (not rows.compression
+                and rows.encoding in BYTE_SPLITTABLE_ENCODINGS
+                and os.path.getsize(file_path) >= PARALLEL_INGEST_MIN_BYTES):
+            chunk_count = _start_chunked_ingest(job_id, tenant_id, file_handle, file_path, rows, pipeline, ingest_mode)
+            return {
+                "status": "processing",
+                "chunks": chunk_count
+            }
+        
+        result = _process_rows(db, rows, job_id, tenant_id, pipeline=pipeline, ingest_mode=ingest_mode)
         
         _finalize_job(db, job, result)
         
-        # No file cleanup needed - data is in database
+        if pipeline:
+            _close_pipeline(db, job_id, pipeline, total_claims=result['success_count'])
+        
+        # Data is in the database now; failed uploads are kept for inspection
+        cleanup.callback(storage.delete, file_handle)
         print(f"  CSV processing complete\n")
         
         print(f"\n{'='*80}")
@@ -78,13 +136,16 @@ def process_csv_task(self, job_id: str, tenant_id: str, csv_content: str = None)
         print(f"Total rows: {result['total_rows']}")
         print(f"Successful: {result['success_count']}")
         print(f"Errors: {result['error_count']}")
+        print(f"New / already stored: {result['new_count']} / {result['existing_count']}")
         print(f"{'='*80}\n")
         
         return {
             "status": "completed",
             "total_rows": result['total_rows'],
             "success_count": result['success_count'],
-            "error_count": result['error_count']
+            "error_count": result['error_count'],
+            "new_count": result['new_count'],
+            "existing_count": result['existing_count']
         }
     
     except Exception as e:
@@ -94,10 +155,180 @@ def process_csv_task(self, job_id: str, tenant_id: str, csv_content: str = None)
         
         _mark_job_failed(db, job_id, error_message=str(e))
         
+        if pipeline:
+            # Let the batches that were already queued close the run
+            _close_pipeline(db, job_id, pipeline)
+        
         return {
             "status": "failed",
             "error": str(e)
         }
+    
+    finally:
+        cleanup.close()
+        release_tenant_slot(tenant_id, QUEUE_INGESTION, self.request.id)
+
+
+@celery_app.task(name='count_csv_chunk')
+def count_csv_chunk(file_handle: str, start: int, end: int, encoding: str):
+    """Count the rows in one byte range of a split upload; None if it could not be read."""
+    try:
+        with get_storage().local_path(file_handle) as file_path:
+            return count_csv_chunk_rows(file_path, start, end, encoding)
+    except Exception as e:
+        print(f" Counting rows {start}-{end} of {file_handle} failed: {str(e)}")
+        return None
+
+
+@celery_app.task(base=DatabaseTask, bind=True, name='start_csv_chunks')
+def start_csv_chunks(
+    self,
+    row_counts: list,
+    job_id: str,
+    tenant_id: str,
+    file_handle: str,
+    ranges: list,
+    fieldnames: list,
+    encoding: str,
+    run_id: str = None,
+    ingest_mode: str = INGEST_MODE_INSERT_NEW,
+    date_format: str = None
+):
+    """Chord callback: number each range's first row from the counts and queue the chunks."""
+    if None in row_counts:
+        db = self.db
+        _set_tenant_context(db, tenant_id)
+        _mark_job_failed(db, job_id, error_message="Could not read every part of the file")
+        if run_id:
+            _close_pipeline(db, job_id, {"run_id": run_id, "batches_dispatched": 0})
+        return {"status": "failed"}
+    
+    first_row_numbers = []
+    next_row_number = 2
+    for count in row_counts:
+        first_row_numbers.append(next_row_number)
+        next_row_number += count
+    
+    chord(
+        process_csv_chunk.s(
+            job_id, tenant_id, file_handle, start, end, first_row_number,
+            fieldnames, encoding, run_id, ingest_mode, date_format
+        )
+        for (start, end), first_row_number in zip(ranges, first_row_numbers)
+    )(finalize_csv_ingest.s(job_id, tenant_id, file_handle, run_id))
+    
+    return {"status": "processing", "chunks": len(ranges)}
+
+
+@celery_app.task(base=DatabaseTask, bind=True, name='process_csv_chunk', max_retries=None)
+def process_csv_chunk(
+    self,
+    job_id: str,
+    tenant_id: str,
+    file_handle: str,
+    start: int,
+    end: int,
+    first_row_number: int,
+    fieldnames: list,
+    encoding: str,
+    run_id: str = None,
+    ingest_mode: str = INGEST_MODE_INSERT_NEW,
+    date_format: str = None
+):
+    """Validate and load one byte range of a split upload."""
+    if not acquire_tenant_slot(tenant_id, INGESTION_CHUNK_SLOTS, self.request.id):
+        raise self.retry(countdown=throttle_countdown())
+    
+    db = self.db
+    pipeline = {"run_id": run_id, "batches_dispatched": 0} if run_id else None
+    cleanup = ExitStack()
+    
+    try:
+        _set_tenant_context(db, tenant_id)
+        
+        file_path = cleanup.enter_context(get_storage().local_path(file_handle))
+        rows = cleanup.enter_context(open_csv_chunk(file_path, start, end, fieldnames, encoding))
+        validator = CSVValidator(shared_claim_ids=RedisClaimIdSet(job_id), date_format=date_format)
+        
+        result = _process_rows(
+            db, rows, job_id, tenant_id,
+            pipeline=pipeline,
+            validator=validator,
+            first_row_number=first_row_number,
+            ingest_mode=ingest_mode
+        )
+        result["status"] = "completed"
+    
+    except Exception as e:
+        db.rollback()
+        print(f" Chunk {start}-{end} of job {job_id} failed: {str(e)}")
+        result = {
+            "status": "failed",
+            "error": str(e),
+            "total_rows": 0,
+            "success_count": 0,
+            "error_count": 0,
+            "new_count": 0,
+            "existing_count": 0,
+            "error_summary": {}
+        }
+    
+    finally:
+        cleanup.close()
+        release_tenant_slot(tenant_id, INGESTION_CHUNK_SLOTS, self.request.id)
+    
+    result["batches_dispatched"] = pipeline["batches_dispatched"] if pipeline else 0
+    return result
+
+
+@celery_app.task(base=DatabaseTask, bind=True, name='finalize_csv_ingest')
+def finalize_csv_ingest(self, chunk_results: list, job_id: str, tenant_id: str, file_handle: str, run_id: str = None):
+    """Chord callback: merge chunk totals into the job once every chunk has finished."""
+    db = self.db
+    
+    result = {
+        "total_rows": sum(r["total_rows"] for r in chunk_results),
+        "success_count": sum(r["success_count"] for r in chunk_results),
+        "error_count": sum(r["error_count"] for r in chunk_results),
+        "new_count": sum(r["new_count"] for r in chunk_results),
+        "existing_count": sum(r["existing_count"] for r in chunk_results),
+        "error_summary": dict(sum((Counter(r["error_summary"]) for r in chunk_results), Counter()))
+    }
+    failures = [r["error"] for r in chunk_results if r["status"] == "failed"]
+    pipeline = None
+    if run_id:
+        pipeline = {"run_id": run_id, "batches_dispatched": sum(r["batches_dispatched"] for r in chunk_results)}
+    
+    try:
+        _set_tenant_context(db, tenant_id)
+        
+        if failures:
+            _mark_job_failed(db, job_id, error_message=failures[0])
+        else:
+            job = _get_job(db, job_id)
+            if job:
+                _finalize_job(db, job, result)
+        
+        if pipeline:
+            _close_pipeline(db, job_id, pipeline, total_claims=result['success_count'])
+        
+        if not failures:
+            get_storage().delete(file_handle)
+    
+    finally:
+        clear_claim_id_set(job_id)
+    
+    print(f"\n{'='*80}")
+    print(f"JOB {'FAILED' if failures else 'COMPLETED'} ({len(chunk_results)} chunks)")
+    print(f"Total rows: {result['total_rows']}")
+    print(f"Successful: {result['success_count']}")
+    print(f"Errors: {result['error_count']}")
+    print(f"{'='*80}\n")
+    
+    return {
+        "status": "failed" if failures else "completed",
+        **result
+    }
 
 
 # Helper functions (no changes here, just ensure the logic is correct):
@@ -131,12 +362,13 @@ def _update_job_status(db, job, status: str):
     if status == "processing":
         job.started_at = datetime.utcnow()
     db.commit()
+    publish_job_event(str(job.id), EVENT_INGESTION_STATUS, {"status": status})
     print(f" Job status: {status}\n")
 
 
-def _validate_csv_structure(rows):
+def _validate_csv_structure(headers):
     required_headers = {'claim_id', 'patient_id', 'ndc', 'fill_date', 'days_supply', 'quantity'}
-    headers = set(rows[0].keys()) if rows else set()
+    headers = set(headers)
     
     print(f"Detected CSV Headers: {headers}")  # Debugging: Print the detected headers
 
@@ -148,68 +380,228 @@ def _validate_csv_structure(rows):
     print(f" Available columns: {', '.join(sorted(headers))}\n")
 
 
-def _process_rows(db, rows, job_id: str, tenant_id: str):
-    validator = CSVValidator()
+def _process_rows(
+    db,
+    rows,
+    job_id: str,
+    tenant_id: str,
+    pipeline: dict = None,
+    validator: CSVValidator = None,
+    first_row_number: int = 2,
+    ingest_mode: str = INGEST_MODE_INSERT_NEW
+):
+    validator = validator or CSVValidator()
+    loader = ClaimCopyLoader(db, tenant_id, job_id, mode=ingest_mode)
     
     print(f" Processing rows (client schema format)...\n")
     
     total_rows = 0
-    success_count = 0
+    valid_count = 0
     error_count = 0
+    # Counts already added to the job's published totals
+    reported = (0, 0, 0)
     
-    for row_number, row in enumerate(rows, start=2):
-        total_rows += 1
+    for batch, screens in _row_batches(rows, validator.BATCH_SIZE):
+        errors = validator.validate_batch(batch, first_row_number, screens)
+        
+        row_numbers = range(first_row_number, first_row_number + len(batch))
         
-        try:
-            error = validator.validate_row(row, row_number)
+        for row_number, row, error, fill_date in zip(row_numbers, batch, errors, validator.fill_dates):
+            total_rows += 1
             
-            if error:
-                _log_error(db, job_id, tenant_id, error, row)
-                error_count += 1
-                print(f"    Row {row_number}: {error.error_code} - {error.error_message}")
-            else:
-                _create_claim(db, row, job_id, tenant_id)
-                success_count += 1
-                
-                if success_count % 100 == 0:
-                    print(f"    Progress: {success_count} claims saved...")
-        
-        except Exception as e:
+            if error is None:
+                try:
+                    loader.add_claim(row, fill_date=fill_date)
+                    valid_count += 1
+                    continue
+                except Exception as e:
+                    error = ValidationError(
+                        row_number=row_number,
+                        error_code="E999",
+                        error_message=f"Unexpected error: {str(e)}"
+                    )
+            
+            loader.add_error(error, row)
             error_count += 1
-            error = ValidationError(
-                row_number=row_number,
-                error_code="E999",
-                error_message=f"Unexpected error: {str(e)}"
-            )
-            _log_error(db, job_id, tenant_id, error, row)
-            print(f"    Row {row_number}: E999 - {e}")
+            if error_count <= LOGGED_ERROR_ROWS:
+                print(f"    Row {row_number}: {error.error_code} - {error.error_message}")
+        
+        first_row_number += len(batch)
         
-        if total_rows % 100 == 0:
-            db.commit()
+        if loader.pending >= loader.chunk_size:
+            _flush_chunk(loader, job_id, tenant_id, pipeline)
+            reported = _publish_progress(job_id, loader, reported, total_rows, valid_count, error_count)
+            print(f"    Progress: {reported[1]} claims saved...")
     
     print(f"\n Final commit...")
-    db.commit()
+    _flush_chunk(loader, job_id, tenant_id, pipeline)
+    reported = _publish_progress(job_id, loader, reported, total_rows, valid_count, error_count)
     print(f" All data saved!\n")
     
     return {
         "total_rows": total_rows,
-        "success_count": success_count,
-        "error_count": error_count
+        "success_count": reported[1],
+        "error_count": error_count,
+        "new_count": loader.new_count,
+        "existing_count": loader.existing_count,
+        "error_summary": dict(loader.error_counts)
     }
 
 
-def _create_claim(db, row: dict, job_id: str, tenant_id: str):
-    # Claim creation logic remains unchanged
-    pass
+def _row_batches(rows, batch_size: int):
+    """Yield (rows, screens) batches; Parquet/Arrow readers range-check their typed columns in Arrow."""
+    if isinstance(rows, ColumnarRowReader):
+        yield from rows.iter_batches(batch_size)
+        return
+    
+    row_iter = iter(rows)
+    while True:
+        batch = list(islice(row_iter, batch_size))
+        if not batch:
+            return
+        yield batch, None
+
+
+def _publish_progress(job_id: str, loader: ClaimCopyLoader, reported: tuple, total_rows: int, valid_count: int, error_count: int) -> tuple:
+    """Publish what changed since the last flush; returns the new reported totals."""
+    # Valid rows that insert_new skipped wrote nothing, so they are not successes
+    success_count = valid_count - loader.skipped_count
+    publish_ingest_progress(job_id, total_rows - reported[0], success_count - reported[1], error_count - reported[2])
+    return (total_rows, success_count, error_count)
+
+
+def _start_chunked_ingest(
+    job_id: str,
+    tenant_id: str,
+    file_handle: str,
+    file_path: str,
+    rows,
+    pipeline: dict = None,
+    ingest_mode: str = INGEST_MODE_INSERT_NEW
+) -> int:
+    ranges = plan_csv_chunks(file_path, INGEST_CHUNK_BYTES, len(rows.fieldnames))
+    run_id = pipeline["run_id"] if pipeline else None
+    
+    # Sniffed once from the head of the file so every chunk parses dates the same way
+    date_format = CSVValidator().sniff_date_format(
+        (row.get('fill_date') or '').strip()
+        for row in islice(rows, CSVValidator.BATCH_SIZE)
+        if None not in row.values()
+    )
+    
+    print(f" Splitting {file_handle} into {len(ranges)} chunks for parallel ingestion\n")
+    
+    # Row numbers depend on how many records every earlier range holds, so ranges are counted first
+    chord(
+        count_csv_chunk.s(file_handle, start, end, rows.encoding)
+        for start, end in ranges
+    )(start_csv_chunks.s(
+        job_id, tenant_id, file_handle, ranges,
+        rows.fieldnames, rows.encoding, run_id, ingest_mode, date_format
+    ))
+    
+    return len(ranges)
+
+
+def _flush_chunk(loader: ClaimCopyLoader, job_id: str, tenant_id: str, pipeline: dict = None):
+    claim_ids = loader.flush()
+    
+    # Committed claims go straight to fraud evaluation on another worker
+    if pipeline:
+        for start in range(0, len(claim_ids), PIPELINE_BATCH_SIZE):
+            _dispatch_fraud_batch(job_id, tenant_id, pipeline, claim_ids[start:start + PIPELINE_BATCH_SIZE])
 
-def _log_error(db, job_id: str, tenant_id: str, error: ValidationError, row: dict):
-    # Error logging logic remains unchanged
-    pass
 
 def _finalize_job(db, job, result: dict):
-    # Final job processing logic remains unchanged
-    pass
+    job.total_rows = result['total_rows']
+    job.successful_rows = result['success_count']
+    job.failed_rows = result['error_count']
+    job.new_rows = result['new_count']
+    job.existing_rows = result['existing_count']
+    job.error_summary = result['error_summary']
+    job.status = "completed"
+    job.completed_at = datetime.utcnow()
+    db.commit()
+    publish_job_event(str(job.id), EVENT_INGESTION_STATUS, {
+        "status": "completed",
+        "total_rows": result['total_rows'],
+        "success_count": result['success_count'],
+        "error_count": result['error_count']
+    })
+
 
 def _mark_job_failed(db, job_id: str, error_message: str = None):
-    # Logic for marking job as failed remains unchanged
-    pass
+    db.rollback()
+    job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+    if job:
+        job.status = "failed"
+        job.completed_at = datetime.utcnow()
+        db.commit()
+    publish_job_event(job_id, EVENT_INGESTION_STATUS, {"status": "failed", "error": error_message})
+    print(f" Job {job_id} marked failed: {error_message}")
+
+
+def _start_pipelined_run(db, job, tenant_id: str) -> str:
+    audit_run = AuditRuleRun(
+        tenant_id=uuid.UUID(tenant_id),
+        job_id=job.id,
+        run_date=datetime.utcnow(),
+        status="processing",
+        claims_processed=0,
+        flags_generated=0
+    )
+    db.add(audit_run)
+    
+    job.fraud_status = "processing"
+    job.fraud_flags_count = 0
+    job.fraud_started_at = datetime.utcnow()
+    job.fraud_completed_at = None
+    job.fraud_batches_total = None
+    job.fraud_batches_done = 0
+    db.commit()
+    
+    # Hold the job's fraud scope so a manual trigger reports this run instead of duplicating it
+    run_lock.claim(
+        run_lock.fraud_run_lock_key(tenant_id, str(job.id)),
+        run_lock.run_token(str(audit_run.id)),
+        ttl_seconds=run_lock.PIPELINE_LOCK_TTL_SECONDS
+    )
+    
+    print(f" Pipelined fraud run: {audit_run.id}\n")
+    return str(audit_run.id)
+
+
+def _dispatch_fraud_batch(job_id: str, tenant_id: str, pipeline: dict, claim_ids: list):
+    detect_fraud_for_claims.delay(job_id, tenant_id, pipeline['run_id'], claim_ids)
+    pipeline['batches_dispatched'] += 1
+    run_lock.renew(
+        run_lock.fraud_run_lock_key(tenant_id, job_id),
+        run_lock.run_token(pipeline['run_id']),
+        ttl_seconds=run_lock.PIPELINE_LOCK_TTL_SECONDS
+    )
+
+
+def _close_pipeline(db, job_id: str, pipeline: dict, total_claims: int = None):
+    """Record how many batches were queued; whoever sees the last one finish closes the run."""
+    run_id = pipeline['run_id']
+    batches_dispatched = pipeline['batches_dispatched']
+    
+    row = db.execute(
+        text("""
+            UPDATE ingestion_jobs
+            SET fraud_batches_total = :total
+            WHERE id = :job_id
+            RETURNING fraud_batches_done
+        """),
+        {"total": batches_dispatched, "job_id": job_id}
+    ).first()
+    
+    if total_claims is not None:
+        db.query(AuditRuleRun).filter(AuditRuleRun.id == uuid.UUID(run_id)).update(
+            {AuditRuleRun.total_claims: total_claims},
+            synchronize_session=False
+        )
+    db.commit()
+    
+    if row is not None and (row.fraud_batches_done or 0) >= batches_dispatched:
+        complete_pipelined_run(db, job_id, run_id)
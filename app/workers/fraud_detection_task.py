@@ -1,15 +1,28 @@
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 import uuid
+import time
 from datetime import datetime
 from typing import List, Optional
+from celery.exceptions import SoftTimeLimitExceeded
 
-from app.core.celery_config import celery_app
+from app.core.celery_config import celery_app, QUEUE_FRAUD_JOB, QUEUE_FRAUD_RETRO
 from app.core.database import SessionLocal
 from app.models.claim import Claim, Rule, FlaggedClaim, IngestionJob
 from app.models.audit_run import AuditRuleRun
 from app.services.rule_service import RuleService
 from app.services.fraud_engine import FraudDetectionEngine
+from app.services import run_service
+from app.workers.tenant_throttle import acquire_tenant_slot, release_tenant_slot, throttle_countdown
+from app.workers import run_lock
+from app.workers.progress_events import publish_job_event, EVENT_FRAUD_STATUS, EVENT_FRAUD_PROGRESS
+
+
+# Claims evaluated (and flags committed) per checkpoint
+CHECKPOINT_BATCH_SIZE = 500
+
+# Re-queue from the last checkpoint before the hard task_time_limit kills the worker
+CHECKPOINT_SOFT_TIME_LIMIT = 25 * 60
 
 
 def _update_job_fraud_status(db: Session, job_id: str, status: str, flags_count: int = 0, start: bool = False, end: bool = False):
@@ -24,63 +37,117 @@ def _update_job_fraud_status(db: Session, job_id: str, status: str, flags_count:
         if end:
             job.fraud_completed_at = datetime.utcnow()
         db.commit()
+        publish_job_event(job_id, EVENT_FRAUD_STATUS, {"fraud_status": status, "fraud_flags_count": flags_count})
 
 
-@celery_app.task(name="detect_fraud_for_job")
-def detect_fraud_for_job(job_id: Optional[str], tenant_id: str, re_run: bool = False):
+@celery_app.task(
+    bind=True,
+    name="detect_fraud_for_job",
+    acks_late=True,
+    reject_on_worker_lost=True,
+    soft_time_limit=CHECKPOINT_SOFT_TIME_LIMIT,
+    max_retries=None,
+)
+def detect_fraud_for_job(
+    self,
+    job_id: Optional[str],
+    tenant_id: str,
+    re_run: bool = False,
+    run_id: Optional[str] = None,
+    rule_id: Optional[str] = None
+):
+    # The API reserves the scope under this task's id; a resumed run already holds it under its run id
+    lock_key = run_lock.fraud_run_lock_key(tenant_id, job_id)
+    lock_token = run_lock.task_token(self.request.id)
+    
+    queue = QUEUE_FRAUD_JOB if job_id else QUEUE_FRAUD_RETRO
+    if not acquire_tenant_slot(tenant_id, queue, self.request.id):
+        print(f" Tenant {tenant_id} at {queue} concurrency cap, re-queuing")
+        # Keep the reservation alive through the back-off; the retry claims it again on arrival
+        countdown = throttle_countdown()
+        reserved_tokens = [lock_token] + ([run_lock.run_token(run_id)] if run_id else [])
+        for token in reserved_tokens:
+            run_lock.renew(lock_key, token, ttl_seconds=countdown + run_lock.LOCK_TTL_SECONDS)
+        raise self.retry(countdown=countdown)
+    
     db = SessionLocal()
     audit_run = None
+    heartbeat = None
+    retrying = False
+    
+    # A rule diff run only touches one rule's flags, so it leaves the job's fraud status alone
+    status_job_id = None if rule_id else job_id
     
     try:
-        if job_id:
-            print(f" Starting fraud detection for job: {job_id}")
-        else:
-            print(f" Starting retrospective fraud detection for all claims (tenant: {tenant_id})")
-        
         db.execute(
             text("SET app.current_tenant_id = :tenant_id"),
             {"tenant_id": tenant_id}
         )
         
-        _update_job_fraud_status(db, job_id, "processing", start=True)
+        # Resolved before claiming: a message redelivered after a worker loss has no
+        # run_id, but its run still holds the scope under the run's token
+        audit_run = _get_resumable_run(db, tenant_id, job_id, run_id, rule_id)
+        accepted = [lock_token]
+        if audit_run and (run_id or audit_run.task_id == self.request.id):
+            accepted.append(run_lock.run_token(str(audit_run.id)))
         
-        audit_run = AuditRuleRun(
-            tenant_id=uuid.UUID(tenant_id),
-            job_id=uuid.UUID(job_id) if job_id else None,
-            run_date=datetime.utcnow(),
-            status="processing"
-        )
-        db.add(audit_run)
-        db.commit()
-        db.refresh(audit_run)
-        
-        query = db.query(Claim).filter(Claim.tenant_id == uuid.UUID(tenant_id))
-        if job_id:
-            query = query.filter(Claim.ingestion_id == uuid.UUID(job_id))
+        holder = run_lock.claim(lock_key, lock_token, accepted)
+        if holder:
+            lock_token = None
+            print(f" Another fraud run holds this scope ({holder}), skipping")
+            return {
+                "status": "already_running",
+                "message": "Another fraud run is already in progress for this scope",
+                **run_lock.parse_token(holder)
+            }
         
-        claims = query.all()
+        if rule_id:
+            print(f" Starting diff run for rule {rule_id} (job: {job_id or 'all claims'})")
+        elif job_id:
+            print(f" Starting fraud detection for job: {job_id}")
+        else:
+            print(f" Starting retrospective fraud detection for all claims (tenant: {tenant_id})")
         
-        if not claims:
-            audit_run.status = "completed"
-            audit_run.completed_at = datetime.utcnow()
+        if audit_run:
+            print(f" Resuming run {audit_run.id} after claim {audit_run.checkpoint_claim_id}")
+        else:
+            _update_job_fraud_status(db, status_job_id, "processing", start=True)
+            
+            audit_run = AuditRuleRun(
+                tenant_id=uuid.UUID(tenant_id),
+                job_id=uuid.UUID(job_id) if job_id else None,
+                rule_id=uuid.UUID(rule_id) if rule_id else None,
+                run_date=datetime.utcnow(),
+                status="processing",
+                task_id=self.request.id,
+                claims_processed=0,
+                flags_generated=0,
+                flags_removed=0,
+                total_claims=_claims_query(db, tenant_id, job_id).count()
+            )
+            db.add(audit_run)
             db.commit()
-            _update_job_fraud_status(db, job_id, "completed", flags_count=0, end=True)
-            print(f" No claims found")
-            return {
-                "status": "no_claims",
-                "message": "No claims to evaluate",
-                "run_id": str(audit_run.id)
-            }
+            db.refresh(audit_run)
         
-        print(f" Found {len(claims)} claims to evaluate")
+        # Re-key the lock to the run so a duplicate trigger can report it
+        new_token = run_lock.run_token(str(audit_run.id))
+        run_lock.claim(lock_key, new_token, [lock_token])
+        lock_token = new_token
+        heartbeat = run_lock.LockHeartbeat(lock_key, lock_token).start()
         
-        active_rules = RuleService.get_active_rules(db, uuid.UUID(tenant_id))
+        if rule_id:
+            active_rules = [
+                rule for rule in [RuleService.get_rule_by_id(db, uuid.UUID(tenant_id), uuid.UUID(rule_id))]
+                if rule is not None and rule.is_active
+            ]
+        else:
+            active_rules = RuleService.get_active_rules(db, uuid.UUID(tenant_id))
         
         if not active_rules:
             audit_run.status = "completed"
             audit_run.completed_at = datetime.utcnow()
             db.commit()
-            _update_job_fraud_status(db, job_id, "completed", flags_count=0, end=True)
+            _update_job_fraud_status(db, status_job_id, "completed", flags_count=0, end=True)
             print(f"  No active rules for tenant {tenant_id}")
             return {
                 "status": "no_rules",
@@ -91,50 +158,115 @@ def detect_fraud_for_job(job_id: Optional[str], tenant_id: str, re_run: bool = F
         print(f" Found {len(active_rules)} active rules")
         
         fraud_engine = FraudDetectionEngine(db, tenant_id)
+        fraud_engine.compile_rules(active_rules)
+        fraud_engine.load_blocked_ndcs()
         
-        flags_created = 0
+        task_started = time.monotonic()
+        claims_this_task = 0
+        cancelled = False
         
-        for claim in claims:
-            for rule in active_rules:
-                if not re_run:
-                    existing_flag = db.query(FlaggedClaim).filter(
-                        FlaggedClaim.claim_id == claim.id,
-                        FlaggedClaim.rule_id == rule.id
-                    ).first()
-                    
-                    if existing_flag:
-                        continue
-                
-                result = fraud_engine.evaluate_claim(claim, rule)
-                
-                if result.get("matched", False):
-                    _create_flagged_claim(
-                        db, claim, rule, result, 
-                        tenant_id, str(audit_run.id)
-                    )
-                    flags_created += 1
-                    print(f" Flagged: {claim.claim_number} by rule '{rule.name}'")
+        for claims in _iter_claim_batches(db, tenant_id, job_id, audit_run.checkpoint_claim_id):
+            # Everything before this range is already committed, so stopping here keeps it
+            if run_service.is_cancel_requested(db, audit_run.id):
+                cancelled = True
+                break
+            
+            fraud_engine.prefetch_history(claims)
+            
+            if rule_id:
+                flags_created, flags_removed = _apply_rule_delta(
+                    db, fraud_engine, claims, active_rules[0],
+                    tenant_id, str(audit_run.id)
+                )
+                audit_run.flags_removed = (audit_run.flags_removed or 0) + flags_removed
+            else:
+                flags_created = _evaluate_batch(
+                    db, fraud_engine, claims, active_rules,
+                    tenant_id, str(audit_run.id), re_run
+                )
+            
+            # Flags for the range and the checkpoint are committed together,
+            # so a restarted task never re-evaluates a finished range.
+            audit_run.checkpoint_claim_id = claims[-1].id
+            audit_run.checkpointed_at = datetime.utcnow()
+            audit_run.claims_processed = (audit_run.claims_processed or 0) + len(claims)
+            audit_run.flags_generated = (audit_run.flags_generated or 0) + flags_created
+            
+            # Progress rides on the checkpoint commit, so it is published once per range
+            claims_this_task += len(claims)
+            elapsed = time.monotonic() - task_started
+            if elapsed > 0:
+                audit_run.claims_per_second = claims_this_task / elapsed
+            db.commit()
+            publish_job_event(status_job_id, EVENT_FRAUD_PROGRESS, run_service.describe_progress(audit_run))
+            
+            print(f" Checkpoint: {audit_run.claims_processed} claims evaluated, {audit_run.flags_generated} flags")
+        
+        if cancelled:
+            audit_run.status = "cancelled"
+            audit_run.completed_at = datetime.utcnow()
+            audit_run.rules_executed = len(active_rules)
+            db.commit()
+            _update_job_fraud_status(db, status_job_id, "cancelled", flags_count=audit_run.flags_generated, end=True)
+            print(f" Run {audit_run.id} cancelled after {audit_run.claims_processed} claims")
+            return {
+                "status": "cancelled",
+                "run_id": str(audit_run.id),
+                "claims_evaluated": audit_run.claims_processed,
+                "rules_applied": len(active_rules),
+                "flags_created": audit_run.flags_generated,
+                "flags_removed": audit_run.flags_removed or 0
+            }
+        
+        if not audit_run.claims_processed:
+            audit_run.status = "completed"
+            audit_run.completed_at = datetime.utcnow()
+            db.commit()
+            _update_job_fraud_status(db, status_job_id, "completed", flags_count=0, end=True)
+            print(f" No claims found")
+            return {
+                "status": "no_claims",
+                "message": "No claims to evaluate",
+                "run_id": str(audit_run.id)
+            }
         
         audit_run.status = "completed"
         audit_run.completed_at = datetime.utcnow()
         audit_run.rules_executed = len(active_rules)
-        audit_run.claims_processed = len(claims)
-        audit_run.flags_generated = flags_created
         
         db.commit()
         
-        _update_job_fraud_status(db, job_id, "completed", flags_count=flags_created, end=True)
+        _update_job_fraud_status(db, status_job_id, "completed", flags_count=audit_run.flags_generated, end=True)
         
-        print(f" Fraud detection complete: {flags_created} claims flagged")
+        print(f" Fraud detection complete: {audit_run.flags_generated} claims flagged")
         
         return {
             "status": "completed",
             "run_id": str(audit_run.id),
-            "claims_evaluated": len(claims),
+            "claims_evaluated": audit_run.claims_processed,
             "rules_applied": len(active_rules),
-            "flags_created": flags_created
+            "flags_created": audit_run.flags_generated,
+            "flags_removed": audit_run.flags_removed or 0
         }
     
+    except SoftTimeLimitExceeded:
+        # Drop the partial range; the retry continues from the last checkpoint.
+        # The lock stays with the run so nothing else starts on this scope meanwhile.
+        db.rollback()
+        retrying = True
+        print(f" Time limit reached, re-queuing run {audit_run.id if audit_run else None} from checkpoint")
+        # job_id/tenant_id stay positional, as the API sends them; repeating them
+        # as kwargs would make the retried call fail with "multiple values"
+        raise self.retry(
+            args=[job_id, tenant_id],
+            kwargs={
+                "re_run": re_run,
+                "run_id": str(audit_run.id) if audit_run else None,
+                "rule_id": rule_id
+            },
+            countdown=5
+        )
+    
     except Exception as e:
         db.rollback()
         if audit_run:
@@ -142,7 +274,7 @@ def detect_fraud_for_job(job_id: Optional[str], tenant_id: str, re_run: bool = F
             audit_run.error_message = str(e)
             audit_run.completed_at = datetime.utcnow()
             db.commit()
-        _update_job_fraud_status(db, job_id, "failed", end=True)
+        _update_job_fraud_status(db, status_job_id, "failed", end=True)
         print(f" Fraud detection failed: {str(e)}")
         return {
             "status": "failed",
@@ -150,8 +282,449 @@ def detect_fraud_for_job(job_id: Optional[str], tenant_id: str, re_run: bool = F
             "run_id": str(audit_run.id) if audit_run else None
         }
     
+    finally:
+        if heartbeat:
+            heartbeat.stop()
+        if lock_token and not retrying:
+            run_lock.release(lock_key, lock_token)
+        db.close()
+        release_tenant_slot(tenant_id, queue, self.request.id)
+
+
+@celery_app.task(
+    bind=True,
+    name="detect_fraud_for_claims",
+    acks_late=True,
+    reject_on_worker_lost=True,
+    max_retries=None,
+)
+def detect_fraud_for_claims(self, job_id: str, tenant_id: str, run_id: str, claim_ids: List[str]):
+    """Evaluate one committed ingestion batch of a pipelined run.
+    
+    Only rules that look at the claim alone are applied here; history rules
+    wait for reconcile_pipelined_run, since a batch cannot see claims from
+    batches committed after it.
+    """
+    lock_key = run_lock.fraud_run_lock_key(tenant_id, job_id)
+    
+    if not acquire_tenant_slot(tenant_id, QUEUE_FRAUD_JOB, self.request.id):
+        # Still queued, so keep the run's scope reserved
+        run_lock.renew(lock_key, run_lock.run_token(run_id), ttl_seconds=run_lock.PIPELINE_LOCK_TTL_SECONDS)
+        raise self.retry(countdown=throttle_countdown())
+    
+    db = SessionLocal()
+    
+    try:
+        db.execute(
+            text("SET app.current_tenant_id = :tenant_id"),
+            {"tenant_id": tenant_id}
+        )
+        
+        claims = db.query(Claim).filter(
+            Claim.tenant_id == uuid.UUID(tenant_id),
+            Claim.id.in_([uuid.UUID(claim_id) for claim_id in claim_ids])
+        ).order_by(Claim.id).all()
+        
+        active_rules = [
+            rule for rule in RuleService.get_active_rules(db, uuid.UUID(tenant_id))
+            if rule.logic_type not in FraudDetectionEngine.HISTORY_LOGIC_TYPES
+        ]
+        
+        # A cancelled run still counts the batch so the pipeline can close
+        if run_service.is_cancel_requested(db, uuid.UUID(run_id)):
+            claims = []
+        
+        flags_created = 0
+        if claims and active_rules:
+            fraud_engine = FraudDetectionEngine(db, tenant_id)
+            fraud_engine.compile_rules(active_rules)
+            fraud_engine.load_blocked_ndcs()
+            fraud_engine.prefetch_history(claims)
+            
+            flags_created = _evaluate_batch(
+                db, fraud_engine, claims, active_rules,
+                tenant_id, run_id
+            )
+        
+        # Counters are bumped in SQL so concurrent batches never overwrite each other
+        db.execute(
+            text("""
+                UPDATE audit_rule_runs
+                SET claims_processed = COALESCE(claims_processed, 0) + :claims,
+                    flags_generated = COALESCE(flags_generated, 0) + :flags,
+                    rules_executed = :rules,
+                    checkpointed_at = :now
+                WHERE id = :run_id
+            """),
+            {
+                "claims": len(claims),
+                "flags": flags_created,
+                "rules": len(active_rules),
+                "now": datetime.utcnow(),
+                "run_id": run_id
+            }
+        )
+        row = db.execute(
+            text("""
+                UPDATE ingestion_jobs
+                SET fraud_batches_done = COALESCE(fraud_batches_done, 0) + 1,
+                    fraud_flags_count = COALESCE(fraud_flags_count, 0) + :flags
+                WHERE id = :job_id
+                RETURNING fraud_batches_done, fraud_batches_total, fraud_flags_count
+            """),
+            {"flags": flags_created, "job_id": job_id}
+        ).first()
+        db.commit()
+        
+        if row is not None:
+            publish_job_event(job_id, EVENT_FRAUD_PROGRESS, {
+                "run_id": run_id,
+                "batches_done": row.fraud_batches_done,
+                "batches_total": row.fraud_batches_total,
+                "flags_generated": row.fraud_flags_count
+            })
+        
+        run_lock.renew(lock_key, run_lock.run_token(run_id), ttl_seconds=run_lock.PIPELINE_LOCK_TTL_SECONDS)
+        
+        print(f" Pipelined batch: {len(claims)} claims evaluated, {flags_created} flags (run {run_id})")
+        
+        if row is not None and row.fraud_batches_total is not None and row.fraud_batches_done >= row.fraud_batches_total:
+            complete_pipelined_run(db, job_id, run_id)
+        
+        return {
+            "status": "completed",
+            "run_id": run_id,
+            "claims_evaluated": len(claims),
+            "flags_created": flags_created
+        }
+    
+    except Exception as e:
+        db.rollback()
+        audit_run = db.query(AuditRuleRun).filter(AuditRuleRun.id == uuid.UUID(run_id)).first()
+        if audit_run:
+            audit_run.status = "failed"
+            audit_run.error_message = str(e)
+            audit_run.completed_at = datetime.utcnow()
+            db.commit()
+        _update_job_fraud_status(db, job_id, "failed", end=True)
+        # The run is over, so the next trigger for this job should not wait out the pipeline lease
+        run_lock.release(lock_key, run_lock.run_token(run_id))
+        print(f" Pipelined fraud batch failed: {str(e)}")
+        return {
+            "status": "failed",
+            "error": str(e),
+            "run_id": run_id
+        }
+    
     finally:
         db.close()
+        release_tenant_slot(tenant_id, QUEUE_FRAUD_JOB, self.request.id)
+
+
+def complete_pipelined_run(db: Session, job_id: str, run_id: str):
+    """Hand a pipelined run to its history pass once ingestion has finished and every queued batch is evaluated."""
+    audit_run = db.query(AuditRuleRun).filter(AuditRuleRun.id == uuid.UUID(run_id)).first()
+    if not audit_run or audit_run.status != "processing":
+        return
+    
+    if audit_run.cancel_requested:
+        _close_pipelined_run(db, job_id, audit_run, "cancelled")
+        return
+    
+    reconcile_pipelined_run.delay(job_id, str(audit_run.tenant_id), run_id)
+
+
+@celery_app.task(
+    bind=True,
+    name="reconcile_pipelined_run",
+    acks_late=True,
+    reject_on_worker_lost=True,
+    soft_time_limit=CHECKPOINT_SOFT_TIME_LIMIT,
+    max_retries=None,
+)
+def reconcile_pipelined_run(self, job_id: str, tenant_id: str, run_id: str):
+    """
+    Apply the history rules to a pipelined job once all of its claims are in.
+    
+    Batches are evaluated as they are committed, so an earlier fill that sits
+    later in the file was invisible to the batch holding the refill. This pass
+    runs DUPLICATE_WINDOW, EARLY_REFILL, OVERLAP and COUNT_WINDOW over the whole
+    job, as a non-pipelined run would, then closes the run. Like
+    detect_fraud_for_job it checkpoints by claim id and re-queues itself from
+    the checkpoint before the hard time limit, so a large job is never killed
+    with the run left "processing".
+    """
+    lock_key = run_lock.fraud_run_lock_key(tenant_id, job_id)
+    lock_token = run_lock.run_token(run_id)
+    
+    if not acquire_tenant_slot(tenant_id, QUEUE_FRAUD_JOB, self.request.id):
+        run_lock.renew(lock_key, lock_token, ttl_seconds=run_lock.PIPELINE_LOCK_TTL_SECONDS)
+        raise self.retry(countdown=throttle_countdown())
+    
+    db = SessionLocal()
+    heartbeat = None
+    audit_run = None
+    
+    try:
+        db.execute(
+            text("SET app.current_tenant_id = :tenant_id"),
+            {"tenant_id": tenant_id}
+        )
+        
+        audit_run = db.query(AuditRuleRun).filter(AuditRuleRun.id == uuid.UUID(run_id)).first()
+        if not audit_run or audit_run.status != "processing":
+            return {"status": "skipped", "run_id": run_id}
+        
+        # Re-taken on every attempt, since the lease may have lapsed while a retry waited
+        run_lock.claim(lock_key, lock_token, [lock_token])
+        heartbeat = run_lock.LockHeartbeat(lock_key, lock_token).start()
+        
+        history_rules = [
+            rule for rule in RuleService.get_active_rules(db, uuid.UUID(tenant_id))
+            if rule.logic_type in FraudDetectionEngine.HISTORY_LOGIC_TYPES
+        ]
+        
+        flags_created = 0
+        cancelled = False
+        
+        if history_rules:
+            fraud_engine = FraudDetectionEngine(db, tenant_id)
+            fraud_engine.compile_rules(history_rules)
+            
+            for claims in _iter_claim_batches(db, tenant_id, job_id, audit_run.checkpoint_claim_id):
+                if run_service.is_cancel_requested(db, audit_run.id):
+                    cancelled = True
+                    break
+                
+                fraud_engine.prefetch_history(claims)
+                batch_flags = _evaluate_batch(
+                    db, fraud_engine, claims, history_rules,
+                    tenant_id, run_id
+                )
+                
+                audit_run.checkpoint_claim_id = claims[-1].id
+                audit_run.checkpointed_at = datetime.utcnow()
+                audit_run.flags_generated = (audit_run.flags_generated or 0) + batch_flags
+                db.execute(
+                    text("""
+                        UPDATE ingestion_jobs
+                        SET fraud_flags_count = COALESCE(fraud_flags_count, 0) + :flags
+                        WHERE id = :job_id
+                    """),
+                    {"flags": batch_flags, "job_id": job_id}
+                )
+                db.commit()
+                flags_created += batch_flags
+        
+        _close_pipelined_run(db, job_id, audit_run, "cancelled" if cancelled else "completed")
+        
+        print(f" History pass for run {run_id}: {flags_created} flags")
+        
+        return {
+            "status": "cancelled" if cancelled else "completed",
+            "run_id": run_id,
+            "flags_created": flags_created
+        }
+    
+    except SoftTimeLimitExceeded:
+        # Drop the partial range and continue from the last checkpoint; the run keeps its lock
+        db.rollback()
+        print(f" Time limit reached, re-queuing history pass for run {run_id} from checkpoint")
+        raise self.retry(args=[job_id, tenant_id, run_id], countdown=5)
+    
+    except Exception as e:
+        db.rollback()
+        if audit_run:
+            audit_run.status = "failed"
+            audit_run.error_message = str(e)
+            audit_run.completed_at = datetime.utcnow()
+            db.commit()
+        _update_job_fraud_status(db, job_id, "failed", end=True)
+        run_lock.release(lock_key, lock_token)
+        print(f" Pipelined history pass failed: {str(e)}")
+        return {
+            "status": "failed",
+            "error": str(e),
+            "run_id": run_id
+        }
+    
+    finally:
+        if heartbeat:
+            heartbeat.stop()
+        db.close()
+        release_tenant_slot(tenant_id, QUEUE_FRAUD_JOB, self.request.id)
+
+
+def _close_pipelined_run(db: Session, job_id: str, audit_run: AuditRuleRun, status: str):
+    audit_run.status = status
+    audit_run.completed_at = datetime.utcnow()
+    db.commit()
+    
+    job = db.query(IngestionJob).filter(IngestionJob.id == uuid.UUID(job_id)).first()
+    if job:
+        job.fraud_status = status
+        job.fraud_completed_at = datetime.utcnow()
+        db.commit()
+        publish_job_event(job_id, EVENT_FRAUD_STATUS, {"fraud_status": status, "fraud_flags_count": job.fraud_flags_count or 0})
+        run_lock.release(
+            run_lock.fraud_run_lock_key(str(job.tenant_id), job_id),
+            run_lock.run_token(str(audit_run.id))
+        )
+    
+    print(f" Pipelined fraud detection {status}: {audit_run.flags_generated} claims flagged")
+
+
+def _get_resumable_run(
+    db: Session,
+    tenant_id: str,
+    job_id: Optional[str],
+    run_id: Optional[str] = None,
+    rule_id: Optional[str] = None
+) -> Optional[AuditRuleRun]:
+    """Find an unfinished run for the same scope so a restarted task picks up where it stopped."""
+    query = db.query(AuditRuleRun).filter(
+        AuditRuleRun.tenant_id == uuid.UUID(tenant_id),
+        AuditRuleRun.status == "processing"
+    )
+    
+    if run_id:
+        return query.filter(AuditRuleRun.id == uuid.UUID(run_id)).first()
+    
+    if job_id:
+        query = query.filter(AuditRuleRun.job_id == uuid.UUID(job_id))
+    else:
+        query = query.filter(AuditRuleRun.job_id.is_(None))
+    
+    if rule_id:
+        query = query.filter(AuditRuleRun.rule_id == uuid.UUID(rule_id))
+    else:
+        query = query.filter(AuditRuleRun.rule_id.is_(None))
+    
+    return query.order_by(AuditRuleRun.run_date.desc()).first()
+
+
+def _claims_query(db: Session, tenant_id: str, job_id: Optional[str]):
+    query = db.query(Claim).filter(Claim.tenant_id == uuid.UUID(tenant_id))
+    if job_id:
+        query = query.filter(Claim.ingestion_id == uuid.UUID(job_id))
+    return query
+
+
+def _iter_claim_batches(db: Session, tenant_id: str, job_id: Optional[str], after_claim_id=None):
+    """Yield claims in ordered claim-id ranges of CHECKPOINT_BATCH_SIZE, starting after the checkpoint."""
+    last_id = after_claim_id
+    
+    while True:
+        query = _claims_query(db, tenant_id, job_id)
+        if last_id is not None:
+            query = query.filter(Claim.id > last_id)
+        
+        claims = query.order_by(Claim.id).limit(CHECKPOINT_BATCH_SIZE).all()
+        if not claims:
+            return
+        
+        yield claims
+        
+        if len(claims) < CHECKPOINT_BATCH_SIZE:
+            return
+        last_id = claims[-1].id
+
+
+def _evaluate_batch(
+    db: Session,
+    fraud_engine: FraudDetectionEngine,
+    claims: List[Claim],
+    rules: List[Rule],
+    tenant_id: str,
+    run_id: str,
+    re_run: bool = False
+) -> int:
+    existing_flags = set()
+    if not re_run:
+        existing_flags = set(
+            db.query(FlaggedClaim.claim_id, FlaggedClaim.rule_id).filter(
+                FlaggedClaim.claim_id.in_([claim.id for claim in claims])
+            ).all()
+        )
+    
+    flags_created = 0
+    
+    for claim in claims:
+        for rule in rules:
+            if (claim.id, rule.id) in existing_flags:
+                continue
+            
+            result = fraud_engine.evaluate_claim(claim, rule)
+            
+            if result.get("matched", False):
+                _create_flagged_claim(
+                    db, claim, rule, result,
+                    tenant_id, run_id
+                )
+                flags_created += 1
+                print(f" Flagged: {claim.claim_number} by rule '{rule.name}'")
+    
+    return flags_created
+
+
+def _apply_rule_delta(
+    db: Session,
+    fraud_engine: FraudDetectionEngine,
+    claims: List[Claim],
+    rule: Rule,
+    tenant_id: str,
+    run_id: str
+) -> tuple:
+    """Re-evaluate one rule on a claim range and apply the flag delta in bulk.
+    
+    Claims that match and carry no flag for the rule get a new flag. Flags from
+    earlier rule versions are moved to the current version if the claim still
+    matches, and removed if it no longer does. Reviewed flags are never removed,
+    so reviewer decisions survive rule edits.
+    """
+    existing_flags = {}
+    for flag in db.query(FlaggedClaim).filter(
+        FlaggedClaim.rule_id == rule.id,
+        FlaggedClaim.claim_id.in_([claim.id for claim in claims])
+    ).all():
+        existing_flags.setdefault(flag.claim_id, []).append(flag)
+    
+    new_flags = []
+    refreshed_flags = []
+    stale_flag_ids = []
+    
+    for claim in claims:
+        result = fraud_engine.evaluate_claim(claim, rule)
+        matched = result.get("matched", False)
+        flags = existing_flags.get(claim.id, [])
+        prior_flags = [flag for flag in flags if flag.rule_version < rule.version]
+        
+        if matched:
+            if not flags:
+                new_flags.append(_build_flagged_claim(claim, rule, result, tenant_id, run_id))
+            for flag in prior_flags:
+                refreshed = _build_flagged_claim(claim, rule, result, tenant_id, run_id)
+                refreshed_flags.append({
+                    "id": flag.id,
+                    "rule_version": rule.version,
+                    "run_id": refreshed.run_id,
+                    "matched_conditions": refreshed.matched_conditions,
+                    "explanation": refreshed.explanation,
+                    "evidence_json": refreshed.evidence_json
+                })
+        else:
+            stale_flag_ids.extend(flag.id for flag in prior_flags if not flag.reviewed)
+    
+    if new_flags:
+        db.bulk_save_objects(new_flags)
+    if refreshed_flags:
+        db.bulk_update_mappings(FlaggedClaim, refreshed_flags)
+    if stale_flag_ids:
+        db.query(FlaggedClaim).filter(
+            FlaggedClaim.id.in_(stale_flag_ids)
+        ).delete(synchronize_session=False)
+    
+    return len(new_flags), len(stale_flag_ids)
 
 
 def _create_flagged_claim(
@@ -162,6 +735,16 @@ def _create_flagged_claim(
     tenant_id: str,
     run_id: Optional[str] = None
 ):
+    db.add(_build_flagged_claim(claim, rule, explanation, tenant_id, run_id))
+
+
+def _build_flagged_claim(
+    claim: Claim,
+    rule: Rule,
+    explanation: dict,
+    tenant_id: str,
+    run_id: Optional[str] = None
+) -> FlaggedClaim:
     
     explanation_dict = explanation.get("explanation", {})
     if isinstance(explanation_dict, str):
@@ -192,4 +775,4 @@ def _create_flagged_claim(
         reviewed=False
     )
     
-    db.add(flagged_claim)
+    return flagged_claim
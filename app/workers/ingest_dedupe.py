@@ -0,0 +1,35 @@
+from typing import List
+
+from app.core.redis_client import get_redis
+
+
+# Long enough to outlive the slowest chunk of a split upload
+CLAIM_ID_SET_TTL_SECONDS = 6 * 60 * 60
+
+
+def _claim_id_set_key(job_id: str) -> str:
+    return f"ingest_claim_ids:{job_id}"
+
+
+class RedisClaimIdSet:
+    """Claim ids seen so far in one upload, shared by all of its chunk tasks."""
+    
+    def __init__(self, job_id: str):
+        self.key = _claim_id_set_key(job_id)
+    
+    def add_many(self, claim_ids: List[str]) -> List[bool]:
+        """SADD each id in order; True where this call added it first."""
+        if not claim_ids:
+            return []
+        pipe = get_redis().pipeline(transaction=False)
+        for claim_id in claim_ids:
+            pipe.sadd(self.key, claim_id)
+        pipe.expire(self.key, CLAIM_ID_SET_TTL_SECONDS)
+        return [bool(added) for added in pipe.execute()[:-1]]
+
+
+def clear_claim_id_set(job_id: str):
+    try:
+        get_redis().delete(_claim_id_set_key(job_id))
+    except Exception as e:
+        print(f" Failed to clear claim id set for job {job_id}: {e}")
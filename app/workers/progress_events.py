@@ -0,0 +1,72 @@
+import json
+from typing import Optional
+
+from app.core.redis_client import get_redis
+
+
+# Matches the claim id set: long enough to outlive the slowest chunk of a split upload
+PROGRESS_TTL_SECONDS = 6 * 60 * 60
+
+EVENT_INGESTION_STATUS = "ingestion_status"
+EVENT_INGESTION_PROGRESS = "ingestion_progress"
+EVENT_FRAUD_STATUS = "fraud_status"
+EVENT_FRAUD_PROGRESS = "fraud_progress"
+
+
+def job_events_channel(job_id: str) -> str:
+    return f"job_events:{job_id}"
+
+
+def _progress_key(job_id: str) -> str:
+    return f"job_progress:{job_id}"
+
+
+def publish_job_event(job_id: str, event: str, data: dict):
+    """Publish one event for a job's SSE subscribers; fails open like the other Redis helpers."""
+    if not job_id:
+        return
+    try:
+        get_redis().publish(
+            job_events_channel(job_id),
+            json.dumps({"event": event, **data}, default=str)
+        )
+    except Exception as e:
+        print(f" Failed to publish {event} for job {job_id}: {e}")
+
+
+def publish_ingest_progress(job_id: str, rows: int, accepted: int, rejected: int):
+    """
+    Add one flush's row counts to the job's running totals and publish them.
+
+    Totals live in a Redis hash so the chunks of a split upload report one
+    combined figure instead of each its own.
+    """
+    key = _progress_key(job_id)
+    try:
+        pipe = get_redis().pipeline(transaction=True)
+        pipe.hincrby(key, "total_rows", rows)
+        pipe.hincrby(key, "success_count", accepted)
+        pipe.hincrby(key, "error_count", rejected)
+        pipe.expire(key, PROGRESS_TTL_SECONDS)
+        total_rows, success_count, error_count, _ = pipe.execute()
+    except Exception as e:
+        print(f" Failed to record progress for job {job_id}: {e}")
+        return
+
+    publish_job_event(job_id, EVENT_INGESTION_PROGRESS, {
+        "total_rows": total_rows,
+        "success_count": success_count,
+        "error_count": error_count
+    })
+
+
+def get_ingest_progress(job_id: str) -> Optional[dict]:
+    """Running totals recorded by publish_ingest_progress; None when there are none or Redis is down."""
+    try:
+        totals = get_redis().hgetall(_progress_key(job_id))
+    except Exception as e:
+        print(f" Failed to read progress for job {job_id}: {e}")
+        return None
+    if not totals:
+        return None
+    return {field: int(value) for field, value in totals.items()}
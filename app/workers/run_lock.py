@@ -0,0 +1,125 @@
+import threading
+from typing import Iterable, Optional
+
+from app.core.redis_client import get_redis
+
+
+# The lease expires quickly so a dead worker frees its scope; live runs renew it
+LOCK_TTL_SECONDS = 120
+HEARTBEAT_INTERVAL_SECONDS = 30
+
+# A pipelined run has no worker to renew it while its batches wait in the queue,
+# so its lease is sized for the queue wait and refreshed by every batch
+PIPELINE_LOCK_TTL_SECONDS = 30 * 60
+
+# Take the lock when it is free or held by one of the accepted tokens
+CLAIM_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current then
+    local accepted = false
+    for i = 3, #ARGV do
+        if current == ARGV[i] then accepted = true end
+    end
+    if not accepted then return current end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return false
+"""
+
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def fraud_run_lock_key(tenant_id: str, job_id: Optional[str]) -> str:
+    return f"fraud_run_lock:{tenant_id}:{job_id or 'retro'}"
+
+
+def task_token(task_id: str) -> str:
+    return f"task:{task_id}"
+
+
+def run_token(run_id: str) -> str:
+    return f"run:{run_id}"
+
+
+def parse_token(token: str) -> dict:
+    """Split a lock value into the run_id / task_id the API reports back."""
+    kind, _, value = (token or "").partition(":")
+    return {
+        "run_id": value if kind == "run" else None,
+        "task_id": value if kind == "task" else None,
+    }
+
+
+def claim(key: str, token: str, accepted: Iterable[str] = (), ttl_seconds: int = LOCK_TTL_SECONDS) -> Optional[str]:
+    """
+    Acquire or take over the lock. Returns None on success, otherwise the
+    current holder's token. Fails open when Redis is unavailable.
+    """
+    try:
+        holder = get_redis().eval(
+            CLAIM_SCRIPT, 1, key, token, ttl_seconds * 1000, *accepted
+        )
+        return holder or None
+    except Exception as e:
+        print(f" Run lock unavailable, continuing without it: {e}")
+        return None
+
+
+def is_held_by(key: str, tokens: Iterable[str]) -> bool:
+    """
+    Whether one of tokens holds the lock with an unexpired lease. Reports
+    held when Redis is unavailable, so callers never treat a live run as dead.
+    """
+    try:
+        return get_redis().get(key) in set(tokens)
+    except Exception as e:
+        print(f" Run lock unavailable, assuming it is held: {e}")
+        return True
+
+
+def renew(key: str, token: str, ttl_seconds: int = LOCK_TTL_SECONDS) -> bool:
+    try:
+        return bool(get_redis().eval(RENEW_SCRIPT, 1, key, token, ttl_seconds * 1000))
+    except Exception as e:
+        print(f" Failed to renew run lock: {e}")
+        return False
+
+
+def release(key: str, token: str):
+    try:
+        get_redis().eval(RELEASE_SCRIPT, 1, key, token)
+    except Exception as e:
+        print(f" Failed to release run lock: {e}")
+
+
+class LockHeartbeat:
+    """Background thread that keeps renewing a held lock until stopped."""
+    
+    def __init__(self, key: str, token: str):
+        self.key = key
+        self.token = token
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stopped.set()
+    
+    def _run(self):
+        while not self._stopped.wait(HEARTBEAT_INTERVAL_SECONDS):
+            renew(self.key, self.token)
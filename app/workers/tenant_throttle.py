@@ -0,0 +1,70 @@
+import random
+import time
+
+from app.core.config import settings
+from app.core.celery_config import QUEUE_INGESTION, QUEUE_FRAUD_JOB, QUEUE_FRAUD_RETRO
+from app.core.redis_client import get_redis
+
+
+# Chunks of a split upload share their own pool so one big file can fan out
+# without counting against the tenant's whole-upload cap
+INGESTION_CHUNK_SLOTS = "ingestion_chunks"
+
+# A slot outlives the hard task time limit, so a killed worker never leaks it for long
+SLOT_TTL_SECONDS = 31 * 60
+
+QUEUE_LIMITS = {
+    QUEUE_INGESTION: lambda: settings.TENANT_MAX_CONCURRENT_INGESTION,
+    INGESTION_CHUNK_SLOTS: lambda: settings.TENANT_MAX_CONCURRENT_INGEST_CHUNKS,
+    QUEUE_FRAUD_JOB: lambda: settings.TENANT_MAX_CONCURRENT_FRAUD_JOB,
+    QUEUE_FRAUD_RETRO: lambda: settings.TENANT_MAX_CONCURRENT_FRAUD_RETRO,
+}
+
+# Slots are a sorted set of task ids scored by expiry; expired members are
+# swept before counting. Re-acquiring with the same task id (a retry) refreshes it.
+ACQUIRE_SLOT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZSCORE', KEYS[1], ARGV[3]) or redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], ARGV[4], ARGV[3])
+    redis.call('EXPIRE', KEYS[1], ARGV[5])
+    return 1
+end
+return 0
+"""
+
+
+def _slot_key(tenant_id: str, queue: str) -> str:
+    return f"tenant_slots:{queue}:{tenant_id}"
+
+
+def acquire_tenant_slot(tenant_id: str, queue: str, task_id: str) -> bool:
+    """Claim one of the tenant's concurrent slots on a queue. Fails open if Redis is down."""
+    now = time.time()
+    try:
+        acquired = get_redis().eval(
+            ACQUIRE_SLOT_SCRIPT,
+            1,
+            _slot_key(tenant_id, queue),
+            now,
+            QUEUE_LIMITS[queue](),
+            task_id,
+            now + SLOT_TTL_SECONDS,
+            SLOT_TTL_SECONDS,
+        )
+        return bool(acquired)
+    except Exception as e:
+        print(f" Tenant throttle unavailable, running unthrottled: {e}")
+        return True
+
+
+def release_tenant_slot(tenant_id: str, queue: str, task_id: str):
+    try:
+        get_redis().zrem(_slot_key(tenant_id, queue), task_id)
+    except Exception as e:
+        print(f" Failed to release tenant slot: {e}")
+
+
+def throttle_countdown() -> int:
+    """Back-off for a throttled task; jitter keeps re-queued tasks from arriving in lockstep."""
+    base = settings.TENANT_THROTTLE_RETRY_SECONDS
+    return base + random.randint(0, base)
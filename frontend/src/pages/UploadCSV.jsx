@@ -1,6 +1,7 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Upload, FileText, CheckCircle, AlertCircle, Loader, Eye, Trash2, RefreshCw, X, ChevronLeft, ChevronRight } from 'lucide-react';
 import { claimsAPI } from '../utils/api';
+import { isJobActive, applyJobEvent, subscribeToJobEvents } from '../utils/jobEvents';
 
 const UploadCSV = () => {
   const [selectedFile, setSelectedFile] = useState(null);
@@ -25,12 +26,41 @@ const UploadCSV = () => {
   const [deleteConfirmJob, setDeleteConfirmJob] = useState(null);
   const [deleting, setDeleting] = useState(false);
 
+  // Live updates for jobs still in progress, one event stream each
+  const jobStreams = useRef({});
+  const selectedJobRef = useRef(null);
+
+  useEffect(() => {
+    selectedJobRef.current = selectedJob;
+  }, [selectedJob]);
+
   useEffect(() => {
     fetchJobs();
-    const interval = setInterval(fetchJobs, 5000); // Auto-refresh every 5 seconds
-    return () => clearInterval(interval);
+    const streams = jobStreams.current;
+    return () => Object.values(streams).forEach((unsubscribe) => unsubscribe());
   }, []);
 
+  const activeJobIds = jobs.filter(isJobActive).map((job) => job.job_id).join(',');
+
+  useEffect(() => {
+    activeJobIds.split(',').filter(Boolean).forEach((jobId) => {
+      if (jobStreams.current[jobId]) return;
+      jobStreams.current[jobId] = subscribeToJobEvents(
+        jobId,
+        (type, data) => {
+          setJobs((current) => current.map((job) => (job.job_id === jobId ? applyJobEvent(job, type, data) : job)));
+          if (selectedJobRef.current === jobId) {
+            setJobDetails((details) => (details ? applyJobEvent(details, type, data) : details));
+          }
+        },
+        () => {
+          delete jobStreams.current[jobId];
+          fetchJobs();
+        }
+      );
+    });
+  }, [activeJobIds]);
+
   const fetchJobs = async () => {
     try {
       const response = await claimsAPI.getJobs();
@@ -69,6 +99,10 @@ const UploadCSV = () => {
     setDeleting(true);
     try {
       await claimsAPI.deleteJob(deleteConfirmJob.job_id);
+      if (jobStreams.current[deleteConfirmJob.job_id]) {
+        jobStreams.current[deleteConfirmJob.job_id]();
+        delete jobStreams.current[deleteConfirmJob.job_id];
+      }
       setJobs(jobs.filter(j => j.job_id !== deleteConfirmJob.job_id));
       if (selectedJob === deleteConfirmJob.job_id) {
         setSelectedJob(null);
@@ -74,6 +74,13 @@ export const claimsAPI = {
     const response = await api.delete(`/claims/jobs/${jobId}`);
     return response;
   },
+  // EventSource cannot send the Authorization header, so the stream URL carries a short-lived token
+  getJobEventsToken: async (jobId) => {
+    const response = await api.post(`/claims/jobs/${jobId}/events/token`);
+    return response;
+  },
+  jobEventsUrl: (jobId, token) =>
+    `${api.defaults.baseURL}/claims/jobs/${jobId}/events?token=${encodeURIComponent(token)}`,
 };
 
 export const fraudAPI = {
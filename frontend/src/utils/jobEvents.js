@@ -0,0 +1,88 @@
+/**
+ * Live job progress over Server-Sent Events
+ */
+import { claimsAPI } from './api';
+
+const JOB_EVENT_TYPES = ['snapshot', 'ingestion_status', 'ingestion_progress', 'fraud_status', 'fraud_progress'];
+
+const RECONNECT_DELAY_MS = 3000;
+
+/**
+ * Whether a job still has events to stream (ingestion or a fraud run in progress)
+ * @param {Object} job - Job summary or status payload
+ * @returns {boolean}
+ */
+export const isJobActive = (job) =>
+  job.status === 'pending' || job.status === 'processing' || job.fraud_status === 'processing';
+
+/**
+ * Merge one job event into a job summary or status payload
+ * @param {Object} job - Current job state
+ * @param {string} type - Event type
+ * @param {Object} data - Event payload
+ * @returns {Object} Updated job state
+ */
+export const applyJobEvent = (job, type, data) => {
+  if (type === 'fraud_progress') {
+    // Carries the run's status, not the job's, so only the flag count is taken
+    return { ...job, fraud_flags_count: data.flags_generated ?? job.fraud_flags_count };
+  }
+  return { ...job, ...data };
+};
+
+/**
+ * Subscribe to a job's events until the server ends the stream
+ * @param {string} jobId - Job to follow
+ * @param {Function} onEvent - Called with (type, data) for each event
+ * @param {Function} onEnd - Called once the job has nothing more to report
+ * @returns {Function} Unsubscribe
+ */
+export const subscribeToJobEvents = (jobId, onEvent, onEnd) => {
+  let source = null;
+  let closed = false;
+  let retryTimer = null;
+
+  const close = () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    if (source) source.close();
+  };
+
+  const reconnect = () => {
+    if (!closed) retryTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+  };
+
+  const connect = async () => {
+    let token;
+    try {
+      const response = await claimsAPI.getJobEventsToken(jobId);
+      token = response.data.token;
+    } catch (err) {
+      if (err.response?.status === 404) {
+        close();
+        return;
+      }
+      console.error('Failed to open job events:', err);
+      reconnect();
+      return;
+    }
+    if (closed) return;
+
+    source = new EventSource(claimsAPI.jobEventsUrl(jobId, token));
+    JOB_EVENT_TYPES.forEach((type) => {
+      source.addEventListener(type, (e) => onEvent(type, JSON.parse(e.data)));
+    });
+    source.addEventListener('end', () => {
+      close();
+      if (onEnd) onEnd();
+    });
+    // The browser would retry with the same, by then expired, token
+    source.onerror = () => {
+      source.close();
+      reconnect();
+    };
+  };
+
+  connect();
+  return close;
+};
@@ -0,0 +1,48 @@
+from datetime import date
+
+from app.services.csv_parser import open_csv_rows
+from app.services.csv_validator import CSVValidator
+from app.workers import celery_tasks
+
+
+HEADER = "claim_id,patient_id,ndc,fill_date,days_supply,quantity\n"
+
+
+def _row(claim_id, fill_date):
+    return f"{claim_id},P1,00002-1433-80,{fill_date},30,30\n"
+
+
+def test_chunks_get_the_date_format_sniffed_from_the_file_head(tmp_path, monkeypatch):
+    # Day-first dates are only unambiguous near the top of the file
+    path = tmp_path / "claims.csv"
+    path.write_text(HEADER + _row("C1", "13/01/2024") + _row("C2", "25/01/2024") + _row("C3", "05/02/2024"))
+
+    callbacks = []
+    monkeypatch.setattr(celery_tasks, "plan_csv_chunks", lambda file_path, chunk_bytes, field_count: [(0, 1), (1, 2)])
+    monkeypatch.setattr(celery_tasks, "chord", lambda header: callbacks.append)
+
+    with open_csv_rows(file_path=str(path)) as rows:
+        celery_tasks._start_chunked_ingest("job-1", "tenant-1", "local:claims.csv", str(path), rows)
+
+    assert callbacks[0].args[-1] == "%d/%m/%Y"
+
+
+def test_chunks_are_numbered_from_the_rows_before_them(monkeypatch):
+    queued = []
+    monkeypatch.setattr(celery_tasks, "chord", lambda header: queued.extend(header) or (lambda callback: None))
+
+    celery_tasks.start_csv_chunks.run(
+        [3, 5, 2], "job-1", "tenant-1", "local:claims.csv", [(0, 10), (10, 20), (20, 30)],
+        ["claim_id"], "utf-8"
+    )
+
+    assert [signature.args[5] for signature in queued] == [2, 5, 10]
+
+
+def test_validator_uses_a_given_date_format_instead_of_sniffing():
+    rows = [dict(zip(HEADER.strip().split(","), _row("C3", "05/02/2024").strip().split(",")))]
+
+    validator = CSVValidator(date_format="%d/%m/%Y")
+    assert validator.validate_batch(rows, 2) == [None]
+
+    assert validator.fill_dates == [date(2024, 2, 5)]
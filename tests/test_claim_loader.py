@@ -0,0 +1,230 @@
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.services.claim_loader import CLAIM_COPY_COLUMNS, ClaimCopyLoader, INGEST_MODE_UPSERT
+from app.services.csv_validator import ValidationError
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+
+    def copy_expert(self, sql, buffer):
+        if self.db.fail_copy:
+            raise RuntimeError("connection lost")
+        self.db.events.append("copy errors")
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Stands in for both session.connection() and its raw DBAPI .connection."""
+
+    def __init__(self, db):
+        self.db = db
+        self.connection = self
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+
+class FakeSession:
+    """Hands out error slots like the ingestion_jobs UPDATE: up to cap, counting only what is committed."""
+
+    def __init__(self, cap, fail_copy=False):
+        self.cap = cap
+        self.fail_copy = fail_copy
+        self.stored = 0
+        self.reserved = 0
+        self.events = []
+
+    def connection(self):
+        return FakeConnection(self)
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "set_config" in sql:
+            self.events.append("pin")
+            return FakeResult(None)
+        self.events.append("reserve")
+        self.reserved = min(self.cap, self.stored + params["wanted"])
+        return FakeResult(self.reserved - self.stored)
+
+    def commit(self):
+        self.events.append("commit")
+        self.stored = self.reserved
+
+    def rollback(self):
+        self.reserved = self.stored
+
+
+def _loader(db, errors):
+    loader = ClaimCopyLoader(db, "tenant-1", "job-1", error_row_cap=db.cap)
+    for index in range(errors):
+        loader.add_error(ValidationError(index + 2, "E001", "bad row"), {"claim_id": f"C{index}"})
+    return loader
+
+
+def test_error_slots_are_reserved_in_the_copy_transaction():
+    db = FakeSession(cap=10)
+
+    _loader(db, errors=3).flush()
+
+    assert db.events == ["pin", "reserve", "copy errors", "commit"]
+    assert db.stored == 3
+
+
+def test_failed_flush_does_not_use_up_error_slots():
+    db = FakeSession(cap=10, fail_copy=True)
+    loader = _loader(db, errors=3)
+
+    with pytest.raises(RuntimeError):
+        loader.flush()
+    db.rollback()
+
+    assert "commit" not in db.events
+    assert db.stored == 0
+
+
+def test_errors_past_the_cap_are_counted_but_not_stored():
+    db = FakeSession(cap=2)
+    loader = _loader(db, errors=3)
+
+    loader.flush()
+
+    assert db.stored == 2
+    assert loader.error_counts["E001"] == 3
+
+
+class FakeRows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalar(self):
+        return 1
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeUpsertSession(FakeSession):
+    """Reports one claim as inserted and one as updated by the ON CONFLICT branch."""
+
+    def __init__(self):
+        super().__init__(cap=10)
+        self.deleted_flags = None
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "INSERT INTO claims" in sql:
+            return FakeRows([("claim-new", False), ("claim-stored", True)])
+        if "DELETE FROM flagged_claims" in sql:
+            self.deleted_flags = params["claim_ids"]
+        if "set_config" in sql:
+            return super().execute(statement, params)
+        return FakeRows([])
+
+
+def _claim_row(claim_id):
+    return {
+        "claim_id": claim_id, "patient_id": "P1", "ndc": "00002-1433-80",
+        "fill_date": "2024-01-05", "days_supply": "30", "quantity": "30",
+    }
+
+
+def test_upsert_clears_the_flags_of_overwritten_claims():
+    db = FakeUpsertSession()
+    loader = ClaimCopyLoader(db, "tenant-1", "job-2", mode=INGEST_MODE_UPSERT, error_row_cap=10)
+    loader.add_claim(_claim_row("C1"))
+    loader.add_claim(_claim_row("C2"))
+
+    claim_ids = loader.flush()
+
+    assert claim_ids == ["claim-new", "claim-stored"]
+    assert db.deleted_flags == ["claim-stored"]
+
+
+class FakeCopyCursor:
+    def __init__(self, db):
+        self.db = db
+
+    def copy_expert(self, sql, buffer):
+        self.db.copies.append((sql, buffer.read()))
+
+    def close(self):
+        pass
+
+
+class FakeCopySession(FakeUpsertSession):
+    """Keeps the COPY payloads and the INSERT ... ON CONFLICT statement."""
+
+    def __init__(self, written):
+        super().__init__()
+        self.written = written
+        self.copies = []
+        self.inserts = []
+
+    def connection(self):
+        connection = FakeConnection(self)
+        connection.cursor = lambda: FakeCopyCursor(self)
+        return connection
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "INSERT INTO claims" in sql:
+            self.inserts.append(sql)
+            return FakeRows(self.written)
+        if "SELECT count(*)" in sql:
+            return FakeResult(0)
+        return super().execute(statement, params)
+
+
+def test_claims_are_copied_in_column_order_with_blanks_as_null():
+    db = FakeCopySession(written=[("claim-1", False)])
+    loader = ClaimCopyLoader(db, "tenant-1", "job-1", error_row_cap=10)
+    row = dict(_claim_row("C1"), copay_amount="2.50", plan_paid_amount="", state="ny", claim_status="reversed")
+    claim_uuid = loader.add_claim(row)
+
+    assert db.copies == []
+    assert loader.flush() == ["claim-1"]
+
+    (sql, payload), = db.copies
+    assert sql == f"COPY claims_staging ({', '.join(CLAIM_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    record = dict(zip(CLAIM_COPY_COLUMNS, next(csv.reader(io.StringIO(payload)))))
+    assert record["id"] == str(claim_uuid)
+    assert record["ingestion_id"] == "job-1"
+    assert record["fill_date"] == record["prescription_date"] == str(date(2024, 1, 5))
+    assert record["days_supply"] == "30"
+    assert record["amount"] == str(Decimal("2.50"))
+    assert record["state"] == "NY"
+    assert record["reversal_indicator"] == "True"
+    # Unquoted empty fields, which COPY reads as NULL
+    assert record["plan_paid_amount"] == record["rx_number"] == ""
+    assert ',"",' not in payload
+    assert "commit" in db.events
+
+
+def test_insert_new_skips_claims_already_stored():
+    db = FakeCopySession(written=[("claim-1", False)])
+    loader = ClaimCopyLoader(db, "tenant-1", "job-1", error_row_cap=10)
+    loader.add_claim(_claim_row("C1"))
+    loader.add_claim(_claim_row("C2"))
+
+    loader.flush()
+
+    assert "ON CONFLICT (tenant_id, claim_id) DO NOTHING" in db.inserts[0]
+    assert loader.skipped_count == 1
+    assert db.deleted_flags is None
@@ -0,0 +1,121 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.services.claim_loader import claim_values, parse_date, parse_datetime
+from app.services.columnar_reader import open_columnar_rows, detect_columnar_format
+from app.services.csv_validator import CSVValidator
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _write_parquet(tmp_path, columns):
+    path = tmp_path / "claims.parquet"
+    pq.write_table(pa.table(columns), path)
+    return path
+
+
+def _read_rows(path):
+    with open_columnar_rows(path, detect_columnar_format(path)) as reader:
+        return list(reader)
+
+
+def _read_batches(path, batch_size=1000):
+    with open_columnar_rows(path, detect_columnar_format(path)) as reader:
+        return list(reader.iter_batches(batch_size))
+
+
+def test_timestamp_fill_dates_read_as_plain_dates(tmp_path):
+    path = _write_parquet(tmp_path, {
+        "claim_id": ["C1", "C2"],
+        "fill_date": pa.array([datetime(2024, 1, 5), None], pa.timestamp("us")),
+        "reversal_date": pa.array([date(2024, 2, 1), date(2024, 2, 2)], pa.date64()),
+    })
+
+    rows = _read_rows(path)
+
+    assert [row["fill_date"] for row in rows] == [date(2024, 1, 5), ""]
+    assert [row["reversal_date"] for row in rows] == [date(2024, 2, 1), date(2024, 2, 2)]
+    assert parse_date(rows[0]["fill_date"]) == date(2024, 1, 5)
+
+
+def test_timestamps_with_a_time_keep_it(tmp_path):
+    path = _write_parquet(tmp_path, {
+        "submitted_at": pa.array([datetime(2024, 1, 5, 13, 4, 5)], pa.timestamp("ms", tz="UTC")),
+    })
+
+    rows = _read_rows(path)
+
+    assert parse_datetime(rows[0]["submitted_at"]) == datetime(2024, 1, 5, 13, 4, 5)
+
+
+def test_numeric_columns_stay_typed(tmp_path):
+    path = _write_parquet(tmp_path, {
+        "quantity": [30.0, 7.5, None],
+        "copay_amount": pa.array([Decimal("10.10"), None, Decimal("0.00")], pa.decimal128(12, 2)),
+        # Numbers in a text column print as a CSV export would write them
+        "prescriber_npi": [1234567890.0, None, 2.5],
+    })
+
+    rows = _read_rows(path)
+
+    assert [row["quantity"] for row in rows] == [30.0, 7.5, ""]
+    assert [row["copay_amount"] for row in rows] == [Decimal("10.10"), "", Decimal("0.00")]
+    assert [row["prescriber_npi"] for row in rows] == ["1234567890", "", "2.5"]
+
+
+def test_typed_values_reach_the_loader_unparsed(tmp_path):
+    path = _write_parquet(tmp_path, {
+        "claim_id": ["C1"],
+        "fill_date": pa.array([date(2024, 1, 5)], pa.date32()),
+        "days_supply": pa.array([30], pa.int32()),
+        "quantity": [2.0],
+        "copay_amount": [0.1],
+        "plan_paid_amount": [0.0],
+    })
+    row = _read_rows(path)[0]
+
+    values = dict(zip(
+        ("fill_date", "days_supply", "quantity", "copay_amount", "plan_paid_amount"),
+        claim_values(row, None, "tenant-1", "job-1", datetime(2024, 1, 6))[10:15]
+    ))
+
+    assert values == {
+        "fill_date": date(2024, 1, 5),
+        "days_supply": 30,
+        "quantity": 2,
+        "copay_amount": Decimal("0.1"),
+        "plan_paid_amount": Decimal("0"),
+    }
+
+
+NUMERIC_VALUES = {
+    "days_supply": [30, 1, 365, 0, 366, -1, None],
+    "quantity": [30.0, 2.9, 0.5, 99999.0, 100000.0, float("nan"), float("inf"), None],
+    "copay_amount": [10.0, 100000.0, 100000.01, float("nan"), None],
+}
+
+
+def test_arrow_screens_match_the_text_checks(tmp_path):
+    count = max(len(values) for values in NUMERIC_VALUES.values())
+    columns = {
+        "claim_id": [f"C{n}" for n in range(count)],
+        "patient_id": ["P1"] * count,
+        "ndc": ["00002-1433-80"] * count,
+        "fill_date": pa.array([date(2024, 1, 5)] * count, pa.date32()),
+    }
+    for field, values in NUMERIC_VALUES.items():
+        columns[field] = (values * count)[:count]
+    path = _write_parquet(tmp_path, columns)
+
+    ((rows, screens),) = _read_batches(path)
+    text_rows = [{field: CSVValidator._cell(row, field) for field in row} for row in rows]
+
+    typed_errors = CSVValidator().validate_batch(rows, 2, screens)
+    text_errors = CSVValidator().validate_batch(text_rows, 2)
+
+    assert set(screens) == set(NUMERIC_VALUES)
+    assert typed_errors == text_errors
+    assert any(error is not None for error in typed_errors)
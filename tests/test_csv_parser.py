@@ -0,0 +1,140 @@
+import codecs
+import gzip
+import random
+import zipfile
+
+import pytest
+
+from app.services.csv_parser import (
+    ENCODING_SAMPLE_SIZE, count_csv_chunk_rows, detect_encoding, open_csv_chunk, open_csv_rows, plan_csv_chunks
+)
+
+
+def _write_csv(path, rng, rows):
+    """Rows with quoted commas, quotes, embedded newlines and blank lines, including CRLF line ends."""
+    lines = ["claim_id,note,amount\n"]
+    for n in range(rows):
+        if rng.random() < 0.05:
+            lines.append(rng.choice(["\n", "\r\n"]))
+        note = rng.choice([
+            "plain",
+            '"with, comma"',
+            '"line one\nline two"',
+            '"quoted ""word"" here"',
+            '"\n\n"',
+            "",
+        ])
+        line_end = rng.choice(["\n", "\r\n"])
+        lines.append(f"C{n},{note},{n}.50{line_end}")
+    path.write_text("".join(lines), newline="")
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("chunk_bytes", [1, 37, 500, 10 ** 6])
+def test_chunks_read_back_every_row_once_in_order(tmp_path, seed, chunk_bytes):
+    path = tmp_path / "claims.csv"
+    _write_csv(path, random.Random(seed), rows=200)
+
+    with open_csv_rows(file_path=str(path)) as reader:
+        expected = list(reader)
+        fieldnames, encoding = reader.fieldnames, reader.encoding
+
+    rows = []
+    for start, end in plan_csv_chunks(str(path), chunk_bytes, len(fieldnames)):
+        with open_csv_chunk(str(path), start, end, fieldnames, encoding) as chunk:
+            chunk_rows = list(chunk)
+        # Counts number rows the way ingestion does: blank lines and embedded newlines are not rows
+        assert count_csv_chunk_rows(str(path), start, end, encoding) == len(chunk_rows)
+        rows.extend(chunk_rows)
+
+    assert rows == expected
+
+
+def test_small_chunk_size_splits_the_file(tmp_path):
+    path = tmp_path / "claims.csv"
+    _write_csv(path, random.Random(0), rows=200)
+
+    assert len(plan_csv_chunks(str(path), 500, 3)) > 1
+    assert len(plan_csv_chunks(str(path), 10 ** 6, 3)) == 1
+
+
+def test_header_only_file_has_no_chunks(tmp_path):
+    path = tmp_path / "claims.csv"
+    path.write_text("claim_id,note\n")
+
+    assert plan_csv_chunks(str(path), 10, 2) == []
+
+
+@pytest.mark.parametrize("sample, encoding", [
+    (codecs.BOM_UTF8 + "claim_id,é\n".encode("utf-8"), "utf-8-sig"),
+    (codecs.BOM_UTF16_LE + "claim_id\n".encode("utf-16-le"), "utf-16"),
+    (codecs.BOM_UTF16_BE + "claim_id\n".encode("utf-16-be"), "utf-16"),
+    ("claim_id,note\n".encode("utf-16-le"), "utf-16-le"),
+    ("claim_id,note\n".encode("utf-16-be"), "utf-16-be"),
+    ("claim_id,café\n".encode("utf-8"), "utf-8"),
+    ("claim_id,café\n".encode("latin-1"), "latin-1"),
+    # A multi-byte character cut off by the end of the sample is still UTF-8
+    ("claim_id,café".encode("utf-8")[:-1], "utf-8"),
+    (b"", "utf-8"),
+])
+def test_detect_encoding(sample, encoding):
+    assert detect_encoding(sample) == encoding
+
+
+def test_stray_latin1_bytes_past_the_sample_are_kept(tmp_path):
+    # Inside the sample such a byte would make the whole file Latin-1
+    rows = "".join(f"C{n},café\n" for n in range(ENCODING_SAMPLE_SIZE // 8))
+    path = tmp_path / "claims.csv"
+    path.write_bytes(f"claim_id,note\n{rows}".encode("utf-8") + b"LAST,caf\xe9\n")
+
+    with open_csv_rows(file_path=str(path)) as reader:
+        assert reader.encoding == "utf-8"
+        notes = [row["note"] for row in reader]
+
+    assert set(notes) == {"café"}
+
+
+def _write_compressed(path, compression, members):
+    if compression == "gzip":
+        with gzip.open(path, "wb") as f:
+            f.write(members["claims.csv"])
+    else:
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, content in members.items():
+                archive.writestr(name, content)
+
+
+@pytest.mark.parametrize("compression, filename", [("gzip", "claims.csv.gz"), ("zip", "claims.zip")])
+def test_compressed_upload_reads_like_the_plain_file(tmp_path, compression, filename):
+    plain = tmp_path / "claims.csv"
+    _write_csv(plain, random.Random(0), rows=200)
+    # A BOM and a non-ASCII value, so encoding detection sees the inflated bytes
+    content = codecs.BOM_UTF8 + plain.read_bytes() + "C200,café,1.50\n".encode("utf-8")
+    plain.write_bytes(content)
+    members = {"claims.csv": content}
+    if compression == "zip":
+        members.update({"__MACOSX/._claims.csv": b"x", "README.txt": b"notes"})
+    path = tmp_path / filename
+    _write_compressed(path, compression, members)
+
+    with open_csv_rows(file_path=str(plain)) as reader:
+        expected = list(reader)
+    with open_csv_rows(file_path=str(path)) as reader:
+        assert reader.encoding == "utf-8-sig"
+        assert reader.fieldnames == ["claim_id", "note", "amount"]
+        rows = list(reader)
+
+    assert rows == expected
+    assert rows[-1]["note"] == "café"
+
+
+@pytest.mark.parametrize("members", [
+    {"claims.csv": b"claim_id\nC1\n", "more.csv": b"claim_id\nC2\n"},
+    {"README.txt": b"no csv here"},
+])
+def test_zip_must_hold_exactly_one_csv(tmp_path, members):
+    path = tmp_path / "claims.zip"
+    _write_compressed(path, "zip", members)
+
+    with pytest.raises(ValueError, match="exactly one CSV"):
+        open_csv_rows(file_path=str(path))
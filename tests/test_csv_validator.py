@@ -0,0 +1,128 @@
+import random
+from datetime import date
+
+import pytest
+
+from app.services.csv_validator import CSVValidator, ValidationError
+
+
+# Valid values, values each check rejects, and values only the slow path can judge
+# (padding, non-ASCII digits, floats, overflow, None for a missing trailing cell)
+FIELD_VALUES = {
+    # None stands for a random id, so duplicates turn up across batches
+    "claim_id": [None, "", "  C1  ", "X" * 101],
+    "patient_id": ["P1", "P2", "", " P3 ", "p" * 101],
+    "ndc": ["00002-1433-80", "12345678901", "1234-567-8", "abc", "", " 00002-1433-80 "],
+    "fill_date": [
+        "2024-01-05", "01/02/2024", "13/01/2024", "2024/1/5", "2024-13-01",
+        "x", "", " 2024-01-05 ", "２０２４-01-05", "5/1/24",
+    ],
+    "days_supply": ["30", "1", "365", "0", "366", "30.5", "1e2", "abc", "", " 30", "-1", "３０", "inf"],
+    "quantity": ["30", "99999", "100000", "0", "2.9", "nan", "inf", "", "x", "０１", "1" * 20],
+    "claim_status": ["PAID", "reversed", "", "VOID"],
+    "state": ["NY", "ca", "", "ZZ", "NEW"],
+    "copay_amount": ["10.00", "", "100000.01", "abc", "nan", "1e3"],
+    "plan_paid_amount": ["5", "", "-3", "1e9"],
+    "prescriber_npi": ["1234567890", "", "12345678901"],
+}
+
+
+def _random_rows(rng, count):
+    rows = []
+    for _ in range(count):
+        # Mostly the first (valid) value, so rows also reach the later checks
+        row = {
+            field: values[0] if rng.random() < 0.85 else rng.choice(values)
+            for field, values in FIELD_VALUES.items()
+        }
+        if row["claim_id"] is None:
+            row["claim_id"] = f"C{rng.randrange(400)}"
+        if rng.random() < 0.05:
+            row[rng.choice(list(row))] = None
+        rows.append(row)
+    return rows
+
+
+def _validate_rows_one_by_one(rows, first_row_number):
+    """What ingestion did before validate_batch: validate_row per row, exceptions as E999."""
+    validator = CSVValidator()
+    results = []
+    for offset, row in enumerate(rows):
+        row_number = first_row_number + offset
+        try:
+            results.append(validator.validate_row(row, row_number))
+        except Exception as e:
+            results.append(ValidationError(row_number=row_number, error_code="E999", error_message=f"Unexpected error: {str(e)}"))
+    return results
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_validate_batch_matches_validate_row(seed):
+    rng = random.Random(seed)
+    rows = _random_rows(rng, 300)
+
+    # One validator across batches of uneven size, as ingestion uses it
+    validator = CSVValidator()
+    results = []
+    start = 0
+    while start < len(rows):
+        size = rng.randint(1, 80)
+        batch = rows[start:start + size]
+        batch_results = validator.validate_batch(batch, start + 2)
+        for row, error, fill_date in zip(batch, batch_results, validator.fill_dates):
+            if error is None and row["fill_date"]:
+                assert fill_date is not None
+        results.extend(batch_results)
+        start += size
+
+    assert results == _validate_rows_one_by_one(rows, 2)
+
+
+def test_sniffed_format_is_the_one_most_of_the_file_uses():
+    validator = CSVValidator()
+    rows = [{"fill_date": value} for value in ["13/01/2024", "25/12/2023", "01/02/2024", "2024-03-04", ""]]
+
+    assert validator.sniff_date_format(row["fill_date"] for row in rows) == "%d/%m/%Y"
+    # Ambiguous dates follow the file's format; outliers still parse with any accepted format
+    assert validator.parse_fill_date("01/02/2024") == date(2024, 2, 1)
+    assert validator.parse_fill_date("2024-03-04") == date(2024, 3, 4)
+    assert validator.parse_fill_date("2024-13-01") is None
+
+
+@pytest.mark.parametrize("fmt", CSVValidator.DATE_FORMATS)
+def test_fast_date_parser_never_disagrees_with_strptime(fmt):
+    rng = random.Random(fmt)
+    parse = CSVValidator._fast_date_parser(fmt)
+    values = list(FIELD_VALUES["fill_date"])
+    for _ in range(1000):
+        # Mostly the format's own layout, with out-of-range parts, padding and the other separator
+        parts = {
+            "%Y": str(rng.choice([rng.randint(1900, 2100), rng.randint(0, 99999)])),
+            "%m": str(rng.randint(0, 13)).zfill(rng.randint(1, 3)),
+            "%d": str(rng.randint(0, 32)).zfill(rng.randint(1, 3)),
+        }
+        sep = fmt[2] if rng.random() < 0.9 else rng.choice("-/.")
+        values.append(sep.join(parts[field] for field in fmt.split(fmt[2])))
+
+    for value in values:
+        parsed = parse(value)
+        # The fast path may decline a value, but what it parses matches strptime
+        if parsed is not None:
+            assert parsed == CSVValidator._strptime_date(value, fmt)
+
+
+def test_format_passed_to_a_chunk_skips_sniffing():
+    validator = CSVValidator(date_format="%m/%d/%Y")
+    rows = [
+        {field: values[0] for field, values in FIELD_VALUES.items() if values[0] is not None}
+        for _ in range(3)
+    ]
+    for n, (row, fill_date) in enumerate(zip(rows, ["01/02/2024", "13/01/2024", "02/03/2024"])):
+        row.update(claim_id=f"C{n}", fill_date=fill_date)
+
+    results = validator.validate_batch(rows, 2)
+
+    assert results == [None, None, None]
+    assert validator.date_format == "%m/%d/%Y"
+    # 13/01/2024 is not month-first, so it is an outlier parsed by the fallback
+    assert validator.fill_dates == [date(2024, 1, 2), date(2024, 1, 13), date(2024, 2, 3)]
@@ -0,0 +1,256 @@
+import uuid
+from types import SimpleNamespace
+
+from celery.exceptions import SoftTimeLimitExceeded
+
+from app.workers import fraud_detection_task, run_lock, tenant_throttle
+
+
+class FakeSession:
+    def execute(self, *args, **kwargs):
+        pass
+
+    def rollback(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _patch_infrastructure(monkeypatch):
+    monkeypatch.setattr(fraud_detection_task, "SessionLocal", FakeSession)
+    monkeypatch.setattr(fraud_detection_task, "acquire_tenant_slot", lambda *args: True)
+    monkeypatch.setattr(fraud_detection_task, "release_tenant_slot", lambda *args: None)
+    monkeypatch.setattr(fraud_detection_task, "_update_job_fraud_status", lambda *args, **kwargs: None)
+    monkeypatch.setattr(run_lock, "claim", lambda *args, **kwargs: None)
+    monkeypatch.setattr(run_lock, "release", lambda *args, **kwargs: None)
+
+
+def test_soft_time_limit_retry_keeps_positional_args(monkeypatch):
+    _patch_infrastructure(monkeypatch)
+    calls = []
+
+    def fake_resumable_run(db, tenant_id, job_id, run_id=None, rule_id=None):
+        calls.append({"tenant_id": tenant_id, "job_id": job_id, "run_id": run_id, "rule_id": rule_id})
+        if len(calls) == 1:
+            raise SoftTimeLimitExceeded()
+        raise RuntimeError("stop after the retry started")
+
+    monkeypatch.setattr(fraud_detection_task, "_get_resumable_run", fake_resumable_run)
+
+    # Called the way the API queues it: job_id and tenant_id positional
+    result = fraud_detection_task.detect_fraud_for_job.apply(
+        args=["job-1", "tenant-1"],
+        kwargs={"re_run": False, "rule_id": None}
+    )
+
+    assert result.successful(), result.traceback
+    assert result.result["status"] == "failed"
+    assert result.result["error"] == "stop after the retry started"
+    assert len(calls) == 2
+    assert calls[1]["job_id"] == "job-1"
+    assert calls[1]["tenant_id"] == "tenant-1"
+
+
+class FakeRun:
+    def __init__(self, run_id, task_id):
+        self.id = run_id
+        self.task_id = task_id
+
+
+def _claim_accepting_recorder(monkeypatch, run):
+    claims = []
+
+    def fake_claim(key, token, accepted=()):
+        claims.append(list(accepted))
+        # Report the run as the holder so the task stops right after claiming
+        return "run:other"
+
+    monkeypatch.setattr(fraud_detection_task, "_get_resumable_run", lambda *args, **kwargs: run)
+    monkeypatch.setattr(run_lock, "claim", fake_claim)
+    return claims
+
+
+def test_redelivered_task_takes_over_its_own_run(monkeypatch):
+    _patch_infrastructure(monkeypatch)
+    claims = _claim_accepting_recorder(monkeypatch, FakeRun("run-1", "task-1"))
+
+    # Redelivery after a worker loss: same task id, no run_id
+    fraud_detection_task.detect_fraud_for_job.apply(args=["job-1", "tenant-1"], task_id="task-1")
+
+    assert claims == [["task:task-1", "run:run-1"]]
+
+
+def test_unrelated_task_does_not_take_over_a_run(monkeypatch):
+    _patch_infrastructure(monkeypatch)
+    claims = _claim_accepting_recorder(monkeypatch, FakeRun("run-1", "task-1"))
+
+    result = fraud_detection_task.detect_fraud_for_job.apply(args=["job-1", "tenant-1"], task_id="task-2")
+
+    assert claims == [["task:task-2"]]
+    assert result.result["status"] == "already_running"
+
+
+class FakeQuery:
+    def __init__(self, result):
+        self.result = result
+
+    def filter(self, *args):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def first(self):
+        return self.result
+
+    def all(self):
+        return []
+
+
+RUN_ID = str(uuid.uuid4())
+JOB_ID = str(uuid.uuid4())
+TENANT_ID = str(uuid.uuid4())
+
+
+class FakePipelinedRun:
+    id = RUN_ID
+    tenant_id = "tenant-1"
+    status = "processing"
+    cancel_requested = False
+
+
+def test_finished_pipeline_is_handed_to_the_history_pass(monkeypatch):
+    queued = []
+    db = FakeSession()
+    db.query = lambda model: FakeQuery(FakePipelinedRun())
+    monkeypatch.setattr(fraud_detection_task.reconcile_pipelined_run, "delay", lambda *args: queued.append(args))
+
+    fraud_detection_task.complete_pipelined_run(db, JOB_ID, RUN_ID)
+
+    # The run stays open until history rules have seen every batch
+    assert queued == [(JOB_ID, "tenant-1", RUN_ID)]
+    assert FakePipelinedRun.status == "processing"
+
+
+class FakeHistoryEngine:
+    HISTORY_LOGIC_TYPES = {"DUPLICATE_WINDOW"}
+
+    def __init__(self, db, tenant_id):
+        pass
+
+    def compile_rules(self, rules):
+        pass
+
+    def prefetch_history(self, claims):
+        pass
+
+
+class FakeHeartbeat:
+    def __init__(self, *args):
+        pass
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+
+def _patch_history_pass(monkeypatch, audit_run):
+    _patch_infrastructure(monkeypatch)
+    released = []
+    closed = []
+    monkeypatch.setattr(run_lock, "release", lambda *args: released.append(args))
+    monkeypatch.setattr(run_lock, "LockHeartbeat", FakeHeartbeat)
+    monkeypatch.setattr(FakeSession, "query", lambda self, model: FakeQuery(audit_run), raising=False)
+    monkeypatch.setattr(fraud_detection_task, "FraudDetectionEngine", FakeHistoryEngine)
+    monkeypatch.setattr(
+        fraud_detection_task.RuleService, "get_active_rules",
+        lambda db, tenant_id: [SimpleNamespace(logic_type="DUPLICATE_WINDOW")]
+    )
+    monkeypatch.setattr(fraud_detection_task.run_service, "is_cancel_requested", lambda db, run_id: False)
+    monkeypatch.setattr(fraud_detection_task, "_evaluate_batch", lambda *args: 1)
+    monkeypatch.setattr(
+        fraud_detection_task, "_close_pipelined_run",
+        lambda db, job_id, run, status: closed.append(status)
+    )
+    return released, closed
+
+
+def test_history_pass_resumes_from_its_checkpoint_after_the_time_limit(monkeypatch):
+    audit_run = FakePipelinedRun()
+    audit_run.checkpoint_claim_id = None
+    audit_run.flags_generated = 0
+    released, closed = _patch_history_pass(monkeypatch, audit_run)
+    starts = []
+
+    def fake_batches(db, tenant_id, job_id, after_claim_id):
+        starts.append(after_claim_id)
+        if len(starts) == 1:
+            yield [SimpleNamespace(id="claim-1")]
+            raise SoftTimeLimitExceeded()
+        yield [SimpleNamespace(id="claim-2")]
+
+    monkeypatch.setattr(fraud_detection_task, "_iter_claim_batches", fake_batches)
+
+    result = fraud_detection_task.reconcile_pipelined_run.apply(args=[JOB_ID, TENANT_ID, RUN_ID])
+
+    assert result.successful(), result.traceback
+    assert result.result["status"] == "completed"
+    assert starts == [None, "claim-1"]
+    assert audit_run.flags_generated == 2
+    assert closed == ["completed"]
+    # The lock stays with the run across the retry
+    assert released == []
+
+
+def test_failed_pipelined_batch_releases_the_run_lock(monkeypatch):
+    _patch_infrastructure(monkeypatch)
+    released = []
+    monkeypatch.setattr(run_lock, "release", lambda *args: released.append(args))
+    failed_run = FakePipelinedRun()
+    monkeypatch.setattr(FakeSession, "query", lambda self, model: FakeQuery(failed_run), raising=False)
+
+    def failing_rules(db, tenant_id):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(fraud_detection_task.RuleService, "get_active_rules", failing_rules)
+
+    result = fraud_detection_task.detect_fraud_for_claims.apply(
+        args=[JOB_ID, TENANT_ID, RUN_ID, [str(uuid.uuid4())]]
+    )
+
+    assert result.result["status"] == "failed"
+    assert failed_run.status == "failed"
+    assert released == [(run_lock.fraud_run_lock_key(TENANT_ID, JOB_ID), run_lock.run_token(RUN_ID))]
+
+
+def test_throttled_task_keeps_its_reservation_through_the_back_off(monkeypatch):
+    _patch_infrastructure(monkeypatch)
+    slots = iter([False, True])
+    renewed = []
+    monkeypatch.setattr(fraud_detection_task, "acquire_tenant_slot", lambda *args: next(slots))
+    monkeypatch.setattr(fraud_detection_task, "throttle_countdown", lambda: 17)
+    monkeypatch.setattr(run_lock, "renew", lambda *args, **kwargs: renewed.append((args, kwargs)))
+    claims = _claim_accepting_recorder(monkeypatch, None)
+
+    result = fraud_detection_task.detect_fraud_for_job.apply(args=[JOB_ID, TENANT_ID], task_id="task-1")
+
+    key = run_lock.fraud_run_lock_key(TENANT_ID, JOB_ID)
+    assert renewed == [((key, run_lock.task_token("task-1")), {"ttl_seconds": 17 + run_lock.LOCK_TTL_SECONDS})]
+    # The retry claims the reservation again under the same task id
+    assert claims == [[run_lock.task_token("task-1")]]
+    assert result.result["status"] == "already_running"
+
+
+def test_throttle_countdown_is_jittered(monkeypatch):
+    monkeypatch.setattr(tenant_throttle.settings, "TENANT_THROTTLE_RETRY_SECONDS", 10)
+
+    countdowns = {tenant_throttle.throttle_countdown() for _ in range(200)}
+
+    assert len(countdowns) > 1
+    assert min(countdowns) >= 10 and max(countdowns) <= 20
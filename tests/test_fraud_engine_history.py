@@ -0,0 +1,77 @@
+import uuid
+from types import SimpleNamespace
+
+from app.services.fraud_engine import FraudDetectionEngine
+
+
+TENANT_ID = str(uuid.uuid4())
+
+
+class FakeQuery:
+    def __init__(self, db):
+        self.db = db
+
+    def filter(self, *conditions):
+        return self
+
+    def all(self):
+        self.db.queries += 1
+        return self.db.claims
+
+
+class FakeSession:
+    def __init__(self, claims):
+        self.claims = claims
+        self.queries = 0
+
+    def query(self, *entities):
+        return FakeQuery(self)
+
+
+def _claim(claim_id, patient_id, ndc):
+    return SimpleNamespace(id=claim_id, patient_id=patient_id, ndc=ndc, fill_date=None, days_supply=30)
+
+
+def _rule(logic_type, keys):
+    return SimpleNamespace(logic_type=logic_type, parameters={"keys": keys})
+
+
+def test_rules_sharing_partition_keys_read_history_once():
+    stored = [_claim("old-1", "P1", "N1"), _claim("old-2", "P1", "N2"), _claim("old-3", "P2", "N1")]
+    db = FakeSession(stored)
+    engine = FraudDetectionEngine(db, TENANT_ID)
+    # Key order, tenant_id and the date field do not change the group
+    rules = [
+        _rule("EARLY_REFILL", ["patient_id", "ndc"]),
+        _rule("DUPLICATE_WINDOW", ["ndc", "patient_id", "tenant_id", "fill_date"]),
+        _rule("OVERLAP", ["patient_id", "ndc", "days_supply"]),
+        _rule("THRESHOLD", ["patient_id"]),
+    ]
+
+    engine.compile_rules(rules)
+    batch = [_claim("new-1", "P1", "N1"), _claim("new-2", "P2", "N1")]
+    engine.prefetch_history(batch)
+
+    assert engine.history_signatures == {(("ndc", "patient_id"), "fill_date")}
+    assert db.queries == 1
+    for rule in rules[:3]:
+        assert [other.id for other in engine._get_history(batch[0], rule)] == ["old-1"]
+        assert [other.id for other in engine._get_history(batch[1], rule)] == ["old-3"]
+    assert engine._get_history(batch[0], rules[3]) is None
+
+
+def test_each_distinct_group_is_read_once():
+    db = FakeSession([])
+    engine = FraudDetectionEngine(db, TENANT_ID)
+    engine.compile_rules([
+        _rule("EARLY_REFILL", ["patient_id", "ndc"]),
+        _rule("COUNT_WINDOW", ["patient_id"]),
+        _rule("DUPLICATE_WINDOW", ["patient_id"]),
+        # Tenant-wide history keeps the per-claim query path
+        _rule("COUNT_WINDOW", ["tenant_id"]),
+    ])
+
+    engine.prefetch_history([_claim("new-1", "P1", "N1"), _claim("new-2", "P1", None)])
+
+    assert len(engine.history_signatures) == 2
+    assert db.queries == 2
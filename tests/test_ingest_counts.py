@@ -0,0 +1,61 @@
+from collections import Counter
+
+from app.workers import celery_tasks
+
+
+class FakeLoader:
+    """Treats claim ids starting with "OLD" as already stored, the way insert_new skips them."""
+
+    chunk_size = 3
+
+    def __init__(self, db, tenant_id, job_id, mode=None):
+        self.new_count = 0
+        self.existing_count = 0
+        self.skipped_count = 0
+        self.error_counts = Counter()
+        self._claims = []
+        self._errors = 0
+
+    @property
+    def pending(self):
+        return len(self._claims) + self._errors
+
+    def add_claim(self, row, fill_date=None):
+        self._claims.append(row["claim_id"])
+
+    def add_error(self, error, row):
+        self.error_counts[error.error_code] += 1
+        self._errors += 1
+
+    def flush(self):
+        existing = sum(1 for claim_id in self._claims if claim_id.startswith("OLD"))
+        self.existing_count += existing
+        self.new_count += len(self._claims) - existing
+        self.skipped_count += existing
+        written = [claim_id for claim_id in self._claims if not claim_id.startswith("OLD")]
+        self._claims = []
+        self._errors = 0
+        return written
+
+
+def _row(claim_id, quantity="30"):
+    return {
+        "claim_id": claim_id, "patient_id": "P1", "ndc": "00002-1433-80",
+        "fill_date": "2024-01-05", "days_supply": "30", "quantity": quantity
+    }
+
+
+def test_skipped_rows_are_not_counted_as_successful(monkeypatch):
+    published = []
+    monkeypatch.setattr(celery_tasks, "ClaimCopyLoader", FakeLoader)
+    monkeypatch.setattr(celery_tasks, "publish_ingest_progress", lambda job_id, *counts: published.append(counts))
+
+    rows = [_row("NEW-1"), _row("OLD-1"), _row("NEW-2"), _row("BAD-1", quantity="x"), _row("OLD-2")]
+    result = celery_tasks._process_rows(None, rows, "job-1", "tenant-1")
+
+    assert result["total_rows"] == 5
+    assert result["success_count"] == 2
+    assert result["existing_count"] == 2
+    assert result["error_count"] == 1
+    # Published deltas add up to the same totals
+    assert [sum(column) for column in zip(*published)] == [5, 2, 1]
@@ -0,0 +1,111 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1 import claims
+from app.core.security import create_stream_token, verify_stream_token, create_jwt
+
+
+USER = SimpleNamespace(id="user-1", tenant_id="tenant-1")
+
+
+class FakeRequest:
+    async def is_disconnected(self):
+        return False
+
+
+class FakePubSub:
+    def __init__(self, events):
+        self.messages = [{"data": json.dumps(event)} for event in events]
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=None):
+        return self.messages.pop(0) if self.messages else None
+
+    async def aclose(self):
+        pass
+
+
+def _stream(snapshot, events):
+    async def collect():
+        pubsub = FakePubSub(events)
+        return [
+            message async for message in
+            claims._job_event_stream(FakeRequest(), pubsub, pubsub, snapshot)
+        ]
+    return asyncio.run(collect())
+
+
+def _event_names(messages):
+    return [message.split("\n")[0] for message in messages if message.startswith("event:")]
+
+
+def test_stream_ends_when_ingestion_completes_without_a_fraud_run():
+    messages = _stream(
+        {"status": "processing", "fraud_status": "pending"},
+        [
+            {"event": "ingestion_progress", "total_rows": 10, "success_count": 10, "error_count": 0},
+            {"event": "ingestion_status", "status": "completed"},
+            {"event": "ingestion_progress", "total_rows": 99, "success_count": 99, "error_count": 0},
+        ]
+    )
+
+    assert _event_names(messages) == [
+        "event: snapshot", "event: ingestion_progress", "event: ingestion_status", "event: end"
+    ]
+
+
+def test_stream_waits_for_a_pipelined_fraud_run():
+    messages = _stream(
+        {"status": "processing", "fraud_status": "processing"},
+        [
+            {"event": "ingestion_status", "status": "completed"},
+            {"event": "fraud_progress", "status": "completed", "flags_generated": 3},
+            {"event": "fraud_status", "fraud_status": "completed", "fraud_flags_count": 3},
+        ]
+    )
+
+    assert _event_names(messages) == [
+        "event: snapshot", "event: ingestion_status", "event: fraud_progress",
+        "event: fraud_status", "event: end"
+    ]
+
+
+def test_finished_job_only_gets_a_snapshot():
+    messages = _stream({"status": "completed", "fraud_status": "pending"}, [])
+
+    assert _event_names(messages) == ["event: snapshot", "event: end"]
+
+
+def test_stream_token_is_scoped_to_one_job():
+    token = create_stream_token(USER, "job-1")
+
+    assert verify_stream_token(token, "job-1")["tenant_id"] == "tenant-1"
+    with pytest.raises(HTTPException):
+        verify_stream_token(token, "job-2")
+
+
+def test_access_token_is_not_a_stream_token():
+    token = create_jwt({"user_id": "user-1", "tenant_id": "tenant-1", "email": "a@b.c", "role": "ADMIN"})
+
+    with pytest.raises(HTTPException):
+        verify_stream_token(token, "job-1")
+
+
+def test_error_total_is_the_running_count_while_ingesting(monkeypatch):
+    monkeypatch.setattr(claims, "get_ingest_progress", lambda job_id: {"error_count": 1500})
+    job = SimpleNamespace(id="job-1", status="processing", failed_rows=0, error_rows_stored=1000)
+
+    assert claims._running_error_count(job) == 1500
+
+
+def test_error_total_falls_back_to_stored_rows_without_progress(monkeypatch):
+    monkeypatch.setattr(claims, "get_ingest_progress", lambda job_id: None)
+    job = SimpleNamespace(id="job-1", status="processing", failed_rows=0, error_rows_stored=40)
+
+    assert claims._running_error_count(job) == 40
+
+    job.status, job.failed_rows = "completed", 55
+    assert claims._running_error_count(job) == 55
@@ -0,0 +1,93 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from app.services.file_storage import LocalFileStorage
+from app.services.multipart_upload import receive_file, UploadTooLarge
+
+BOUNDARY = "testboundary"
+
+
+def _multipart_body(content, filename="claims.csv"):
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="note"\r\n\r\n'
+        "ignored\r\n"
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+class FakeRequest:
+    def __init__(self, body, piece_size=7, content_length=None):
+        self.body = body
+        self.piece_size = piece_size
+        self.pieces_read = 0
+        self.headers = {
+            "content-type": f"multipart/form-data; boundary={BOUNDARY}",
+            "content-length": str(len(body) if content_length is None else content_length),
+        }
+
+    async def stream(self):
+        for start in range(0, len(self.body), self.piece_size):
+            self.pieces_read += 1
+            yield self.body[start:start + self.piece_size]
+
+
+def _stored_files(tmp_path):
+    return list(tmp_path.iterdir()) if tmp_path.exists() else []
+
+
+def test_file_part_is_written_once_with_its_hash(tmp_path):
+    content = b"claim_id,amount\nC1,10\r\nC2,20\n"
+    storage = LocalFileStorage(str(tmp_path))
+
+    upload = asyncio.run(receive_file(FakeRequest(_multipart_body(content)), storage, max_size=1024))
+
+    assert upload.filename == "claims.csv"
+    assert upload.size == len(content)
+    assert upload.sha256 == hashlib.sha256(content).hexdigest()
+    with storage.open_read(upload.handle) as f:
+        assert f.read() == content
+    assert len(_stored_files(tmp_path)) == 1
+
+
+def test_oversized_file_stops_reading_and_is_deleted(tmp_path):
+    request = FakeRequest(_multipart_body(b"x" * 5000), content_length=0)
+    storage = LocalFileStorage(str(tmp_path))
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(receive_file(request, storage, max_size=100))
+
+    assert request.pieces_read < len(request.body) // request.piece_size
+    assert _stored_files(tmp_path) == []
+
+
+def test_oversized_content_length_is_refused_before_reading(tmp_path):
+    request = FakeRequest(_multipart_body(b"x"), content_length=10 * 1024 * 1024)
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(receive_file(request, LocalFileStorage(str(tmp_path)), max_size=1024))
+
+    assert request.pieces_read == 0
+
+
+def test_refused_filename_writes_nothing(tmp_path):
+    def check_filename(filename):
+        raise ValueError(f"unsupported: {filename}")
+
+    request = FakeRequest(_multipart_body(b"data", filename="claims.exe"))
+
+    with pytest.raises(ValueError, match="claims.exe"):
+        asyncio.run(receive_file(request, LocalFileStorage(str(tmp_path)), 1024, check_filename=check_filename))
+
+    assert _stored_files(tmp_path) == []
+
+
+def test_body_without_a_file_field_is_rejected(tmp_path):
+    body = f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nhi\r\n--{BOUNDARY}--\r\n".encode()
+
+    with pytest.raises(ValueError, match="file"):
+        asyncio.run(receive_file(FakeRequest(body), LocalFileStorage(str(tmp_path)), max_size=1024))
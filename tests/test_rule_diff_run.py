@@ -0,0 +1,82 @@
+import uuid
+from types import SimpleNamespace
+
+from app.workers import fraud_detection_task
+
+
+TENANT_ID = str(uuid.uuid4())
+RUN_ID = str(uuid.uuid4())
+RULE = SimpleNamespace(
+    id=uuid.uuid4(), version=2, name="Early refill", rule_code="ER1",
+    logic_type="EARLY_REFILL", severity="HIGH", category="refill"
+)
+
+
+class FakeQuery:
+    def __init__(self, db):
+        self.db = db
+        self.criteria = []
+
+    def filter(self, *criteria):
+        self.criteria.extend(criteria)
+        return self
+
+    def all(self):
+        return self.db.flags
+
+    def delete(self, synchronize_session=None):
+        (criterion,) = self.criteria
+        self.db.deleted = list(criterion.right.value)
+
+
+class FakeSession:
+    def __init__(self, flags):
+        self.flags = flags
+        self.saved = []
+        self.updated = []
+        self.deleted = []
+
+    def query(self, model):
+        return FakeQuery(self)
+
+    def bulk_save_objects(self, objects):
+        self.saved.extend(objects)
+
+    def bulk_update_mappings(self, model, mappings):
+        self.updated.extend(mappings)
+
+
+class FakeEngine:
+    def __init__(self, matching):
+        self.matching = matching
+
+    def evaluate_claim(self, claim, rule):
+        return {"matched": claim.id in self.matching, "explanation": "refilled early"}
+
+
+def _flag(claim, version, reviewed=False):
+    return SimpleNamespace(id=uuid.uuid4(), claim_id=claim.id, rule_version=version, reviewed=reviewed)
+
+
+def test_only_the_delta_for_the_edited_rule_is_written():
+    claims = {name: SimpleNamespace(id=uuid.uuid4()) for name in ("new", "still", "gone", "reviewed", "current")}
+    flags = {
+        "still": _flag(claims["still"], 1),
+        "gone": _flag(claims["gone"], 1),
+        "reviewed": _flag(claims["reviewed"], 1, reviewed=True),
+        "current": _flag(claims["current"], 2),
+    }
+    db = FakeSession(list(flags.values()))
+    engine = FakeEngine({claims["new"].id, claims["still"].id, claims["current"].id})
+
+    created, removed = fraud_detection_task._apply_rule_delta(
+        db, engine, list(claims.values()), RULE, TENANT_ID, RUN_ID
+    )
+
+    # A claim that matches for the first time gets a flag at the current version
+    assert (created, removed) == (1, 1)
+    assert [(flag.claim_id, flag.rule_version) for flag in db.saved] == [(claims["new"].id, 2)]
+    # A prior-version flag that still matches moves to the current version
+    assert [(update["id"], update["rule_version"]) for update in db.updated] == [(flags["still"].id, 2)]
+    # Only the unreviewed prior-version flag that no longer matches is removed
+    assert db.deleted == [flags["gone"].id]
@@ -0,0 +1,144 @@
+import math
+import random
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.services import rule_simulation
+from app.services.rule_simulation import RuleSimulationService
+
+
+def _strata(sizes):
+    return [(uuid4(), size) for size in sizes]
+
+
+def test_quotas_add_up_to_sample_size_with_many_small_uploads():
+    strata = _strata([5000, 3000] + [3] * 400)
+
+    groups = RuleSimulationService.plan_strata(strata, 100)
+
+    assert sum(quota for _, _, quota in groups) == 100
+    assert all(quota >= RuleSimulationService.MIN_STRATUM_SAMPLE for _, _, quota in groups)
+    # The small uploads share one pooled group rather than one claim each
+    assert len(groups) == 3
+    assert sorted(len(ids) for ids, _, _ in groups) == [1, 1, 400]
+
+
+def test_quotas_cover_every_claim_and_stay_within_group_sizes():
+    rng = random.Random(7)
+    for _ in range(200):
+        strata = _strata([rng.randint(1, 500) for _ in range(rng.randint(1, 60))])
+        population = sum(size for _, size in strata)
+        sample_size = rng.randint(10, 2000)
+
+        groups = RuleSimulationService.plan_strata(strata, sample_size)
+
+        assert sorted(i for ids, _, _ in groups for i in ids) == sorted(i for i, _ in strata)
+        assert sum(size for _, size, _ in groups) == population
+        assert sum(quota for _, _, quota in groups) == min(sample_size, population)
+        assert all(min(2, size) <= quota <= size for _, size, quota in groups)
+
+
+def test_whole_population_sample_is_exact():
+    estimate, std_error = RuleSimulationService.stratified_estimate([(40, 40, 10), (1, 1, 1)])
+
+    assert estimate == 11
+    assert std_error == 0
+
+
+def test_stratified_estimate_matches_the_textbook_formula():
+    groups = [(1000, 50, 5), (200, 20, 8)]
+
+    estimate, std_error = RuleSimulationService.stratified_estimate(groups)
+
+    expected_variance = (
+        1000 ** 2 * (1 - 50 / 1000) * 0.1 * 0.9 / 49
+        + 200 ** 2 * (1 - 20 / 200) * 0.4 * 0.6 / 19
+    )
+    assert math.isclose(estimate, 1000 * 0.1 + 200 * 0.4)
+    assert math.isclose(std_error, math.sqrt(expected_variance))
+
+
+def test_smallest_group_keeps_its_variance_term():
+    # Two sampled claims with one match: the term must not be dropped
+    _, std_error = RuleSimulationService.stratified_estimate([(10, 2, 1)])
+
+    assert std_error > 0
+
+
+class FakeStrataQuery:
+    def __init__(self, strata):
+        self.strata = strata
+
+    def filter(self, *conditions):
+        return self
+
+    def group_by(self, *columns):
+        return self
+
+    def all(self):
+        return self.strata
+
+
+class FakeSession:
+    def __init__(self, strata):
+        self.strata = strata
+
+    def execute(self, *args, **kwargs):
+        pass
+
+    def query(self, *entities):
+        return FakeStrataQuery(self.strata)
+
+
+class FailingEngine:
+    """Fails on the second claim with the given exception."""
+
+    def __init__(self, error):
+        self.error = error
+        self.evaluated = 0
+
+    def __call__(self, db, tenant_id):
+        return self
+
+    def compile_rules(self, rules):
+        pass
+
+    def prefetch_history(self, claims):
+        pass
+
+    def evaluate_claim(self, claim, rule):
+        self.evaluated += 1
+        if self.evaluated == 2:
+            raise self.error
+        return {"matched": False}
+
+
+def _simulate(monkeypatch, engine):
+    ingestion_id = uuid4()
+    claims = [SimpleNamespace(id=uuid4(), ingestion_id=ingestion_id) for _ in range(4)]
+    monkeypatch.setattr(rule_simulation, "FraudDetectionEngine", engine)
+    monkeypatch.setattr(RuleSimulationService, "_sample_claims", lambda *args: claims)
+    rule = SimpleNamespace(id=uuid4(), name="draft", logic_type="JOIN_EXISTS")
+    return RuleSimulationService.simulate(FakeSession([(ingestion_id, 4)]), uuid4(), rule)
+
+
+def test_rule_errors_are_counted_and_the_sample_goes_on(monkeypatch):
+    engine = FailingEngine(KeyError("missing parameter"))
+
+    result = _simulate(monkeypatch, engine)
+
+    assert engine.evaluated == 4
+    assert result["evaluation_errors"] == 1
+
+
+def test_database_errors_stop_the_simulation(monkeypatch):
+    # The session's transaction is aborted, so later claims could not be evaluated either
+    engine = FailingEngine(OperationalError("SELECT 1", {}, Exception("server closed the connection")))
+
+    with pytest.raises(OperationalError):
+        _simulate(monkeypatch, engine)
+
+    assert engine.evaluated == 2
@@ -0,0 +1,138 @@
+import asyncio
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.api.v1 import runs
+from app.services import run_service
+from app.services.run_service import describe_progress
+
+
+def _run(status="processing", claims_processed=250, total_claims=1000, claims_per_second=50.0, **fields):
+    return SimpleNamespace(
+        id="run-1",
+        status=status,
+        claims_processed=claims_processed,
+        total_claims=total_claims,
+        claims_per_second=claims_per_second,
+        flags_generated=fields.get("flags_generated", 7),
+        checkpointed_at=fields.get("checkpointed_at")
+    )
+
+
+def test_running_run_reports_percent_and_eta():
+    checkpointed_at = datetime(2026, 10, 19, 12, 0)
+
+    progress = describe_progress(_run(checkpointed_at=checkpointed_at))
+
+    assert progress == {
+        "run_id": "run-1",
+        "status": "processing",
+        "claims_processed": 250,
+        "total_claims": 1000,
+        "flags_generated": 7,
+        "percent_complete": 25.0,
+        "claims_per_second": 50.0,
+        "eta_seconds": 15,
+        "updated_at": checkpointed_at
+    }
+
+
+def test_fresh_run_has_no_rate_or_eta():
+    progress = describe_progress(_run(claims_processed=None, claims_per_second=None, flags_generated=None))
+
+    assert progress["claims_processed"] == 0
+    assert progress["flags_generated"] == 0
+    assert progress["percent_complete"] == 0.0
+    assert progress["claims_per_second"] is None
+    assert progress["eta_seconds"] is None
+
+
+def test_overshoot_is_capped_and_never_gives_a_negative_eta():
+    # Claims added to the job after the run counted its total
+    progress = describe_progress(_run(claims_processed=1200))
+
+    assert progress["percent_complete"] == 100.0
+    assert progress["eta_seconds"] == 0
+
+
+def test_finished_run_has_no_eta():
+    progress = describe_progress(_run(status="completed", claims_processed=1000))
+
+    assert progress["percent_complete"] == 100.0
+    assert progress["eta_seconds"] is None
+
+
+def test_completed_run_without_a_total_counts_as_done():
+    assert describe_progress(_run(status="completed", total_claims=None))["percent_complete"] == 100.0
+    assert describe_progress(_run(total_claims=None))["percent_complete"] is None
+
+
+class FakeQuery:
+    def __init__(self, result):
+        self.result = result
+
+    def filter(self, *args):
+        return self
+
+    def first(self):
+        return self.result
+
+
+class FakeSession:
+    def __init__(self, run, job):
+        self.results = {"AuditRuleRun": run, "IngestionJob": job}
+
+    def query(self, model):
+        return FakeQuery(self.results[model.__name__])
+
+    def commit(self):
+        pass
+
+    def refresh(self, obj):
+        pass
+
+
+def _cancel(monkeypatch, held):
+    run = SimpleNamespace(
+        id=uuid.uuid4(), tenant_id=uuid.uuid4(), job_id=uuid.uuid4(), rule_id=None, task_id="task-1",
+        status="processing", cancel_requested=False, completed_at=None, flags_generated=3,
+        claims_processed=10, total_claims=20, claims_per_second=None, checkpointed_at=None
+    )
+    job = SimpleNamespace(id=run.job_id, fraud_status="processing", fraud_flags_count=0, fraud_completed_at=None)
+    logged = []
+    checked = []
+
+    def is_held_by(key, tokens):
+        checked.append((key, tokens))
+        return held
+
+    monkeypatch.setattr(runs.run_lock, "is_held_by", is_held_by)
+    monkeypatch.setattr(runs.AuditService, "log", lambda **kwargs: logged.append(kwargs))
+    monkeypatch.setattr(run_service, "publish_job_event", lambda *args: None)
+
+    user = SimpleNamespace(id="user-1", tenant_id=run.tenant_id)
+    progress = asyncio.run(runs.cancel_run(run.id, db=FakeSession(run, job), current_user=user))
+    assert checked == [(
+        f"fraud_run_lock:{run.tenant_id}:{run.job_id}",
+        [f"run:{run.id}", "task:task-1"]
+    )]
+    return run, job, progress, logged
+
+
+def test_cancel_leaves_a_live_run_to_its_worker(monkeypatch):
+    run, job, progress, logged = _cancel(monkeypatch, held=True)
+
+    assert run.cancel_requested
+    assert progress["status"] == "processing"
+    assert job.fraud_status == "processing"
+
+
+def test_cancel_closes_a_run_nobody_holds(monkeypatch):
+    run, job, progress, logged = _cancel(monkeypatch, held=False)
+
+    assert progress["status"] == "cancelled"
+    assert run.completed_at is not None
+    assert (job.fraud_status, job.fraud_flags_count) == ("cancelled", 3)
+    assert logged[0]["resource_type"] == "RUN"
+    assert logged[0]["resource_id"] == run.id
@@ -0,0 +1,116 @@
+from datetime import date
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.models.claim import Claim, Rule
+from app.services import scoring_service
+from app.services.fraud_engine import FraudDetectionEngine
+
+
+TENANT_ID = uuid4()
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def filter(self, *args):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Serves the stored claims to history reads; every other query is empty."""
+
+    def __init__(self, claims):
+        self.claims = claims
+
+    def execute(self, *args, **kwargs):
+        pass
+
+    def expunge(self, instance):
+        pass
+
+    def query(self, entity):
+        return FakeQuery(self.claims if entity is Claim else [])
+
+
+def _count_window_rule():
+    return Rule(
+        id=uuid4(),
+        tenant_id=TENANT_ID,
+        name="Too many fills",
+        rule_code="COUNT_30",
+        severity="HIGH",
+        category="utilization",
+        logic_type="COUNT_WINDOW",
+        parameters={"keys": ["patient_id", "ndc"], "window_days": 30, "max_count": 2},
+        version=1
+    )
+
+
+def _claim(claim_id, fill_date, **fields):
+    return dict(claim_id=claim_id, patient_id="P1", ndc="00002-1433-80", fill_date=fill_date, **fields)
+
+
+def _scoring_cache(monkeypatch, rule, rules_version=0):
+    cache = scoring_service.ScoringCache()
+    monkeypatch.setattr(cache, "_rules_version", lambda tenant_id: rules_version)
+    monkeypatch.setattr(scoring_service, "scoring_cache", cache)
+    monkeypatch.setattr(scoring_service.RuleService, "get_active_rules", lambda db, tenant_id: [rule])
+    return cache
+
+
+def test_score_matches_batch_evaluation_of_the_stored_claim(monkeypatch):
+    rule = _count_window_rule()
+    history = [
+        Claim(id=uuid4(), tenant_id=TENANT_ID, **_claim("A", date(2024, 1, 1))),
+        Claim(id=uuid4(), tenant_id=TENANT_ID, **_claim("B", date(2024, 1, 10))),
+    ]
+    payload = _claim("C", date(2024, 1, 20))
+    stored = Claim(id=uuid4(), tenant_id=TENANT_ID, **payload)
+
+    engine = FraudDetectionEngine(FakeSession(history + [stored]), TENANT_ID)
+    engine.compile_rules([rule])
+    engine.prefetch_history([stored])
+    batch_result = engine.evaluate_claim(stored, rule)
+
+    _scoring_cache(monkeypatch, rule)
+    score = scoring_service.score_claim(FakeSession(history), TENANT_ID, payload)
+
+    assert batch_result["matched"] and batch_result["count"] == 3
+    assert score["flagged"]
+    assert score["matches"][0]["explanation"]["count"] == batch_result["count"]
+
+
+def test_rule_version_bump_reloads_the_context(monkeypatch):
+    rule = _count_window_rule()
+    cache = _scoring_cache(monkeypatch, rule)
+    db = FakeSession([])
+
+    first = cache.get_context(db, TENANT_ID)
+    assert cache.get_context(db, TENANT_ID) is first
+
+    # Another process invalidated the tenant's rules
+    monkeypatch.setattr(cache, "_rules_version", lambda tenant_id: 1)
+    assert cache.get_context(db, TENANT_ID) is not first
+
+
+def test_database_error_fails_the_score_instead_of_reporting_it_per_rule(monkeypatch):
+    _scoring_cache(monkeypatch, _count_window_rule())
+    evaluated = []
+
+    def failing_evaluate(self, claim, rule):
+        evaluated.append(rule)
+        raise OperationalError("SELECT 1", {}, Exception("server closed the connection"))
+
+    monkeypatch.setattr(FraudDetectionEngine, "evaluate_claim", failing_evaluate)
+
+    with pytest.raises(OperationalError):
+        scoring_service.score_claim(FakeSession([]), TENANT_ID, _claim("C9", date(2024, 3, 1)))
+
+    assert len(evaluated) == 1
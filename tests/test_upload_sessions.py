@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1 import claims
+from app.schemas import job as job_schemas
+from app.services import upload_service
+from app.services.file_storage import LocalFileStorage
+
+
+USER = SimpleNamespace(id="user-1", tenant_id="tenant-1")
+PARTS = [b"abcd", b"efgh", b"ij"]
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeSession:
+    def __init__(self, status="uploading"):
+        self.status = status
+        self.events = []
+
+    def execute(self, statement, params=None):
+        if "FOR UPDATE" in str(statement):
+            self.events.append("lock")
+        return FakeResult(self.status)
+
+    def rollback(self):
+        self.events.append("rollback")
+
+
+def _session(tmp_path, monkeypatch, declared_hash=None, status="uploading"):
+    storage = LocalFileStorage(str(tmp_path))
+    job = SimpleNamespace(
+        id=uuid.uuid4(),
+        tenant_id="tenant-1",
+        filename="claims.csv",
+        status=status,
+        upload_size=sum(len(part) for part in PARTS),
+        upload_chunk_size=4,
+        file_hash=declared_hash or hashlib.sha256(b"".join(PARTS)).hexdigest()
+    )
+    for index, part in enumerate(PARTS):
+        with storage.open_write(upload_service.chunk_handle(storage, job, index)) as f:
+            f.write(part)
+
+    db = FakeSession(status)
+    queued = []
+
+    def update_job_status(db, job_id, tenant_id, status):
+        db.events.append(f"status:{status}")
+        job.status = status
+        return job
+
+    monkeypatch.setattr(claims, "get_storage", lambda: storage)
+    monkeypatch.setattr(claims.job_service, "get_job", lambda **kwargs: job)
+    monkeypatch.setattr(claims.job_service, "update_job_status", update_job_status)
+    monkeypatch.setattr(claims.process_csv_task, "delay", lambda *args, **kwargs: queued.append(args))
+    monkeypatch.setattr(claims.AuditService, "log", lambda **kwargs: None)
+    monkeypatch.setattr(claims.job_service, "find_completed_job_by_hash", lambda *args: None)
+    return storage, job, db, queued
+
+
+def _complete(job, db, allow_duplicate=False):
+    return claims.complete_upload_session(
+        str(job.id), pipelined=False, ingest_mode="insert_new", allow_duplicate=allow_duplicate,
+        db=db, current_user=USER
+    )
+
+
+def _parts_left(storage, job):
+    return upload_service.received_chunks(storage, job)
+
+
+def test_parts_are_discarded_only_after_the_hash_matches(tmp_path, monkeypatch):
+    storage, job, db, queued = _session(tmp_path, monkeypatch)
+
+    _complete(job, db)
+
+    assert db.events == ["lock", "status:pending"]
+    assert _parts_left(storage, job) == []
+    handle = queued[0][2]
+    with storage.open_read(handle) as f:
+        assert f.read() == b"".join(PARTS)
+
+
+def test_hash_mismatch_fails_the_job_before_removing_the_parts(tmp_path, monkeypatch):
+    storage, job, db, queued = _session(tmp_path, monkeypatch, declared_hash="0" * 64)
+    deletions = []
+    delete = storage.delete
+
+    def recording_delete(handle):
+        deletions.append((handle, job.status))
+        delete(handle)
+
+    monkeypatch.setattr(storage, "delete", recording_delete)
+
+    with pytest.raises(HTTPException) as exc:
+        _complete(job, db)
+
+    assert exc.value.status_code == 400
+    assert deletions and all(status == "failed" for _, status in deletions)
+    assert _parts_left(storage, job) == []
+    assert queued == []
+
+
+def test_failed_assembly_keeps_the_session_retryable(tmp_path, monkeypatch):
+    storage, job, db, queued = _session(tmp_path, monkeypatch)
+    assemble = upload_service.assemble
+
+    def failing_assemble(storage, job):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(upload_service, "assemble", failing_assemble)
+    with pytest.raises(HTTPException) as exc:
+        _complete(job, db)
+
+    assert exc.value.status_code == 500
+    assert db.events == ["lock", "rollback"]
+    assert job.status == "uploading"
+    assert _parts_left(storage, job) == [0, 1, 2]
+
+    # The retry overwrites whatever the first attempt left behind
+    monkeypatch.setattr(upload_service, "assemble", assemble)
+    _complete(job, db)
+
+    assert job.status == "pending"
+    assert len(queued) == 1
+
+
+def test_file_ingested_meanwhile_is_refused_at_completion(tmp_path, monkeypatch):
+    storage, job, db, queued = _session(tmp_path, monkeypatch)
+    existing = SimpleNamespace(id=uuid.uuid4())
+    lookups = []
+
+    def find_completed_job_by_hash(db, tenant_id, file_hash):
+        lookups.append(file_hash)
+        return existing
+
+    monkeypatch.setattr(claims.job_service, "find_completed_job_by_hash", find_completed_job_by_hash)
+
+    with pytest.raises(HTTPException) as exc:
+        _complete(job, db)
+
+    assert exc.value.status_code == 409
+    assert exc.value.headers["Location"] == f"/api/v1/claims/jobs/{existing.id}"
+    assert lookups == [job.file_hash]
+    # The session stays open, so it can be completed with allow_duplicate
+    assert job.status == "uploading"
+    assert _parts_left(storage, job) == [0, 1, 2]
+    assert queued == []
+
+    _complete(job, db, allow_duplicate=True)
+
+    assert job.status == "pending"
+    assert len(queued) == 1
+
+
+def test_completed_session_is_not_completed_again(tmp_path, monkeypatch):
+    storage, job, db, queued = _session(tmp_path, monkeypatch, status="pending")
+
+    with pytest.raises(HTTPException) as exc:
+        _complete(job, db)
+
+    assert exc.value.status_code == 409
+    assert _parts_left(storage, job) == [0, 1, 2]
+    assert queued == []
+
+
+class MultipartRequest:
+    headers = {"content-type": "multipart/form-data; boundary=b"}
+
+    def __init__(self, content):
+        self.body = (
+            b'--b\r\nContent-Disposition: form-data; name="file"; filename="claims.csv"\r\n\r\n'
+            + content + b"\r\n--b--\r\n"
+        )
+
+    async def stream(self):
+        yield self.body
+
+
+def test_both_upload_endpoints_refuse_a_duplicate_the_same_way(tmp_path, monkeypatch):
+    storage = LocalFileStorage(str(tmp_path))
+    existing = SimpleNamespace(id=uuid.uuid4(), status="completed")
+    monkeypatch.setattr(claims, "get_storage", lambda: storage)
+    monkeypatch.setattr(claims.job_service, "find_completed_job_by_hash", lambda *args: existing)
+
+    with pytest.raises(HTTPException) as direct:
+        asyncio.run(claims.upload_csv(
+            MultipartRequest(b"claim_id\nC1\n"), pipelined=False, allow_duplicate=False,
+            ingest_mode="insert_new", db=None, current_user=USER
+        ))
+    with pytest.raises(HTTPException) as resumable:
+        asyncio.run(claims.create_upload_session(
+            job_schemas.UploadSessionCreate(filename="claims.csv", file_size=12, file_hash="a" * 64),
+            allow_duplicate=False, db=None, current_user=USER
+        ))
+
+    for exc in (direct.value, resumable.value):
+        assert exc.status_code == 409
+        assert exc.headers["Location"] == f"/api/v1/claims/jobs/{existing.id}"
+    assert direct.value.detail == resumable.value.detail
+    assert list(tmp_path.iterdir()) == []